@@ -0,0 +1,5 @@
+"""Benchmarks of the pyvision hot paths.
+
+Every module of this package can be run with python -m, e.g.
+python -m pyvision.benchmarks.separable.
+"""
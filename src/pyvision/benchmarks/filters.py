@@ -0,0 +1,211 @@
+"""Compare the cost per frame of every filter on host and UMat frames, OpenCL on and off.
+
+Every filter class of pyvision.models.filters is applied to ndarray and UMat frames at
+several resolutions, with OpenCL disabled and, when a device is available, enabled. The
+table gives the fastest representation of every filter and resolution, and the rows
+named transfer give the cost of moving a frame to a UMat and back, which a pipeline
+pays whenever a host stage follows a device one.
+
+Example:
+    python -m pyvision.benchmarks.filters --repeat 10 --resolution 720p 1080p
+"""
+
+import argparse
+import inspect
+import statistics
+import timeit
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Type
+
+import cv2
+import numpy as np
+
+from pyvision.models import Image, ImageProcessingDecorator, filters
+from pyvision.models.filters import NoOpFilter
+
+RESOLUTIONS = {
+    "480p": (640, 480),
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+    "4K": (3840, 2160),
+}
+
+# The frame representation and whether OpenCL is enabled
+VARIANTS: Dict[str, Tuple[bool, bool]] = {
+    "ndarray": (False, False),
+    "UMat": (True, False),
+    "ndarray+CL": (False, True),
+    "UMat+CL": (True, True),
+}
+
+Row = Tuple[str, str, Dict[str, Optional[float]]]
+
+
+def filter_classes() -> List[Type[ImageProcessingDecorator]]:
+    """Return the filter classes of pyvision.models.filters, by name."""
+    return [
+        filter_class
+        for _, filter_class in sorted(inspect.getmembers(filters, inspect.isclass))
+        if issubclass(filter_class, ImageProcessingDecorator)
+        and filter_class.__module__ == filters.__name__
+    ]
+
+
+def time_per_frame(function: Callable[[], object], repeat: int) -> float:
+    """Return the median time of a function, in milliseconds.
+
+    Args:
+        function (Callable[[], object]): The function to time, the UMat it returns
+            being waited for.
+        repeat (int): The number of runs.
+    """
+    function()  # Warm up the caches and the OpenCL kernels
+    times = []
+    for _ in range(repeat):
+        start = timeit.default_timer()
+        if isinstance(function(), cv2.UMat):
+            cv2.ocl.finish()  # Wait for the device to be done
+        times.append(timeit.default_timer() - start)
+    return 1000 * statistics.median(times)
+
+
+def time_filter(
+    filter_class: Type[ImageProcessingDecorator],
+    host: np.ndarray,
+    variants: Sequence[str],
+    repeat: int,
+) -> Dict[str, Optional[float]]:
+    """Time a filter on every variant of a frame.
+
+    Args:
+        filter_class (Type[ImageProcessingDecorator]): The filter to time.
+        host (np.ndarray): The BGR frame.
+        variants (Sequence[str]): The names of the VARIANTS to time.
+        repeat (int): The number of runs per measure.
+
+    Returns:
+        Dict[str, Optional[float]]: The time of every variant in milliseconds, None
+            for the variants the filter fails on.
+
+    Raises:
+        ValueError: If the filter fails on every variant, e.g. for lack of a model.
+    """
+    if filter_class.accepted_channels == (1,):
+        host = cv2.cvtColor(host, cv2.COLOR_BGR2GRAY)
+    times: Dict[str, Optional[float]] = {}
+    failure = None
+    for variant in variants:
+        umat, opencl = VARIANTS[variant]
+        cv2.ocl.setUseOpenCL(opencl)
+        stage = filter_class(NoOpFilter())  # type: ignore
+        frame: Image = cv2.UMat(host) if umat else host
+        try:
+            times[variant] = time_per_frame(lambda: stage.apply(frame), repeat)
+        except (cv2.error, AttributeError, TypeError) as error:
+            times[variant] = None
+            failure = error
+    if all(time is None for time in times.values()):
+        message = failure.err if isinstance(failure, cv2.error) else failure
+        raise ValueError(f"fails on every variant: {message}")
+    return times
+
+
+def time_transfer(
+    host: np.ndarray, variants: Sequence[str], repeat: int
+) -> Dict[str, Optional[float]]:
+    """Time the round trip of a frame to a UMat and back, on the UMat variants."""
+    times: Dict[str, Optional[float]] = {}
+    for variant in variants:
+        umat, opencl = VARIANTS[variant]
+        cv2.ocl.setUseOpenCL(opencl)
+        times[variant] = (
+            time_per_frame(lambda: cv2.UMat(host).get(), repeat) if umat else None
+        )
+    return times
+
+
+def run(resolutions: Sequence[str], repeat: int, names: Sequence[str]) -> List[Row]:
+    """Time every filter at every resolution on every variant.
+
+    Args:
+        resolutions (Sequence[str]): The names of the RESOLUTIONS to time.
+        repeat (int): The number of runs per measure.
+        names (Sequence[str]): The filter class names to time, every one if empty.
+
+    Returns:
+        List[Row]: The filter, the resolution and the time of every variant.
+    """
+    variants = [
+        variant
+        for variant, (_, opencl) in VARIANTS.items()
+        if not opencl or cv2.ocl.haveOpenCL()
+    ]
+    classes = [
+        filter_class
+        for filter_class in filter_classes()
+        if not names or filter_class.__name__ in names
+    ]
+    rng = np.random.default_rng(0)
+    rows: List[Row] = []
+    use_opencl = cv2.ocl.useOpenCL()
+    try:
+        for resolution in resolutions:
+            width, height = RESOLUTIONS[resolution]
+            host = rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+            rows.append(("transfer", resolution, time_transfer(host, variants, repeat)))
+            for filter_class in list(classes):
+                try:
+                    times = time_filter(filter_class, host, variants, repeat)
+                except TypeError:  # The abstract bases take more arguments
+                    continue
+                except (cv2.error, ValueError) as error:  # A model file is missing
+                    reason = error.err if isinstance(error, cv2.error) else error
+                    print(f"{filter_class.__name__} skipped: {reason}")
+                    classes.remove(filter_class)
+                    continue
+                rows.append((filter_class.__name__, resolution, times))
+    finally:
+        cv2.ocl.setUseOpenCL(use_opencl)
+    return rows
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """Parse the command line and print the comparison table.
+
+    Args:
+        argv (Optional[Sequence[str]]): The command line arguments, sys.argv if None.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument(
+        "--resolution",
+        nargs="+",
+        default=list(RESOLUTIONS),
+        choices=list(RESOLUTIONS),
+    )
+    parser.add_argument(
+        "--filter", nargs="+", default=[], help="filter class names, every one if none"
+    )
+    args = parser.parse_args(argv)
+
+    if not cv2.ocl.haveOpenCL():
+        print("no OpenCL device, the +CL variants are left out")
+    rows = run(args.resolution, args.repeat, args.filter)
+    variants = list(rows[0][2]) if rows else []
+    header = "".join(f" {variant:>11}" for variant in variants)
+    print(f"{'filter':<32} {'size':<6}{header}  fastest (speedup over ndarray)")
+    for name, resolution, times in rows:
+        cells = "".join(
+            f" {'-' if time is None else f'{time:.2f}':>11}" for time in times.values()
+        )
+        measured = {
+            variant: time for variant, time in times.items() if time is not None
+        }
+        fastest = "-"
+        if measured and times.get("ndarray"):
+            variant = min(measured, key=measured.__getitem__)
+            fastest = f"{variant} ({times['ndarray'] / measured[variant]:.2f}x)"
+        print(f"{name:<32} {resolution:<6}{cells}  {fastest}")
+
+
+if __name__ == "__main__":
+    main()
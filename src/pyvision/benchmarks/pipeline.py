@@ -0,0 +1,398 @@
+"""Run chains of stages over a fixed clip and report their throughput and latencies.
+
+The frames of the clip, or of the synthetic source, are decoded once and replayed in
+memory, so that every run measures the same frames and only the stages. Each chain is
+warmed up, then timed several times over a fixed number of frames and the medians of
+the runs are reported. Its allocations are measured in a separate pass so that tracing
+does not skew the timings. The results are written to a JSON file, which later runs
+can be compared with: a timing only regresses when its median is worse than the
+tolerance allows and every run is worse than every run of the baseline, so that noise
+does not pass for a regression.
+
+Example:
+    python -m pyvision.benchmarks.pipeline --output baseline.json
+    python -m pyvision.benchmarks.pipeline --baseline baseline.json --output new.json
+    python -m pyvision.benchmarks.pipeline --source clip.mp4 --chain SharpenFilter
+        --chain GrayscaleFilter,CannyFilter --chain yolo --model yolo/yolov9t.pt
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import timeit
+import tracemalloc
+from typing import Any, Dict, List, Optional, Sequence
+
+import cv2
+import numpy as np
+
+from pyvision.camera.backends import CaptureBackend, open_capture
+from pyvision.headless import detector_settings, parse_source
+from pyvision.models import ImageProcessingStrategy, filters
+from pyvision.models.engines import Engine, InferenceEngine, Precision, create_engine
+from pyvision.models.filters import NoOpFilter
+from pyvision.models.frame import Frame, transfers
+from pyvision.models.pipeline import Pipeline
+from pyvision.utils.metrics import LatencyHistogram, metrics
+
+DEFAULT_CHAINS = ["GrayscaleFilter", "SharpenFilter", "GrayscaleFilter,CannyFilter"]
+
+# The token of a chain standing for the YOLO detection
+DETECTION = "yolo"
+
+# The metrics compared with the baseline: a lower throughput or higher latency or
+# allocated memory than the tolerance allows is a regression. The growth of the buffer
+# pool is only reported, it is nil once the pool is warm whatever the stages allocate.
+HIGHER_IS_BETTER = ("fps",)
+LOWER_IS_BETTER = ("p50", "p95", "p99", "traced_kb_per_frame")
+
+# The metrics of a timed run, the medians of the runs being compared
+TIMED = ("fps", "mean", "p50", "p95", "p99", "max")
+
+# The tail percentiles vary more from run to run, see --tail-tolerance
+TAIL = ("p95", "p99")
+
+# The environment entries the timings depend on, warned about when they differ
+ENVIRONMENT = ("python", "machine", "cpus", "opencv", "numpy", "opencl", "threads")
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Return the peak resident memory of the process, in MB, None if unknown."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / 1e6 if sys.platform == "darwin" else peak / 1e3
+
+
+def load_frames(source: str, width: int, height: int, count: int) -> List[np.ndarray]:
+    """Decode the first frames of a source.
+
+    Args:
+        source (str): The camera index, file, directory or synthetic.
+        width (int): The requested frame width.
+        height (int): The requested frame height.
+        count (int): The number of frames to decode.
+
+    Returns:
+        List[np.ndarray]: The frames, fewer if the source ends before.
+    """
+    capture = open_capture(parse_source(source), CaptureBackend.AUTO, width, height, 30)
+    frames = []
+    while len(frames) < count:
+        ok, frame = capture.read()
+        if not ok:
+            break
+        frames.append(frame.get() if isinstance(frame, cv2.UMat) else frame.copy())
+    capture.release()
+    if not frames:
+        raise ValueError(f"no frame could be read from {source}")
+    return frames
+
+
+def build_chain(
+    spec: str, engine: Optional[InferenceEngine]
+) -> ImageProcessingStrategy:
+    """Chain the stages of a chain specification.
+
+    Args:
+        spec (str): The comma separated class names of pyvision.models.filters, yolo
+            standing for the detection, the first one being applied first.
+        engine (Optional[InferenceEngine]): The engine running the detection.
+
+    Returns:
+        ImageProcessingStrategy: The chained stages.
+
+    Raises:
+        ValueError: If a filter is unknown or the chain detects without an engine.
+    """
+    from pyvision.models.yolo import YoloObjectDetection
+
+    strategy: ImageProcessingStrategy = NoOpFilter()
+    for name in spec.split(","):
+        if name == DETECTION:
+            if engine is None:
+                raise ValueError(f"{spec} detects objects, --model is required")
+            strategy = YoloObjectDetection(strategy, engine)
+            continue
+        filter_class = getattr(filters, name, None)
+        if filter_class is None:
+            raise ValueError(f"unknown filter: {name}")
+        strategy = filter_class(strategy)
+    return strategy
+
+
+def time_run(
+    pipeline: Pipeline, frames: Sequence[np.ndarray], count: int
+) -> Dict[str, float]:
+    """Time a pipeline over a number of frames.
+
+    Args:
+        pipeline (Pipeline): The pipeline, warmed up.
+        frames (Sequence[np.ndarray]): The frames, replayed in a loop.
+        count (int): The number of frames timed.
+
+    Returns:
+        Dict[str, float]: The throughput and the latencies in milliseconds, see TIMED.
+    """
+    latency = LatencyHistogram()
+    start = timeit.default_timer()
+    for index in range(count):
+        before = timeit.default_timer()
+        pipeline.process(Frame(frames[index % len(frames)], index)).host()
+        latency.record(timeit.default_timer() - before)
+    elapsed = timeit.default_timer() - start
+    summary = latency.summary()
+    summary["fps"] = count / elapsed if elapsed > 0 else 0.0
+    return {metric: summary[metric] for metric in TIMED}
+
+
+def run_chain(
+    spec: str,
+    frames: Sequence[np.ndarray],
+    engine: Optional[InferenceEngine],
+    count: int,
+    warmup: int,
+    runs: int,
+) -> Dict[str, Any]:
+    """Benchmark a chain.
+
+    Args:
+        spec (str): The chain, see build_chain.
+        frames (Sequence[np.ndarray]): The frames, replayed in a loop.
+        engine (Optional[InferenceEngine]): The engine running the detection.
+        count (int): The number of frames timed per run.
+        warmup (int): The number of frames run before timing.
+        runs (int): The number of timed runs, their medians being reported.
+
+    Returns:
+        Dict[str, Any]: The results of the chain.
+    """
+    pipeline = Pipeline([build_chain(spec, engine)])
+    for index in range(warmup):
+        pipeline.process(Frame(frames[index % len(frames)], index))
+
+    metrics.reset()
+    transfers.reset()
+    allocations = pipeline.buffers.allocations
+    timed = [time_run(pipeline, frames, count) for _ in range(runs)]
+    pool_growth = pipeline.buffers.allocations - allocations
+    transferred = transfers.uploads + transfers.downloads
+    stages = {
+        name: summary for name, summary in metrics.summary().items() if summary["count"]
+    }
+
+    # Measured apart, tracing slows every allocation down
+    tracemalloc.start()
+    traced = 0
+    for index in range(min(count, 50)):
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        pipeline.process(Frame(frames[index % len(frames)], index)).host()
+        traced += tracemalloc.get_traced_memory()[1] - baseline
+    tracemalloc.stop()
+
+    return {
+        "frames": count,
+        **{metric: statistics.median(run[metric] for run in timed) for metric in TIMED},
+        "runs": timed,
+        "pool_growth": pool_growth,
+        "traced_kb_per_frame": traced / min(count, 50) / 1e3,
+        "transfers_per_frame": transferred / count / runs,
+        "peak_rss_mb": peak_rss_mb(),
+        "stages": stages,
+    }
+
+
+def environment() -> Dict[str, Any]:
+    """Return what the results depend on besides the code."""
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "opencv": cv2.__version__,
+        "numpy": np.__version__,
+        "opencl": cv2.ocl.useOpenCL(),
+        "threads": cv2.getNumThreads(),
+    }
+
+
+def within_noise(
+    metric: str, reference: Dict[str, Any], result: Dict[str, Any]
+) -> bool:
+    """Return whether the best run is no worse than the worst run of the baseline.
+
+    Args:
+        metric (str): The timed metric, see TIMED.
+        reference (Dict[str, Any]): The results of the chain in the baseline.
+        result (Dict[str, Any]): The results of the chain in this run.
+    """
+    if metric not in TIMED:
+        return False
+    before = [run[metric] for run in reference.get("runs", ())]
+    now = [run[metric] for run in result.get("runs", ())]
+    if not before or not now:
+        return False
+    if metric in HIGHER_IS_BETTER:
+        return max(now) >= min(before)
+    return min(now) <= max(before)
+
+
+def relative_change(before: float, now: float) -> float:
+    """Return the change from the baseline, infinite from nothing to something."""
+    if before:
+        return (now - before) / before
+    return float("inf") if now > before else 0.0  # E.g. a chain now allocating
+
+
+def compare(
+    results: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float,
+    tail_tolerance: float,
+) -> List[str]:
+    """Print the results next to the baseline and return the regressions.
+
+    Args:
+        results (Dict[str, Any]): The results of this run.
+        baseline (Dict[str, Any]): The results of the baseline run.
+        tolerance (float): The relative change tolerated, e.g. 0.1 for 10%.
+        tail_tolerance (float): The relative change tolerated on the tail
+            percentiles, see TAIL.
+
+    Returns:
+        List[str]: The regressions, one line each.
+    """
+    for key in ("source", "resolution"):
+        if results[key] != baseline[key]:
+            print(f"warning: the {key} differs, {baseline[key]} in the baseline")
+    for key in ENVIRONMENT:
+        now, before = results["environment"].get(key), baseline["environment"].get(key)
+        if now != before:
+            print(f"warning: {key} is {now}, {before} in the baseline")
+    regressions = []
+    print(f"\n{'chain':<40} {'metric':<22} {'baseline':>10} {'now':>10} {'change':>8}")
+    for spec, result in results["chains"].items():
+        reference = baseline["chains"].get(spec)
+        if reference is None:
+            continue
+        for metric in HIGHER_IS_BETTER + LOWER_IS_BETTER:
+            before, now = reference.get(metric), result.get(metric)
+            if before is None or now is None:
+                continue
+            change = relative_change(before, now)
+            worse = -change if metric in HIGHER_IS_BETTER else change
+            flag = ""
+            limit = tail_tolerance if metric in TAIL else tolerance
+            # The timings only regress when the runs are apart from the baseline
+            # ones, the allocated memory hardly varies from run to run
+            if (
+                worse > limit
+                and (metric in HIGHER_IS_BETTER or now - before > 1e-3)
+                and not within_noise(metric, reference, result)
+            ):
+                flag = "  REGRESSION"
+                regressions.append(f"{spec} {metric}: {before:.2f} -> {now:.2f}")
+            print(
+                f"{spec:<40} {metric:<22} {before:10.2f} {now:10.2f}"
+                f" {100 * change:+7.1f}%{flag}"
+            )
+    return regressions
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """Parse the command line, run the chains and compare them with the baseline.
+
+    The process exits with status 1 if a chain regressed.
+
+    Args:
+        argv (Optional[Sequence[str]]): The command line arguments, sys.argv if None.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--source", default="synthetic")
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument(
+        "--clip-frames", type=int, default=60, help="frames decoded and replayed"
+    )
+    parser.add_argument("--frames", type=int, default=300, help="frames timed")
+    parser.add_argument("--warmup", type=int, default=30)
+    parser.add_argument(
+        "--runs", type=int, default=5, help="timed runs per chain, medians reported"
+    )
+    parser.add_argument(
+        "--chain",
+        action="append",
+        help="comma separated filter class names, yolo for the detection, can be"
+        f" repeated (default: {' '.join(DEFAULT_CHAINS)})",
+    )
+    parser.add_argument("--model", help="YOLO weights or ONNX model of the yolo stage")
+    parser.add_argument(
+        "--engine",
+        default=Engine.ULTRALYTICS.value,
+        choices=[engine.value for engine in Engine],
+    )
+    parser.add_argument("--input-size", type=int, default=640)
+    parser.add_argument(
+        "--precision",
+        default=Precision.FP32.value,
+        choices=[precision.value for precision in Precision],
+    )
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument("--output", help="JSON file the results are written to")
+    parser.add_argument("--baseline", help="JSON file of a previous run to compare")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.1, help="relative change tolerated"
+    )
+    parser.add_argument(
+        "--tail-tolerance",
+        type=float,
+        default=0.25,
+        help="relative change tolerated on p95 and p99",
+    )
+    args = parser.parse_args(argv)
+
+    frames = load_frames(args.source, args.width, args.height, args.clip_frames)
+    engine = create_engine(detector_settings(args)) if args.model else None
+    if engine is not None:
+        engine.warm_up(*frames[0].shape[1::-1])
+
+    results: Dict[str, Any] = {
+        "environment": environment(),
+        "source": args.source,
+        "resolution": list(frames[0].shape[1::-1]),
+        "chains": {},
+    }
+    print(f"{'chain':<40} {'fps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'kB':>8}")
+    for spec in args.chain or DEFAULT_CHAINS:
+        result = results["chains"][spec] = run_chain(
+            spec, frames, engine, args.frames, args.warmup, args.runs
+        )
+        print(
+            f"{spec:<40} {result['fps']:8.1f} {result['p50']:8.2f}"
+            f" {result['p95']:8.2f} {result['p99']:8.2f}"
+            f" {result['traced_kb_per_frame']:8.1f}"
+        )
+    print(f"peak RSS: {peak_rss_mb() or 0:.1f} MB")
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+    if args.baseline:
+        with open(args.baseline) as baseline:
+            regressions = compare(
+                results, json.load(baseline), args.tolerance, args.tail_tolerance
+            )
+        if regressions:
+            print("\nregressions:\n  " + "\n  ".join(regressions))
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Compare the cost per frame of the 2D and separable convolutions of the filters.
+
+Example:
+    python -m pyvision.benchmarks.separable --repeat 50 --umat
+"""
+
+import argparse
+import timeit
+from typing import List, Optional, Sequence, Tuple, Type
+
+import cv2
+import numpy as np
+
+from pyvision.models import Image
+from pyvision.models.filters import (
+    GaussianBlurKernelFilter,
+    GaussianKernelFilter,
+    GaussianSmoothingFilter,
+    HorizontalSobelKernelFilter,
+    KernelFilter,
+    LeftSobelKernelFilter,
+    NoOpFilter,
+    TopSobelKernelFilter,
+    UnsharpMasking5By5KernelFilter,
+    VerticalSobelKernelFilter,
+)
+
+FILTERS: List[Type[KernelFilter]] = [
+    GaussianBlurKernelFilter,
+    GaussianKernelFilter,
+    GaussianSmoothingFilter,
+    UnsharpMasking5By5KernelFilter,
+    LeftSobelKernelFilter,
+    TopSobelKernelFilter,
+    VerticalSobelKernelFilter,
+    HorizontalSobelKernelFilter,
+]
+
+RESOLUTIONS = {"720p": (1280, 720), "1080p": (1920, 1080)}
+
+
+def time_per_frame(stage: KernelFilter, frame: Image, repeat: int) -> float:
+    """Return the best time of the stage on the frame, in milliseconds.
+
+    Args:
+        stage (KernelFilter): The filter to time.
+        frame (Image): The frame to apply the filter to.
+        repeat (int): The number of runs, the fastest one being kept.
+    """
+    stage.apply(frame)  # Warm up the caches and the OpenCL kernels
+    best = float("inf")
+    for _ in range(repeat):
+        start = timeit.default_timer()
+        output = stage.apply(frame)
+        if isinstance(output, cv2.UMat):
+            cv2.ocl.finish()  # Wait for the device to be done
+        best = min(best, timeit.default_timer() - start)
+    return 1000 * best
+
+
+def run(repeat: int, umat: bool) -> List[Tuple[str, str, float, float, int]]:
+    """Time every filter with and without the separable mode.
+
+    Args:
+        repeat (int): The number of runs per measure.
+        umat (bool): Whether to feed UMat frames instead of host frames.
+
+    Returns:
+        The filter, the resolution, the 2D and the separable time in milliseconds and
+        the largest difference between both outputs.
+    """
+    rng = np.random.default_rng(0)
+    rows = []
+    for resolution, (width, height) in RESOLUTIONS.items():
+        host = rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+        frame = cv2.UMat(host) if umat else host
+        for filter_class in FILTERS:
+            full = filter_class(NoOpFilter(), separable=False)  # type: ignore
+            separable = filter_class(NoOpFilter(), separable=True)  # type: ignore
+            difference = cv2.absdiff(full.apply(frame), separable.apply(frame))
+            if isinstance(difference, cv2.UMat):
+                difference = difference.get()
+            rows.append(
+                (
+                    filter_class.__name__,
+                    resolution,
+                    time_per_frame(full, frame, repeat),
+                    time_per_frame(separable, frame, repeat),
+                    int(difference.max()),
+                )
+            )
+    return rows
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """Parse the command line and print the comparison table.
+
+    Args:
+        argv (Optional[Sequence[str]]): The command line arguments, sys.argv if None.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--umat", action="store_true", help="benchmark UMat frames")
+    args = parser.parse_args(argv)
+
+    print(f"{'filter':<32} {'size':<6} {'2D ms':>8} {'sep ms':>8} {'speedup':>8} diff")
+    for name, resolution, full, separable, difference in run(args.repeat, args.umat):
+        speedup = full / separable if separable > 0 else 0.0
+        print(
+            f"{name:<32} {resolution:<6} {full:8.2f} {separable:8.2f}"
+            f" {speedup:7.2f}x {difference}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -10,7 +10,8 @@ class VideoStreamProvider(metaclass=abc.ABCMeta):
     """Each video stream provider will need to implement this interface.
 
     It will define the methods needed in order to parse various video
-    streams
+    streams. The sources themselves are opened through one of the capture
+    backends, see pyvision.camera.backends.
     """
 
     @classmethod
@@ -0,0 +1,366 @@
+"""Capture backends used to open a video source on any platform.
+
+Live cameras are opened through the native OpenCV backend of the platform, while video
+files, image directories and a deterministic synthetic generator allow the pipeline to
+run headless and to replay the same frames at full speed.
+"""
+
+import glob
+import os
+import sys
+from enum import Enum
+from typing import Any, List, Optional, Tuple, Union
+
+import cv2
+import numpy as np
+
+from pyvision.models import Image
+
+IMAGE_EXTENSIONS = (".bmp", ".jpeg", ".jpg", ".png", ".tif", ".tiff", ".webp")
+
+
+class CaptureBackend(Enum):
+    """Enum representing the backends a video source can be opened with."""
+
+    AUTO = "auto"
+    MSMF = "msmf"
+    DSHOW = "dshow"
+    V4L2 = "v4l2"
+    AVFOUNDATION = "avfoundation"
+    FFMPEG = "ffmpeg"
+    GSTREAMER = "gstreamer"
+    FILE = "file"
+    IMAGES = "images"
+    SYNTHETIC = "synthetic"
+
+    @property
+    def is_live(self) -> bool:
+        """Return True when the source produces frames in real time.
+
+        Non live sources are replayed as fast as they are read and end when exhausted.
+        """
+        return self not in (
+            CaptureBackend.FILE,
+            CaptureBackend.IMAGES,
+            CaptureBackend.SYNTHETIC,
+        )
+
+
+# The OpenCV API preference matching each backend relying on cv2.VideoCapture
+_API_PREFERENCES = {
+    CaptureBackend.MSMF: cv2.CAP_MSMF,
+    CaptureBackend.DSHOW: cv2.CAP_DSHOW,
+    CaptureBackend.V4L2: cv2.CAP_V4L2,
+    CaptureBackend.AVFOUNDATION: cv2.CAP_AVFOUNDATION,
+    CaptureBackend.FFMPEG: cv2.CAP_FFMPEG,
+    CaptureBackend.GSTREAMER: cv2.CAP_GSTREAMER,
+    CaptureBackend.FILE: cv2.CAP_FFMPEG,
+}
+
+
+def default_camera_backend() -> CaptureBackend:
+    """Return the native camera backend of the running platform.
+
+    Returns:
+        CaptureBackend: The backend used to open camera indices.
+    """
+    if sys.platform == "win32":
+        return CaptureBackend.MSMF
+    if sys.platform.startswith("linux"):
+        return CaptureBackend.V4L2
+    if sys.platform == "darwin":
+        return CaptureBackend.AVFOUNDATION
+    return CaptureBackend.AUTO
+
+
+def resolve_backend(
+    path: Union[int, str], backend: CaptureBackend = CaptureBackend.AUTO
+) -> CaptureBackend:
+    """Guess the backend to use for a path when none is given explicitly.
+
+    Args:
+        path (Union[int, str]): The camera index, URL, file or directory to open.
+        backend (CaptureBackend): The requested backend.
+
+    Returns:
+        CaptureBackend: The backend to open the path with.
+    """
+    if backend is not CaptureBackend.AUTO:
+        return backend
+    if isinstance(path, int):
+        return default_camera_backend()
+    if path == CaptureBackend.SYNTHETIC.value:
+        return CaptureBackend.SYNTHETIC
+    if os.path.isdir(path):
+        return CaptureBackend.IMAGES
+    if "://" in path:
+        return CaptureBackend.FFMPEG
+    if "!" in path:  # A GStreamer pipeline description
+        return CaptureBackend.GSTREAMER
+    return CaptureBackend.FILE
+
+
+class ImageDirectoryCapture:
+    """A cv2.VideoCapture like source reading the images of a directory in order."""
+
+    def __init__(self, directory: str, fps: int = 30) -> None:
+        """Initialize the ImageDirectoryCapture.
+
+        Args:
+            directory (str): The directory containing the images.
+            fps (int): The frame rate reported for the sequence.
+        """
+        self.files = sorted(
+            path
+            for path in glob.glob(os.path.join(directory, "*"))
+            if path.lower().endswith(IMAGE_EXTENSIONS)
+        )
+        self.fps = fps
+        self.position = 0
+        self.opened = len(self.files) > 0
+        self._current: Optional[str] = None
+        first = cv2.imread(self.files[0]) if self.opened else None
+        self.height, self.width = first.shape[:2] if first is not None else (0, 0)
+
+    def isOpened(self) -> bool:
+        """Check if the directory contains any image."""
+        return self.opened
+
+    def grab(self) -> bool:
+        """Move to the next image of the directory.
+
+        Returns:
+            bool: False when every image was read.
+        """
+        if not self.opened or self.position >= len(self.files):
+            return False
+        self._current = self.files[self.position]
+        self.position += 1
+        return True
+
+    def retrieve(self, image: Optional[Any] = None) -> Tuple[bool, Any]:
+        """Decode the image moved to by the last grab.
+
+        Args:
+            image (Optional[Any]): A buffer to decode into, reused when possible.
+
+        Returns:
+            A tuple containing the success state and the image.
+        """
+        if self._current is None:
+            return False, image
+        frame = cv2.imread(self._current)
+        if frame is None:
+            return False, image
+        return True, _copy_into(frame, image)
+
+    def read(self, image: Optional[Any] = None) -> Tuple[bool, Any]:
+        """Grab and decode the next image."""
+        if not self.grab():
+            return False, image
+        return self.retrieve(image)
+
+    def get(self, prop_id: int) -> float:
+        """Return a capture property, see cv2.VideoCapture.get."""
+        return _get_property(self, prop_id, len(self.files))
+
+    def set(self, prop_id: int, value: float) -> bool:
+        """Set a capture property, only the frame rate and position can be changed."""
+        return _set_property(self, prop_id, value)
+
+    def release(self) -> None:
+        """Release the source."""
+        self.opened = False
+
+
+class SyntheticCapture:
+    """A cv2.VideoCapture like source generating deterministic frames.
+
+    Every frame is a fixed noise background with a square moving across it, so a given
+    seed always produces the same sequence and the frames change like a real scene.
+    """
+
+    def __init__(
+        self,
+        width: int,
+        height: int,
+        fps: int = 30,
+        seed: int = 0,
+        frame_count: int = 0,
+    ) -> None:
+        """Initialize the SyntheticCapture.
+
+        Args:
+            width (int): The width of the generated frames.
+            height (int): The height of the generated frames.
+            fps (int): The frame rate reported for the sequence.
+            seed (int): The seed of the background noise.
+            frame_count (int): The number of frames to generate, endless if 0.
+        """
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.frame_count = frame_count
+        self.position = 0
+        self.opened = True
+        rng = np.random.default_rng(seed)
+        self.background = cv2.UMat(
+            rng.integers(0, 256, size=(height, width, 3), dtype=np.uint8)
+        )
+
+    def isOpened(self) -> bool:
+        """Check if the source is still generating frames."""
+        return self.opened
+
+    def grab(self) -> bool:
+        """Move to the next frame.
+
+        Returns:
+            bool: False when frame_count frames were generated.
+        """
+        if not self.opened or (self.frame_count and self.position >= self.frame_count):
+            return False
+        self.position += 1
+        return True
+
+    def retrieve(self, image: Optional[Any] = None) -> Tuple[bool, Any]:
+        """Render the frame moved to by the last grab.
+
+        Args:
+            image (Optional[Any]): A buffer to render into, reused when possible.
+
+        Returns:
+            A tuple containing the success state and the frame.
+        """
+        if self.position == 0:
+            return False, image
+        frame = cv2.copyTo(self.background, None, image)
+        side = max(1, min(self.width, self.height) // 6)
+        index = self.position - 1
+        x = (index * 8) % max(1, self.width - side)
+        y = (index * 4) % max(1, self.height - side)
+        cv2.rectangle(frame, (x, y), (x + side, y + side), (0, 255, 255), -1)
+        cv2.putText(
+            frame,
+            str(index),
+            (10, self.height - 10),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            1.0,
+            (255, 255, 255),
+            2,
+        )
+        return True, frame
+
+    def read(self, image: Optional[Any] = None) -> Tuple[bool, Any]:
+        """Grab and render the next frame."""
+        if not self.grab():
+            return False, image
+        return self.retrieve(image)
+
+    def get(self, prop_id: int) -> float:
+        """Return a capture property, see cv2.VideoCapture.get."""
+        return _get_property(self, prop_id, self.frame_count)
+
+    def set(self, prop_id: int, value: float) -> bool:
+        """Set a capture property, only the frame rate and position can be changed."""
+        return _set_property(self, prop_id, value)
+
+    def release(self) -> None:
+        """Release the source."""
+        self.opened = False
+
+
+CaptureSource = Union[cv2.VideoCapture, ImageDirectoryCapture, SyntheticCapture]
+
+
+def open_capture(
+    path: Union[int, str],
+    backend: CaptureBackend,
+    width: int,
+    height: int,
+    fps: int,
+) -> CaptureSource:
+    """Open a video source with the given backend.
+
+    Args:
+        path (Union[int, str]): The camera index, URL, file or directory to open. For the
+            synthetic backend an integer path is used as the seed.
+        backend (CaptureBackend): The backend to open the path with, see resolve_backend.
+        width (int): The requested frame width.
+        height (int): The requested frame height.
+        fps (int): The requested frame rate.
+
+    Returns:
+        CaptureSource: A source exposing the cv2.VideoCapture interface.
+    """
+    backend = resolve_backend(path, backend)
+    match backend:
+        case CaptureBackend.SYNTHETIC:
+            seed = path if isinstance(path, int) else 0
+            return SyntheticCapture(width, height, fps, seed)
+        case CaptureBackend.IMAGES:
+            return ImageDirectoryCapture(str(path), fps)
+        case CaptureBackend.AUTO:
+            return cv2.VideoCapture(path, cv2.CAP_ANY)
+        case _:
+            return cv2.VideoCapture(path, _API_PREFERENCES[backend])
+
+
+def list_capture_devices() -> dict[str, int]:
+    """List the cameras without the Windows only device extension.
+
+    Only Video4Linux devices can be enumerated this way, other platforms return nothing.
+
+    Returns:
+        A dictionary mapping the camera names to their indices.
+    """
+    cameras: dict[str, int] = {}
+    devices: List[str] = glob.glob("/dev/video*")
+    for path in sorted(devices, key=lambda p: int(p[len("/dev/video") :] or 0)):
+        index = int(path[len("/dev/video") :] or 0)
+        name = f"video{index}"
+        try:
+            with open(f"/sys/class/video4linux/video{index}/name") as sysfs:
+                name = f"{sysfs.read().strip()} ({name})"
+        except OSError:
+            pass
+        cameras[name] = index
+    return cameras
+
+
+def _copy_into(frame: Image, image: Optional[Any]) -> Any:
+    # Copy into the caller buffer when it is a UMat, so the caller keeps device memory
+    if isinstance(image, cv2.UMat):
+        return cv2.copyTo(frame, None, image)
+    return frame
+
+
+def _get_property(
+    source: Union[ImageDirectoryCapture, SyntheticCapture], prop_id: int, count: int
+) -> float:
+    match prop_id:
+        case cv2.CAP_PROP_FRAME_WIDTH:
+            return float(source.width)
+        case cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(source.height)
+        case cv2.CAP_PROP_FPS:
+            return float(source.fps)
+        case cv2.CAP_PROP_FRAME_COUNT:
+            return float(count)
+        case cv2.CAP_PROP_POS_FRAMES:
+            return float(source.position)
+        case _:
+            return 0.0
+
+
+def _set_property(
+    source: Union[ImageDirectoryCapture, SyntheticCapture], prop_id: int, value: float
+) -> bool:
+    match prop_id:
+        case cv2.CAP_PROP_FPS:
+            source.fps = int(value)
+        case cv2.CAP_PROP_POS_FRAMES:
+            source.position = int(value)
+        case _:
+            return False
+    return True
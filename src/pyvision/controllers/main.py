@@ -1,11 +1,14 @@
 """Main controller class for the application."""
 
-from typing import TypedDict
+from typing import NotRequired, TypedDict
 
 from pyvision.controllers.video import VideoController
 from pyvision.models.camera import CameraModel
+from pyvision.models.engines import DetectorSettings
 from pyvision.models.opencv_stream import OpenCVVideoStream
 from pyvision.models.stream import StreamModel
+from pyvision.utils.profiling import FrameProfiler
+from pyvision.utils.startup import startup
 from pyvision.views.main import View
 
 
@@ -14,6 +17,9 @@ class AppConfig(TypedDict):
 
     stream_provider: OpenCVVideoStream
     camera_model: CameraModel
+    detector: NotRequired[DetectorSettings]
+    verbose: NotRequired[bool]
+    profiler: NotRequired[FrameProfiler]
 
 
 class Controller:
@@ -27,11 +33,18 @@ class Controller:
         """
         self.config = config
         self.view = View()  # This hold all the views from the application
+        startup.mark("view")
 
         self.stream_model = StreamModel(config.get("stream_provider"))
+        startup.mark("stream")
         self.camera_model = config.get("camera_model")
         self.video_controller = VideoController(
-            self.view, self.stream_model, self.camera_model
+            self.view,
+            self.stream_model,
+            self.camera_model,
+            config.get("detector"),
+            config.get("verbose", False),
+            config.get("profiler"),
         )
 
     def run(self):
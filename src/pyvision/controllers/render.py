@@ -0,0 +1,147 @@
+"""A module rendering the processed frames from a thread of its own.
+
+Drawing a frame (the color conversion, the blit and the display update) used to run on
+the processing thread, adding its cost to the latency of every frame. The RenderLoop
+takes it off that thread: the processing thread only hands the processed pixels over
+through a ring buffer, and the render thread shows the newest frame at most at the display rate,
+dropping the frames processed in between.
+"""
+
+import threading
+import timeit
+import traceback
+from typing import Callable, Optional
+
+import numpy as np
+from numpy.typing import NDArray
+
+from pyvision.models.frame import Frame, Location
+from pyvision.utils.metrics import metrics
+from pyvision.utils.ring_buffer import DropPolicy, RingBuffer
+
+
+class RenderLoop:
+    """Render the newest published frame at a paced rate, from a thread.
+
+    The duration of every render is recorded in the display histogram of the metrics,
+    and the time between two shown frames in display/frame-time.
+
+    Attributes:
+        render (Callable[[Frame], None]): Called with every frame shown.
+        max_fps (int): The maximum number of frames shown per second.
+        frames (RingBuffer[Optional[NDArray]]): The pixels of the published frames.
+        shown (int): The number of frames rendered.
+        error (Optional[BaseException]): The exception raised by render that stopped
+            the render thread, None while it runs.
+    """
+
+    def __init__(self, render: Callable[[Frame], None], max_fps: int = 30) -> None:
+        """Initialize the RenderLoop.
+
+        Args:
+            render (Callable[[Frame], None]): Called with every frame shown, from the
+                render thread.
+            max_fps (int): The maximum number of frames shown per second.
+
+        Raises:
+            ValueError: If max_fps is not positive.
+        """
+        if max_fps <= 0:
+            raise ValueError("max_fps must be greater than 0")
+        self.render = render
+        self.max_fps = max_fps
+        # Three slots: the one shown, the newest one and the one being written
+        self.frames: RingBuffer[Optional[NDArray]] = RingBuffer(
+            3, lambda: None, DropPolicy.LATEST_ONLY
+        )
+        self.shown = 0
+        self.error: Optional[BaseException] = None
+        self.render_latency = metrics.histogram("display")
+        self.frame_time = metrics.histogram("display/frame-time")
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def dropped(self) -> int:
+        """Return the number of published frames that were never shown."""
+        return self.frames.dropped
+
+    @property
+    def running(self) -> bool:
+        """Return whether the render thread is running, False once render failed."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def publish(self, frame: Frame) -> None:
+        """Hand a processed frame to the render thread, replacing any unshown one.
+
+        A frame left on the device is downloaded into an array of its own, which the
+        slot takes over as is. The pixels of a host frame are copied, the pipeline
+        reusing its buffers for the next frame.
+
+        Args:
+            frame (Frame): The processed frame.
+        """
+        if not self.running:
+            return  # Nobody to show it
+        downloaded = frame.location is Location.DEVICE
+        image = frame.host()
+        slot = self.frames.acquire(timeout=0.0)
+        if slot is None:  # Closed
+            return
+        index, buffer = slot
+        if downloaded:
+            buffer = image
+        else:
+            if (
+                buffer is None
+                or buffer.shape != image.shape
+                or buffer.dtype != image.dtype
+            ):
+                buffer = np.empty_like(image)  # First frame or resolution change
+            np.copyto(buffer, image)
+        self.frames.commit(index, buffer)
+
+    def start(self) -> None:
+        """Start the render thread."""
+        if self.running:
+            return
+        self._stop.clear()
+        self.error = None
+        self.frames.reset()
+        self._thread = threading.Thread(target=self._loop, name="render", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the render thread, once the frame being rendered is shown."""
+        self._stop.set()
+        self.frames.close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _loop(self) -> None:
+        interval = 1.0 / self.max_fps
+        last_sequence = -1
+        last_shown: Optional[float] = None
+        while not self._stop.is_set():
+            slot = self.frames.read(timeout=interval)
+            if slot is None or slot[0] == last_sequence:
+                continue  # Nothing new processed since the last frame shown
+            last_sequence, image = slot
+            start = timeit.default_timer()
+            try:
+                self.render(Frame(image, last_sequence))  # type: ignore
+            except Exception as error:
+                # Stop rather than fail on every frame, the display staying frozen
+                self.error = error
+                traceback.print_exc()
+                print(f"render loop stopped, the display is frozen: {error}")
+                return
+            end = timeit.default_timer()
+            self.render_latency.record(end - start)
+            if last_shown is not None:
+                self.frame_time.record(start - last_shown)
+            last_shown = start
+            self.shown += 1
+            # Pace the display, the frames published meanwhile replace each other
+            self._stop.wait(interval - (end - start))
@@ -1,43 +1,72 @@
 """This module contains the VideoController class."""
 
-import os
 import threading
-from typing import Any, Tuple
-
-# Otherwise, torch backend will spit out a lot of debug messages
-os.environ["YOLO_VERBOSE"] = "False"
-
-from ultralytics import YOLO  # type: ignore
+import timeit
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Optional, Tuple
 
+from pyvision.controllers.render import RenderLoop
+from pyvision.models import ImageProcessingStrategy
 from pyvision.models.camera import CameraModel
+from pyvision.models.engines import DetectorSettings, create_engine
 from pyvision.models.filters import (
     NoOpFilter,
 )
+from pyvision.models.frame import Frame
 from pyvision.models.opencv_stream import ReadError
+from pyvision.models.scheduler import DetectionScheduler
 from pyvision.models.stream import StreamModel
-from pyvision.models.yolo import YoloObjectDetection
-from pyvision.utils import check_file_exists, download_to
+from pyvision.models.tracker import ObjectTracking
+from pyvision.models.yolo import DetectionAnnotation, YoloObjectDetection
 from pyvision.utils.fps import FPS
+from pyvision.utils.metrics import metrics
 from pyvision.utils.observer import Observer, Subject
+from pyvision.utils.profiling import FrameProfiler
+from pyvision.utils.startup import startup
 from pyvision.views.main import CameraSelectionType, View
 
+# The time between two refreshes of the latencies and counts of the overlay, in seconds
+HUD_INTERVAL = 1.0
+
 
 # The VideoController is an observer of the VideoModel and controls the video stream.
 class VideoController(Observer):
     """The VideoController class controls the video stream and updates the frame."""
 
-    def __init__(self, view: View, model: StreamModel, camera_model: CameraModel):
+    def __init__(
+        self,
+        view: View,
+        model: StreamModel,
+        camera_model: CameraModel,
+        detector: Optional[DetectorSettings] = None,
+        verbose: bool = False,
+        profiler: Optional[FrameProfiler] = None,
+    ):
         """Initialize the VideoController.
 
+        The YOLO model is loaded in the background: the raw stream is shown meanwhile,
+        and the detection stages are added to the pipeline once the model is ready.
+
         Args:
             view (VideoView): The view to update with the new frame.
             model (VideoModel): The model to observe for new frames.
             camera_model (CameraModel): The camera model to observe for camera changes.
+            detector (Optional[DetectorSettings]): The settings of the detection model,
+                the default weights through ultralytics if None.
+            verbose (bool): Whether to print the summary of the YOLO model.
+            profiler (Optional[FrameProfiler]): The profiler told about every frame.
 
         """
         self.view = view
         self.model = model
         self.camera_model = camera_model
+        self.verbose = verbose
+        self.profiler = profiler
+        self.capture_latency = metrics.histogram("capture")
+        self._hud_updated = 0.0
+
+        # Render from a thread of its own, so that drawing never holds up processing
+        self.renderer = RenderLoop(self.view.video_view.update_frame, self.model.fps)
 
         # To manage the camera
         self.camera_model.attach(self)
@@ -54,28 +83,55 @@ class VideoController(Observer):
         # Actions hastable to call the corresponding function based on the subject
         self.actions = {
             self.fps: lambda: self.view.video_view.update_fps(self.fps.get_fps()),
-            self.model: lambda: self.view.video_view.update_frame(self.model.frame),
+            self.model: self.show_frame,
             self.camera_model: self.handle_camera_update,
         }
 
-        # Load Yolo pretrained model
-        self.model_path = "yolo/yolov9t.pt"
-        # Check if the model exists, if not download it
-        if not check_file_exists(self.model_path):
-            download_to(
-                self.model_path,
-                "https://github.com/ultralytics/assets/releases/download/v8.2.0/yolov9t.pt",
-            )
-
-        yolo_model = YOLO(self.model_path, verbose=False)
-        print(f"info: {yolo_model.info()}")
-
-        # Add filters to the model
-        self.model.add_filter(
-            YoloObjectDetection(model=yolo_model, wrapped=NoOpFilter()).process
-        )
+        # Load Yolo pretrained model without holding up the first frames
+        self.detector_settings: DetectorSettings = detector or {}
+        self.scheduler: Optional[DetectionScheduler] = None
+        executor = ThreadPoolExecutor(1, "model-loader")
+        self._loading: Optional[Future] = executor.submit(self.load_detection)
+        executor.shutdown(wait=False)
         self._bind()
 
+    def load_detection(self) -> ImageProcessingStrategy:
+        """Load and warm up the YOLO model, then build the detection stages.
+
+        Returns:
+            ImageProcessingStrategy: The stages to append to the pipeline.
+        """
+        engine = create_engine(self.detector_settings)
+        startup.mark("model loaded")
+        if self.verbose:
+            print(f"info: {engine.describe()}")
+        engine.warm_up(self.model.width, self.model.height)
+        startup.mark("model warmed up")
+
+        # Detect in the background so that the display is never held up
+        self.scheduler = DetectionScheduler(
+            YoloObjectDetection(model=engine, wrapped=NoOpFilter()),
+            asynchronous=True,
+        )
+        # Track the objects so that their boxes move between two detections
+        return DetectionAnnotation(ObjectTracking(self.scheduler))
+
+    def _install_detection(self) -> None:
+        """Append the detection stages to the pipeline once the model is loaded.
+
+        Called from the update thread, between two frames.
+        """
+        if self._loading is None or not self._loading.done():
+            return
+        loading, self._loading = self._loading, None
+        try:
+            self.model.add_filter(loading.result())
+        except Exception as error:
+            print(f"detection disabled, the model failed to load: {error}")
+            return
+        startup.mark("detection")
+        print(startup.report())
+
     def _bind(self):
         """Bind the view events to the controller methods."""
         self.view.root.protocol("WM_DELETE_WINDOW", self.stop)
@@ -105,8 +161,10 @@ class VideoController(Observer):
         This method continuously reads frames from the video stream and updates the frame attribute.
 
         """
+        last_sequence = -1
         while not self.stop_event.is_set():
-            ret, frame = self.model.stream.read_frame()
+            before = timeit.default_timer()
+            ret, frame = self.model.stream.read_frame(timeout=1.0 / self.model.fps)
             match ret:
                 case ReadError.NO_FRAME:
                     continue  # Allow some frame to be dropped (usefull when switching cameras)
@@ -119,8 +177,40 @@ class VideoController(Observer):
                     self.stop_thread()
                     return
                 case ReadError.NO_ERROR:
-                    self.model.process(frame.get())
-                    self.fps.update(throttle=True)
+                    if self.model.stream.sequence == last_sequence:
+                        continue  # No new frame grabbed since the last one processed
+                    last_sequence = self.model.stream.sequence
+                    self.capture_latency.record(timeit.default_timer() - before)
+                    self.model.process(Frame(frame, last_sequence))
+                    self.fps.update()
+                    self._after_frame()
+
+    def _after_frame(self) -> None:
+        """Run the per frame bookkeeping of the update thread."""
+        if self.profiler is not None:
+            self.profiler.on_frame()
+        now = timeit.default_timer()
+        if now - self._hud_updated >= HUD_INTERVAL:
+            self._hud_updated = now
+            self.update_hud()
+        if self._loading is not None:
+            startup.mark("first frame")
+            self._install_detection()
+
+    def update_hud(self) -> None:
+        """Show the p95 latency of every stage and the detection count."""
+        for name, summary in metrics.summary().items():
+            if summary["count"]:
+                self.view.video_view.update_overlay(
+                    name, f"{name} p95 {summary['p95']:.1f} ms"
+                )
+        if self.scheduler is not None:
+            count = len(self.scheduler.detections)
+            self.view.video_view.update_overlay("detections", f"{count} detections")
+
+    def show_frame(self) -> None:
+        """Hand the last processed frame to the render thread."""
+        self.renderer.publish(self.model.frame)
 
     def start(self):
         """Start the video stream.
@@ -132,6 +222,7 @@ class VideoController(Observer):
         if self.stop_event.is_set():
             self.stop_event.clear()
 
+        self.renderer.start()
         self.update_thread: threading.Thread = threading.Thread(target=self.update)
         self.update_thread.start()
         return self
@@ -150,10 +241,19 @@ class VideoController(Observer):
         """Stop the video stream and destroy the view."""
         print("stopping the video stream and destroying the view")
         self.stop_thread()
+        self.renderer.stop()
+        print(
+            f"display: {self.renderer.shown} frames shown,"
+            f" {self.renderer.dropped} dropped"
+        )
         self.view.root.destroy()
         self.model.detach(self)
         self.camera_model.detach(self)
         self.fps.detach(self)
+        if self.scheduler is not None:
+            self.scheduler.close()
+        if self.profiler is not None:
+            self.profiler.stop()  # The window may not be over
         self.model.release()
 
     def notify_update(
@@ -0,0 +1,761 @@
+"""Headless entry point running the processing pipeline without any display.
+
+The stream is processed as fast as it is produced and the results are written to a
+sink (detections as JSON lines, an annotated video or nothing). A throughput and
+latency report is printed once the stream ends or the frame budget is reached.
+
+Example:
+    python -m pyvision.headless --source clip.mp4 --model yolo/yolov9t.pt \
+        --sink jsonl --output detections.jsonl
+"""
+
+import argparse
+import functools
+import json
+import os
+import timeit
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any, List, Optional, Sequence, TextIO, Tuple, Union
+
+import cv2
+
+from pyvision.camera.backends import CaptureBackend
+from pyvision.models import ImageProcessingStrategy, filters
+from pyvision.models.engines import (
+    DetectorSettings,
+    Engine,
+    InferenceEngine,
+    Precision,
+    create_engine,
+)
+from pyvision.models.filters import NoOpFilter
+from pyvision.models.frame import Frame, transfers
+from pyvision.models.opencv_stream import OpenCVVideoStream, ReadError, StreamSettings
+from pyvision.models.pipeline import Pipeline
+from pyvision.models.scheduler import DetectionScheduler
+from pyvision.models.stream import StreamModel
+from pyvision.models.workers import WorkerPool
+from pyvision.utils.metrics import LatencyHistogram, metrics
+from pyvision.utils.observer import Observer, Subject
+from pyvision.utils.profiling import FrameProfiler
+from pyvision.utils.startup import startup
+
+if TYPE_CHECKING:
+    from pyvision.models.streams import ManagedStream
+
+
+class Sink(ABC):
+    """Abstract base class for the destinations of the processed frames."""
+
+    @abstractmethod
+    def write(self, sequence: int, frame: Frame, detections: List[Any]) -> None:
+        """Write the result of a processed frame.
+
+        Args:
+            sequence (int): The sequence number of the frame in the stream.
+            frame (Frame): The processed frame.
+            detections (List[Any]): The detections found in the frame.
+        """
+
+    def close(self) -> None:
+        """Flush and release the sink."""
+
+
+class NullSink(Sink):
+    """A sink discarding every result, to measure the pipeline alone."""
+
+    def write(self, sequence: int, frame: Frame, detections: List[Any]) -> None:
+        """Discard the result."""
+
+
+class JsonlSink(Sink):
+    """A sink writing the detections of every frame as a JSON line."""
+
+    def __init__(self, path: str, classes: Optional[Sequence[str]] = None) -> None:
+        """Initialize the JsonlSink.
+
+        Args:
+            path (str): The path of the file to write.
+            classes (Optional[Sequence[str]]): The class names used to label detections.
+        """
+        self.file: TextIO = open(path, "w")
+        self.classes = classes
+
+    def write(self, sequence: int, frame: Frame, detections: List[Any]) -> None:
+        """Write the detections of the frame as one JSON line."""
+        records = []
+        for detection in detections:
+            x1, y1, x2, y2, confidence, class_id = detection[:6]
+            record = {
+                "box": [int(x1), int(y1), int(x2), int(y2)],
+                "confidence": round(float(confidence), 4),
+                "class": int(class_id),
+            }
+            if len(detection) > 6:  # Tracked detections
+                record["track"] = int(detection[6])
+            if self.classes is not None:
+                record["label"] = self.classes[int(class_id)]
+            records.append(record)
+        self.file.write(json.dumps({"frame": sequence, "detections": records}) + "\n")
+
+    def close(self) -> None:
+        """Close the file."""
+        self.file.close()
+
+
+class VideoSink(Sink):
+    """A sink writing the processed frames to a video file."""
+
+    def __init__(self, path: str, fps: int, fourcc: str = "mp4v") -> None:
+        """Initialize the VideoSink.
+
+        Args:
+            path (str): The path of the video to write.
+            fps (int): The frame rate of the video.
+            fourcc (str): The codec of the video.
+        """
+        self.path = path
+        self.fps = fps
+        self.fourcc = cv2.VideoWriter.fourcc(*fourcc)
+        self.writer: Optional[cv2.VideoWriter] = None
+
+    def write(self, sequence: int, frame: Frame, detections: List[Any]) -> None:
+        """Append the frame to the video, opened with the size of the first frame."""
+        image = frame.host()
+        if image.ndim == 2:
+            image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+        if self.writer is None:
+            height, width = image.shape[:2]
+            self.writer = cv2.VideoWriter(
+                self.path, self.fourcc, self.fps, (width, height)
+            )
+        self.writer.write(image)
+
+    def close(self) -> None:
+        """Finalize the video file."""
+        if self.writer is not None:
+            self.writer.release()
+
+
+class HeadlessRunner:
+    """Drive a StreamModel without any view and report its performance.
+
+    Attributes:
+        frames (int): The number of frames processed.
+        elapsed (float): The wall time spent in run, in seconds.
+        stage_times (dict[str, LatencyHistogram]): The latencies of the capture, the
+            processing and the sink, also in the metrics registry.
+    """
+
+    def __init__(
+        self,
+        model: StreamModel,
+        sink: Sink,
+        detector: Optional[Any] = None,
+        pool: Optional[WorkerPool] = None,
+        profiler: Optional[FrameProfiler] = None,
+    ) -> None:
+        """Initialize the HeadlessRunner.
+
+        Args:
+            model (StreamModel): The model holding the stream and the filters.
+            sink (Sink): Where to write the processed frames.
+            detector (Optional[Any]): The detection stage, whose detections are sent
+                to the sink.
+            pool (Optional[WorkerPool]): The worker processes running the stages, in
+                place of the filters of the model, if any.
+            profiler (Optional[FrameProfiler]): The profiler told about every frame.
+        """
+        self.model = model
+        self.sink = sink
+        self.detector = detector
+        self.pool = pool
+        self.profiler = profiler
+        self.frames = 0
+        self.elapsed = 0.0
+        self.stage_times: dict[str, LatencyHistogram] = {
+            stage: metrics.histogram(stage) for stage in ("capture", "process", "sink")
+        }
+
+    def run(self, max_frames: int = 0) -> None:
+        """Process the stream until it ends or max_frames frames were processed.
+
+        Args:
+            max_frames (int): The number of frames to process, unbounded if 0.
+        """
+        if self.pool is not None:
+            self._run_pool(self.pool, max_frames)
+            return
+
+        last_sequence = -1
+        start = timeit.default_timer()
+        while not max_frames or self.frames < max_frames:
+            before = timeit.default_timer()
+            ret, frame = self.model.stream.read_frame(timeout=1.0)
+            if ret is ReadError.NO_STREAM:
+                break
+            if ret is not ReadError.NO_ERROR:
+                continue
+            if self.model.stream.sequence == last_sequence:
+                continue  # No new frame grabbed since the last one processed
+            last_sequence = self.model.stream.sequence
+            after_capture = timeit.default_timer()
+
+            self.model.process(Frame(frame, last_sequence))
+            after_process = timeit.default_timer()
+            if not self.frames:
+                startup.mark("first frame")
+
+            detections = self.detector.detections if self.detector else []
+            self.sink.write(last_sequence, self.model.frame, detections)
+            after_sink = timeit.default_timer()
+
+            self.stage_times["capture"].record(after_capture - before)
+            self.stage_times["process"].record(after_process - after_capture)
+            self.stage_times["sink"].record(after_sink - after_process)
+            self._count_frame()
+        self.elapsed = timeit.default_timer() - start
+
+    def _run_pool(self, pool: WorkerPool, max_frames: int) -> None:
+        # Keep every slot of the pool busy, then write the results in order. The
+        # process time of a frame is the time from its submission to its result.
+        last_sequence = -1
+        submitted: dict[int, float] = {}
+        ended = False
+        start = timeit.default_timer()
+        while True:
+            budget = not max_frames or len(submitted) + self.frames < max_frames
+            while not ended and budget and not pool.full():
+                before = timeit.default_timer()
+                ret, frame = self.model.stream.read_frame(
+                    timeout=0.0 if len(pool) else 1.0
+                )
+                if ret is ReadError.NO_STREAM:
+                    ended = True
+                if ret is not ReadError.NO_ERROR:
+                    break
+                if self.model.stream.sequence == last_sequence:
+                    break  # Nothing new yet, collect the results meanwhile
+                last_sequence = self.model.stream.sequence
+                pool.submit(last_sequence, Frame(frame, last_sequence).host())
+                submitted[last_sequence] = timeit.default_timer()
+                self.stage_times["capture"].record(submitted[last_sequence] - before)
+                budget = not max_frames or len(submitted) + self.frames < max_frames
+
+            if not len(pool):
+                if ended or not budget:
+                    break
+                continue
+            result = pool.collect(timeout=None if ended or not budget else 0.01)
+            if result is None:
+                continue
+            sequence, image, detections = result
+            after_process = timeit.default_timer()
+            if not self.frames:
+                startup.mark("first frame")
+            self.sink.write(
+                sequence,
+                Frame(image, sequence),
+                [] if detections is None else detections,
+            )
+            self.stage_times["process"].record(after_process - submitted.pop(sequence))
+            self.stage_times["sink"].record(timeit.default_timer() - after_process)
+            self._count_frame()
+        self.elapsed = timeit.default_timer() - start
+
+    def _count_frame(self) -> None:
+        self.frames += 1
+        if self.profiler is not None:
+            self.profiler.on_frame()
+
+    def report(self) -> str:
+        """Format the throughput and the per stage latencies of the last run.
+
+        Returns:
+            str: The human readable report.
+        """
+        fps = self.frames / self.elapsed if self.elapsed > 0 else 0.0
+        lines = [f"{self.frames} frames in {self.elapsed:.2f}s ({fps:.1f} FPS)"]
+        lines.append(metrics.report())
+        stream = self.model.stream
+        # Replayed sources never drop frames, live ones drop the stale ones
+        lines.append(
+            f"  capture    {stream.grabbed_frames} grabbed"
+            f" {stream.dropped_frames} dropped"
+        )
+        if self.frames:
+            lines.append(
+                f"  transfers  {transfers.uploads / self.frames:.2f} uploads"
+                f" {transfers.downloads / self.frames:.2f} downloads per frame"
+                f" ({transfers.bytes / self.frames / 1e6:.2f} MB)"
+            )
+        return "\n".join(lines)
+
+
+def build_filters(names: Sequence[str]) -> ImageProcessingStrategy:
+    """Chain the filters of pyvision.models.filters by their class names.
+
+    Args:
+        names (Sequence[str]): The class names, the first one being applied first.
+
+    Returns:
+        ImageProcessingStrategy: The chained filters.
+    """
+    strategy: ImageProcessingStrategy = NoOpFilter()
+    for name in names:
+        filter_class = getattr(filters, name, None)
+        if filter_class is None:
+            raise ValueError(f"unknown filter: {name}")
+        strategy = filter_class(strategy)
+    return strategy
+
+
+def detector_settings(args: argparse.Namespace) -> DetectorSettings:
+    """Return the settings of the detection model given on the command line."""
+    return {
+        "engine": Engine(args.engine),
+        "model_path": args.model,
+        "input_size": args.input_size,
+        "precision": Precision(args.precision),
+        "threads": args.threads,
+    }
+
+
+def load_detector(settings: DetectorSettings, wrapped: ImageProcessingStrategy) -> Any:
+    """Load the YOLO detection stage.
+
+    Args:
+        settings (DetectorSettings): The settings of the detection model.
+        wrapped (ImageProcessingStrategy): The filters applied before the detection.
+
+    Returns:
+        YoloObjectDetection: The detection stage.
+    """
+    from pyvision.models.yolo import YoloObjectDetection
+
+    return YoloObjectDetection(model=load_engine(settings), wrapped=wrapped)
+
+
+def load_engine(settings: DetectorSettings) -> InferenceEngine:
+    """Load the engine running the YOLO model and warm it up.
+
+    Args:
+        settings (DetectorSettings): The settings of the detection model.
+
+    Returns:
+        InferenceEngine: The engine.
+    """
+    engine = create_engine(settings)
+    startup.mark("model loaded")
+    size = settings.get("input_size", 640)
+    engine.warm_up(size, size)
+    startup.mark("model warmed up")
+    return engine
+
+
+def build_detection(
+    args: argparse.Namespace, wrapped: ImageProcessingStrategy
+) -> Tuple[Any, Optional[DetectionScheduler]]:
+    """Build the detection stages requested on the command line.
+
+    Args:
+        args (argparse.Namespace): The parsed command line.
+        wrapped (ImageProcessingStrategy): The filters applied before the detection.
+
+    Returns:
+        The last detection stage, whose detections are sent to the sink, and the
+        scheduler of the detection if any, to close once the stream ends.
+    """
+    detector = load_detector(detector_settings(args), wrapped)
+    if args.motion_roi:
+        from pyvision.models.motion import MotionGatedDetection
+
+        detector = MotionGatedDetection(detector)
+    scheduler = None
+    if (
+        args.detect_every > 1
+        or args.motion_threshold is not None
+        or args.async_detection
+    ):
+        detector = scheduler = DetectionScheduler(
+            detector, args.detect_every, args.motion_threshold, args.async_detection
+        )
+    if args.track:
+        from pyvision.models.tracker import ObjectTracking
+
+        detector = ObjectTracking(detector)
+    return detector, scheduler
+
+
+def build_worker_stages(
+    filter_names: Sequence[str], settings: Optional[DetectorSettings], annotate: bool
+) -> Tuple[ImageProcessingStrategy, Optional[Any]]:
+    """Build the stages run by every worker process of a WorkerPool.
+
+    Args:
+        filter_names (Sequence[str]): The class names of the filters.
+        settings (Optional[DetectorSettings]): The settings of the detection model, no
+            detection if None.
+        annotate (bool): Whether to draw the detections on the frames.
+
+    Returns:
+        The stages and the detection stage, if any.
+    """
+    strategy = build_filters(filter_names)
+    if settings is None:
+        return strategy, None
+    detector = load_detector(settings, strategy)
+    if annotate:
+        from pyvision.models.yolo import DetectionAnnotation
+
+        return DetectionAnnotation(detector), detector
+    return detector, detector
+
+
+def build_sink(
+    kind: str, output: str, fps: int, classes: Optional[Sequence[str]]
+) -> Sink:
+    """Build the sink requested on the command line.
+
+    Args:
+        kind (str): The kind of sink, null, jsonl or video.
+        output (str): The path of the file the sink writes.
+        fps (int): The frame rate of the stream.
+        classes (Optional[Sequence[str]]): The class names used to label detections.
+
+    Returns:
+        Sink: The sink.
+    """
+    match kind:
+        case "jsonl":
+            return JsonlSink(output, classes)
+        case "video":
+            return VideoSink(output, fps)
+        case _:
+            return NullSink()
+
+
+def stream_settings(args: argparse.Namespace, source: str) -> StreamSettings:
+    """Return the settings of the stream of a source given on the command line."""
+    return {
+        "path": parse_source(source),
+        "width": args.width,
+        "height": args.height,
+        "desired_fps": args.fps,
+        "backend": CaptureBackend(args.backend),
+        "max_frames": args.max_frames,
+    }
+
+
+class SinkObserver(Observer):
+    """Write the frames processed by a managed stream to a sink."""
+
+    def __init__(self, managed: "ManagedStream", sink: Sink) -> None:
+        """Initialize the SinkObserver and attach it to the model of the stream.
+
+        Args:
+            managed (ManagedStream): The stream.
+            sink (Sink): Where to write its processed frames.
+        """
+        self.managed = managed
+        self.sink = sink
+        managed.model.attach(self)
+
+    def notify_update(
+        self, subject: Subject, *args: Tuple[Any], **kwargs: dict[str, Any]
+    ) -> None:
+        """Write the frame the model just processed."""
+        frame = self.managed.model.frame
+        self.sink.write(frame.sequence, frame, self.managed.detections)
+
+
+def run_streams(args: argparse.Namespace) -> None:
+    """Run every source at once, sharing the model, until they all end.
+
+    Args:
+        args (argparse.Namespace): The parsed command line.
+    """
+    from pyvision.models.streams import StreamManager
+
+    engine = load_engine(detector_settings(args)) if args.model else None
+    manager = StreamManager(engine, functools.partial(build_filters, args.filter))
+    observers = []
+    for index, source in enumerate(args.source):
+        managed = manager.add(
+            str(index),
+            OpenCVVideoStream(**stream_settings(args, source)),
+            args.priority[index] if index < len(args.priority) else 0,
+            args.max_fps[index] if index < len(args.max_fps) else 0.0,
+        )
+        output = ""
+        if args.output:
+            stem, extension = os.path.splitext(args.output)
+            output = f"{stem}.{index}{extension}"
+        classes = managed.detector.classes if managed.detector else None
+        sink = build_sink(args.sink, output, managed.model.fps, classes)
+        observers.append(SinkObserver(managed, sink))
+
+    instrument(args)
+    start = timeit.default_timer()
+    manager.start()
+    try:
+        manager.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        elapsed = timeit.default_timer() - start
+        print("\n".join(manager.report()))
+        manager.stop()
+        metrics.stop_dump()
+        for observer in observers:
+            observer.sink.close()
+    print(f"{len(observers)} streams in {elapsed:.2f}s")
+
+
+def instrument(args: argparse.Namespace) -> Optional[FrameProfiler]:
+    """Start the periodic dump of the metrics and build the profiler, if requested.
+
+    Args:
+        args (argparse.Namespace): The parsed command line.
+
+    Returns:
+        Optional[FrameProfiler]: The profiler, None if no frame is to be profiled.
+    """
+    if args.metrics_file:
+        metrics.start_dump(args.metrics_file, args.metrics_interval)
+    if not args.profile:
+        return None
+    return FrameProfiler(
+        args.profile, args.profile_start, args.profile_output, args.trace_memory
+    )
+
+
+def parse_source(source: str) -> Union[int, str]:
+    """Return the source as a camera index when it is a number."""
+    return int(source) if source.isdigit() else source
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    """Parse and check the command line.
+
+    Args:
+        argv (Optional[Sequence[str]]): The command line arguments, sys.argv if None.
+
+    Returns:
+        argparse.Namespace: The parsed command line.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--source",
+        action="append",
+        help="camera index, URL, file, directory or synthetic, can be repeated to run"
+        " several streams sharing the model",
+    )
+    parser.add_argument(
+        "--priority",
+        action="append",
+        type=int,
+        default=[],
+        help="inference priority of the n-th source, higher first",
+    )
+    parser.add_argument(
+        "--max-fps",
+        action="append",
+        type=float,
+        default=[],
+        help="frames processed per second at most for the n-th source",
+    )
+    parser.add_argument(
+        "--backend",
+        default=CaptureBackend.AUTO.value,
+        choices=[backend.value for backend in CaptureBackend],
+    )
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--fps", type=int, default=30)
+    parser.add_argument("--max-frames", type=int, default=0)
+    parser.add_argument(
+        "--filter",
+        action="append",
+        default=[],
+        help="class name of a filter in pyvision.models.filters, can be repeated",
+    )
+    parser.add_argument(
+        "--model", help="YOLO weights or ONNX model, no detection if omitted"
+    )
+    parser.add_argument(
+        "--engine",
+        default=Engine.ULTRALYTICS.value,
+        choices=[engine.value for engine in Engine],
+        help="engine running the model, the ONNX ones export the weights once",
+    )
+    parser.add_argument(
+        "--input-size", type=int, default=640, help="side of the model input"
+    )
+    parser.add_argument(
+        "--precision",
+        default=Precision.FP32.value,
+        choices=[precision.value for precision in Precision],
+    )
+    parser.add_argument(
+        "--threads", type=int, default=0, help="inference threads, 0 for the default"
+    )
+    parser.add_argument(
+        "--detect-every", type=int, default=1, help="frames between two detections"
+    )
+    parser.add_argument(
+        "--motion-threshold", type=float, help="motion score forcing a detection"
+    )
+    parser.add_argument(
+        "--motion-roi",
+        action="store_true",
+        help="detect in the moving regions only, not at all when nothing moves",
+    )
+    parser.add_argument(
+        "--track", action="store_true", help="track the detections, with ids"
+    )
+    parser.add_argument(
+        "--async-detection",
+        action="store_true",
+        help="detect in the background whenever the model is free",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=0,
+        help="run the filters and the detection in this many processes",
+    )
+    parser.add_argument(
+        "--metrics-file", help="append the latency percentiles to this JSON lines file"
+    )
+    parser.add_argument(
+        "--metrics-interval",
+        type=float,
+        default=10.0,
+        help="seconds between two dumps of the metrics",
+    )
+    parser.add_argument(
+        "--profile", type=int, default=0, help="profile this many frames with cProfile"
+    )
+    parser.add_argument(
+        "--profile-start", type=int, default=30, help="frames to skip before profiling"
+    )
+    parser.add_argument("--profile-output", default="pyvision.prof")
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="also trace the allocations of the profiled frames",
+    )
+    parser.add_argument("--sink", default="null", choices=["null", "jsonl", "video"])
+    parser.add_argument("--output", help="output path of the jsonl and video sinks")
+    args = parser.parse_args(argv)
+
+    if args.sink != "null" and not args.output:
+        parser.error(f"--output is required by the {args.sink} sink")
+    stateful = (
+        args.detect_every > 1
+        or args.motion_threshold is not None
+        or args.async_detection
+        or args.track
+        or args.motion_roi
+    )
+    if args.workers and stateful:
+        parser.error("--workers only runs stages without state between frames")
+    args.source = args.source or ["0"]
+    if len(args.source) > 1 and (stateful or args.workers):
+        parser.error("several sources only run filters and detection on every frame")
+    return args
+
+
+def build_stages(
+    args: argparse.Namespace,
+) -> Tuple[
+    ImageProcessingStrategy, Any, Optional[DetectionScheduler], Optional[WorkerPool]
+]:
+    """Build and check the stages requested on the command line, before any capture.
+
+    Args:
+        args (argparse.Namespace): The parsed command line.
+
+    Returns:
+        The stages run on the frames, the detection stage, the scheduler of the
+        detection and the worker pool running the stages in its place, if any.
+
+    Raises:
+        ValueError: If a filter is unknown or the stages are not compatible.
+    """
+    strategy = build_filters(args.filter)
+    Pipeline([strategy])  # Raises if the filters do not fit together
+    if args.workers:  # Workers build their own stages
+        pool = WorkerPool(
+            functools.partial(
+                build_worker_stages,
+                args.filter,
+                detector_settings(args) if args.model else None,
+                args.sink == "video",
+            ),
+            args.workers,
+        )
+        return strategy, None, None, pool
+    if not args.model:
+        return strategy, None, None, None
+    detector, scheduler = build_detection(args, strategy)
+    strategy = detector
+    if args.sink == "video":  # Boxes are only drawn when the frames are kept
+        from pyvision.models.yolo import DetectionAnnotation
+
+        strategy = DetectionAnnotation(detector)
+    return strategy, detector, scheduler, None
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    """Parse the command line and run the pipeline headless.
+
+    Args:
+        argv (Optional[Sequence[str]]): The command line arguments, sys.argv if None.
+    """
+    args = parse_args(argv)
+    if len(args.source) > 1:
+        run_streams(args)
+        return
+
+    # The capture thread starts last, a failing stage cannot leave it running
+    strategy, detector, scheduler, pool = build_stages(args)
+    classes = None
+    if args.model:
+        from pyvision.models.yolo import load_classes
+
+        classes = load_classes()
+    sink = build_sink(args.sink, args.output, args.fps, classes)
+
+    model, profiler = None, None
+    try:
+        model = StreamModel(OpenCVVideoStream(**stream_settings(args, args.source[0])))
+        startup.mark("stream")
+        if pool is None:
+            model.add_filter(strategy)
+        if isinstance(sink, VideoSink):
+            sink.fps = model.fps  # The rate of the source, not the requested one
+        profiler = instrument(args)
+        runner = HeadlessRunner(model, sink, detector, pool, profiler)
+        try:
+            runner.run(args.max_frames)
+        except KeyboardInterrupt:
+            pass
+    finally:
+        if profiler is not None:
+            profiler.stop()
+        metrics.stop_dump()
+        if scheduler is not None:
+            scheduler.close()
+        if pool is not None:
+            pool.close()
+        sink.close()
+        if model is not None:
+            model.release()
+    print(startup.report())
+    print(runner.report())
+
+
+if __name__ == "__main__":
+    main()
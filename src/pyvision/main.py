@@ -1,7 +1,10 @@
 """Main entry point for the application."""
 
+import argparse
 import os
 
+from pyvision.utils.startup import startup
+
 # TODO: without this, some camera like my logitech c922 takes forever to initialize
 # understand why and see if there's a better fix
 os.environ["OPENCV_VIDEOIO_MSMF_ENABLE_HW_TRANSFORMS"] = "0"
@@ -10,13 +13,51 @@ import cv2
 
 from pyvision.controllers.main import AppConfig, Controller
 from pyvision.models.camera import CameraModel
+from pyvision.models.engines import DetectorSettings, Engine, Precision
 from pyvision.models.opencv_stream import OpenCVVideoStream, StreamSettings
+from pyvision.utils.metrics import metrics
+from pyvision.utils.profiling import FrameProfiler
 
 FRAME_PER_SECONDS = 30
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show and process a camera stream.")
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="print the OpenCV build information and the YOLO model summary",
+    )
+    parser.add_argument("--model", help="YOLO weights or ONNX model")
+    parser.add_argument(
+        "--engine",
+        default=Engine.ULTRALYTICS.value,
+        choices=[engine.value for engine in Engine],
+        help="engine running the model, the ONNX ones export the weights once",
+    )
+    parser.add_argument("--input-size", type=int, default=640)
+    parser.add_argument(
+        "--precision",
+        default=Precision.FP32.value,
+        choices=[precision.value for precision in Precision],
+    )
+    parser.add_argument("--threads", type=int, default=0)
+    parser.add_argument(
+        "--metrics-file", help="append the latency percentiles to this JSON lines file"
+    )
+    parser.add_argument("--metrics-interval", type=float, default=10.0)
+    parser.add_argument(
+        "--profile", type=int, default=0, help="profile this many frames with cProfile"
+    )
+    parser.add_argument("--profile-start", type=int, default=30)
+    parser.add_argument("--profile-output", default="pyvision.prof")
+    parser.add_argument("--trace-memory", action="store_true")
+    args = parser.parse_args()
+    startup.mark("imports")
+
     print("OpenCV version: ", cv2.__version__)
-    print(cv2.getBuildInformation())
+    if args.verbose:
+        # Slow to gather and hundreds of lines long
+        print(cv2.getBuildInformation())
 
     cv2.ocl.setUseOpenCL(True)
     if cv2.ocl.haveOpenCL():
@@ -29,10 +70,29 @@ if __name__ == "__main__":
         "desired_fps": FRAME_PER_SECONDS,
     }
 
+    detector: DetectorSettings = {
+        "engine": Engine(args.engine),
+        "input_size": args.input_size,
+        "precision": Precision(args.precision),
+        "threads": args.threads,
+    }
+    if args.model:
+        detector["model_path"] = args.model
+
     app_config: AppConfig = {
         "camera_model": CameraModel(),
         "stream_provider": OpenCVVideoStream(**stream_settings),
+        "detector": detector,
+        "verbose": args.verbose,
     }
+    if args.profile:
+        app_config["profiler"] = FrameProfiler(
+            args.profile, args.profile_start, args.profile_output, args.trace_memory
+        )
+    if args.metrics_file:
+        metrics.start_dump(args.metrics_file, args.metrics_interval)
 
     app = Controller(app_config)
     app.run()
+    metrics.stop_dump()
+    print(metrics.report())
@@ -1,17 +1,50 @@
 """Module for image processing strategies."""
 
 from abc import ABC, abstractmethod
+from typing import Any, Optional, Tuple
 
 import numpy as np
 from cv2 import UMat
 from cv2.typing import MatLike
 from numpy.typing import NDArray
 
+from pyvision.models.buffers import BufferPool
+from pyvision.models.frame import Location
+
 Image = MatLike | NDArray[np.uint8] | NDArray[np.float32]
 
 
 class ImageProcessingStrategy(ABC):
-    """Abstract base class for image processing strategies."""
+    """Abstract base class for image processing strategies.
+
+    The class attributes describe the images a strategy accepts and produces, so that a
+    pipeline of strategies can be validated once when it is built.
+
+    Attributes:
+        accepted_channels (Optional[Tuple[int, ...]]): The accepted channel counts,
+            any if None.
+        output_channels (Optional[int]): The produced channel count, unchanged if None.
+        accepted_depths (Optional[Tuple[int, ...]]): The accepted OpenCV depths (e.g.
+            cv2.CV_8U), any if None.
+        output_depth (Optional[int]): The produced OpenCV depth, unchanged if None.
+        color_conversion (bool): Whether the strategy only converts the color space,
+            hence is redundant when the image already has output_channels channels.
+        buffer_pool (Optional[BufferPool]): The pool the buffers of the strategy are
+            kept in, set by the pipeline running it. A private pool is used otherwise.
+        location (Optional[Location]): The memory the strategy needs the image in, the
+            pipeline converting it beforehand. The image is given where it is if None.
+        read_only (bool): Whether the strategy returns the image it is given without
+            writing to it, so that the copy of the image in the other memory is kept.
+    """
+
+    accepted_channels: Optional[Tuple[int, ...]] = None
+    output_channels: Optional[int] = None
+    accepted_depths: Optional[Tuple[int, ...]] = None
+    output_depth: Optional[int] = None
+    color_conversion: bool = False
+    buffer_pool: Optional[BufferPool] = None
+    location: Optional[Location] = None
+    read_only: bool = False
 
     @abstractmethod
     def process(self, _frame: Image) -> UMat:
@@ -25,6 +58,48 @@ class ImageProcessingStrategy(ABC):
         """
         pass
 
+    def apply(self, frame: Image) -> UMat:
+        """Apply this strategy alone, without the strategies it may wrap.
+
+        Args:
+            frame (Image): The image to process.
+
+        Returns:
+            UMat: The processed image.
+        """
+        return self.process(frame)
+
+    def buffer(self, name: str = "output", shared: bool = False) -> Optional[Any]:
+        """Return a buffer to pass as dst to an OpenCV call.
+
+        Args:
+            name (str): The name of the buffer.
+            shared (bool): Whether the buffer is a scratch buffer, only used while the
+                strategy runs, that the other stages of the pipeline can borrow.
+
+        Returns:
+            Optional[Any]: The buffer kept on the previous frame, None on the first one.
+        """
+        return self._pool().get(name if shared else (id(self), name))
+
+    def keep(self, buffer: Any, name: str = "output", shared: bool = False) -> Any:
+        """Keep the buffer returned by an OpenCV call for the next frame.
+
+        Args:
+            buffer (Any): The buffer returned by the OpenCV call.
+            name (str): The name of the buffer.
+            shared (bool): Whether the buffer is a scratch buffer, see buffer.
+
+        Returns:
+            Any: The buffer itself.
+        """
+        return self._pool().keep(name if shared else (id(self), name), buffer)
+
+    def _pool(self) -> BufferPool:
+        if self.buffer_pool is None:
+            self.buffer_pool = BufferPool()
+        return self.buffer_pool
+
 
 class ImageProcessingDecorator(ImageProcessingStrategy):
     """Abstract base class for image processing decorators."""
@@ -37,9 +112,13 @@ class ImageProcessingDecorator(ImageProcessingStrategy):
         """
         self._wrapped = wrapped
 
-    @abstractmethod
+    @property
+    def wrapped(self) -> ImageProcessingStrategy:
+        """Return the wrapped image processing strategy."""
+        return self._wrapped
+
     def process(self, _frame: Image) -> UMat:
-        """Process an image.
+        """Process an image with the wrapped strategy, then with this decorator.
 
         Args:
             frame (Image): The image to process.
@@ -47,4 +126,16 @@ class ImageProcessingDecorator(ImageProcessingStrategy):
         Returns:
             UMat: The processed image.
         """
-        return self._wrapped.process(_frame)
+        return self.apply(self._wrapped.process(_frame))
+
+    @abstractmethod
+    def apply(self, frame: Image) -> UMat:
+        """Apply this decorator alone to an image already processed by the wrapped one.
+
+        Args:
+            frame (Image): The image to process.
+
+        Returns:
+            UMat: The processed image.
+        """
+        pass
@@ -0,0 +1,184 @@
+"""A module grouping the inference requests of several frames into batches.
+
+A forward pass over a batch of frames costs much less than one pass per frame, above
+all on CPU-only hosts. The requests of several callers, e.g. the detection stages of
+several streams, are queued and gathered by a worker thread until the batch is full or
+the first request reaches its latency deadline, the requests of higher priority first.
+The results are then routed back to each caller, in the order of the frames of the
+batch. The frames a caller submits together with submit_many, e.g. the regions of a
+frame, share a batch when it can hold them. A stream waits for the result of its frame before
+submitting the next one, so a lone stream has no other frame to batch with and should
+be given a deadline of 0: its frames are then inferred right away.
+"""
+
+import itertools
+import math
+import queue
+import threading
+import timeit
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Sequence, Tuple
+
+# Negated priority, submission time, submission count, frame and future
+Request = Tuple[float, float, int, Any, Optional[Future]]
+
+
+class BatchingInference:
+    """Run an inference function on batches of frames submitted by several callers.
+
+    Attributes:
+        max_batch (int): The largest number of frames of a batch.
+        deadline (float): The longest time a request waits for other ones, in seconds.
+        batches (int): The number of batches run.
+        frames (int): The number of frames inferred.
+    """
+
+    def __init__(
+        self,
+        infer: Callable[[List[Any]], Sequence[Any]],
+        max_batch: int = 8,
+        deadline: float = 0.01,
+    ) -> None:
+        """Initialize the BatchingInference and start its worker thread.
+
+        Args:
+            infer (Callable[[List[Any]], Sequence[Any]]): The function running a single
+                forward pass on a list of frames, returning one result per frame in the
+                same order, e.g. the infer method of an InferenceEngine.
+            max_batch (int): The largest number of frames of a batch.
+            deadline (float): The longest time a request waits for other ones, in seconds.
+
+        Raises:
+            ValueError: If max_batch is lower than 1 or deadline is negative.
+        """
+        if max_batch < 1:
+            raise ValueError("max_batch must be at least 1")
+        if deadline < 0:
+            raise ValueError("deadline must be positive")
+        self.infer = infer
+        self.max_batch = max_batch
+        self.deadline = deadline
+        self.batches = 0
+        self.frames = 0
+        self._submit_lock = threading.Lock()
+        self._requests: queue.PriorityQueue[Request] = queue.PriorityQueue()
+        self._counter = itertools.count()
+        self._closed = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="batching-inference", daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, frame: Any, priority: int = 0) -> Future:
+        """Queue a frame for the next batch.
+
+        Args:
+            frame (Any): The frame to infer.
+            priority (int): The priority of the frame, higher priorities being batched
+                first when more frames are queued than a batch holds.
+
+        Returns:
+            Future: The future result of the frame.
+
+        Raises:
+            RuntimeError: If the batching inference is closed.
+        """
+        return self.submit_many([frame], priority)[0]
+
+    def submit_many(self, frames: Sequence[Any], priority: int = 0) -> List[Future]:
+        """Queue frames inferred in the same batch, as long as it can hold them.
+
+        Args:
+            frames (Sequence[Any]): The frames to infer.
+            priority (int): The priority of the frames, see submit.
+
+        Returns:
+            List[Future]: The future result of every frame, in order.
+
+        Raises:
+            RuntimeError: If the batching inference is closed.
+        """
+        if self._closed.is_set():
+            raise RuntimeError("the batching inference is closed")
+        futures: List[Future] = [Future() for _ in frames]
+        now = timeit.default_timer()
+        with self._submit_lock:  # The worker waits for the last frame to be queued
+            for frame, future in zip(frames, futures):
+                self._requests.put((-priority, now, next(self._counter), frame, future))
+        return futures
+
+    def __call__(self, frame: Any) -> Any:
+        """Infer a frame within a batch and wait for its result.
+
+        Args:
+            frame (Any): The frame to infer.
+
+        Returns:
+            Any: The result of the frame.
+        """
+        return self.submit(frame).result()
+
+    @property
+    def mean_batch_size(self) -> float:
+        """Return the mean number of frames per batch."""
+        return self.frames / self.batches if self.batches else 0.0
+
+    def close(self) -> None:
+        """Infer the frames already submitted, then stop the worker thread."""
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        # Sorted after every request, so that the queued frames are inferred first
+        self._requests.put((math.inf, math.inf, next(self._counter), None, None))
+        self._thread.join()
+
+    def _collect(self) -> List[Request]:
+        first = self._requests.get()
+        if first[4] is None:
+            return []
+
+        with self._submit_lock:
+            pass  # The frames submitted with the first one are all queued
+        batch = [first]
+        end = first[1] + self.deadline
+        while len(batch) < self.max_batch:
+            remaining = end - timeit.default_timer()
+            try:
+                if remaining > 0:
+                    request = self._requests.get(timeout=remaining)
+                else:  # Still take what is already queued once the deadline is reached
+                    request = self._requests.get_nowait()
+            except queue.Empty:
+                break
+            if request[4] is None:
+                self._requests.put(request)  # Stop once this batch is inferred
+                break
+            batch.append(request)
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect()
+            if not batch:
+                return
+            futures = [
+                future
+                for *_, future in batch
+                if future.set_running_or_notify_cancel()  # type: ignore
+            ]
+            try:
+                results = self.infer([frame for *_, frame, _ in batch])
+                if len(results) != len(batch):
+                    raise RuntimeError(
+                        f"{len(results)} results returned for {len(batch)} frames"
+                    )
+            except Exception as error:
+                for future in futures:
+                    future.set_exception(error)
+                continue
+
+            self.batches += 1
+            self.frames += len(batch)
+            for (*_, future), result in zip(batch, results):
+                if future in futures:
+                    future.set_result(result)  # type: ignore
@@ -0,0 +1,64 @@
+"""A pool of image buffers reused from one frame to the next.
+
+OpenCV functions given a dst of the right size and type write into it instead of
+allocating a new image, and reallocate it when the size changes. Keeping the buffer
+returned by a call and passing it back as dst on the next frame hence allocates only on
+the first frame and whenever the resolution changes.
+"""
+
+import threading
+from typing import Any, Hashable, Optional
+
+
+class BufferPool:
+    """A pool of buffers, each one kept under a key.
+
+    The buffers owned by a stage are keyed by the stage, so that its output is never
+    overwritten by another stage. Scratch buffers, only used while a stage runs, are
+    keyed by their name alone and borrowed by every stage of a pipeline in turn.
+
+    Attributes:
+        allocations (int): The number of buffers kept for the first time.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the BufferPool."""
+        self._buffers: dict[Hashable, Any] = {}
+        self._lock = threading.Lock()
+        self.allocations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the buffer kept under the key.
+
+        Args:
+            key (Hashable): The key of the buffer.
+
+        Returns:
+            Optional[Any]: The buffer, None if nothing was kept under the key yet.
+        """
+        return self._buffers.get(key)
+
+    def keep(self, key: Hashable, buffer: Any) -> Any:
+        """Keep a buffer under the key, to pass it as dst on the next frame.
+
+        Args:
+            key (Hashable): The key of the buffer.
+            buffer (Any): The buffer returned by the OpenCV call.
+
+        Returns:
+            Any: The buffer itself, for chaining.
+        """
+        with self._lock:
+            if key not in self._buffers:
+                self.allocations += 1
+            self._buffers[key] = buffer
+        return buffer
+
+    def clear(self) -> None:
+        """Release every buffer of the pool."""
+        with self._lock:
+            self._buffers.clear()
+
+    def __len__(self) -> int:
+        """Return the number of buffers kept."""
+        return len(self._buffers)
@@ -1,8 +1,13 @@
 """This module contains the CameraModel class."""
 
-from pyvision import device
+from pyvision.camera.backends import list_capture_devices
 from pyvision.utils.observer import ConcreteSubject
 
+try:
+    from pyvision import device
+except ImportError:  # The device extension is only built on Windows
+    device = None
+
 
 class CameraModel(ConcreteSubject):
     """A class representing a camera model. This class extends the ConcreteSubject class and provides functionality for managing cameras.
@@ -27,11 +32,16 @@ class CameraModel(ConcreteSubject):
         """Returns the name of the default camera.
 
         Returns:
-            str: The name of the default camera.
+            str: The name of the default camera, empty if no camera was found.
         """
-        return [
-            value for value, key in self.cameras.items() if key == self.selected_camera
-        ][0]
+        return next(
+            (
+                value
+                for value, key in self.cameras.items()
+                if key == self.selected_camera
+            ),
+            "",
+        )
 
     def update_cameras(self):
         """Updates the list of available video backends and notifies the observers."""
@@ -53,6 +63,9 @@ class CameraModel(ConcreteSubject):
         Returns:
             A dictionary mapping the backend names to their corresponding indices.
         """
+        if device is None:
+            return list_capture_devices()
+
         idx = 0
         cameras: dict[str, int] = {}
 
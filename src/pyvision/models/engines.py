@@ -0,0 +1,469 @@
+"""Inference engines running a YOLO detection model.
+
+YoloObjectDetection does not run the model itself but goes through an InferenceEngine:
+
+- ULTRALYTICS runs the PyTorch weights through ultralytics.
+- OPENCV_DNN runs an ONNX export of the weights through cv2.dnn, like the YuNet face
+  detection filter.
+- ONNXRUNTIME runs the same export through ONNX Runtime on the CPU, if installed.
+
+The ONNX export is made once by ultralytics and cached next to the weights, an .onnx
+model path being used as is, without importing ultralytics at all. On hosts without
+GPU an exported graph runs much faster than eager PyTorch.
+"""
+
+import os
+import timeit
+from abc import ABC, abstractmethod
+from enum import Enum
+from typing import TYPE_CHECKING, Any, Dict, List, NotRequired, Sequence, TypedDict
+
+import cv2
+import numpy as np
+from numpy.typing import NDArray
+
+from pyvision.models.letterbox import Letterbox
+from pyvision.models.yolo import CLASS, CONFIDENCE, no_detections
+from pyvision.utils.metrics import metrics
+
+if TYPE_CHECKING:
+    from ultralytics import YOLO  # type: ignore
+    from ultralytics.engine.results import Results  # type: ignore
+
+DEFAULT_MODEL_PATH = "yolo/yolov9t.pt"
+DEFAULT_MODEL_URL = (
+    "https://github.com/ultralytics/assets/releases/download/v8.2.0/yolov9t.pt"
+)
+
+# The phases of an inference, timed separately
+PHASES = ("preprocess", "inference", "postprocess")
+
+
+class Engine(Enum):
+    """Enum representing the engines a YOLO model can run on."""
+
+    ULTRALYTICS = "ultralytics"
+    OPENCV_DNN = "opencv-dnn"
+    ONNXRUNTIME = "onnxruntime"
+
+
+class Precision(Enum):
+    """Enum representing the floating point precision of the inference."""
+
+    FP32 = "fp32"
+    FP16 = "fp16"
+
+
+class DetectorSettings(TypedDict):
+    """TypedDict representing the settings of the detection model."""
+
+    engine: NotRequired[Engine]
+    model_path: NotRequired[str]
+    input_size: NotRequired[int]
+    precision: NotRequired[Precision]
+    threads: NotRequired[int]
+
+
+def load_yolo(model_path: str = DEFAULT_MODEL_PATH) -> "YOLO":
+    """Load a YOLO model, downloading the default weights if missing.
+
+    ultralytics, and torch with it, takes seconds to import: it is only imported here,
+    when a model is actually loaded.
+
+    Args:
+        model_path (str): The path of the YOLO weights.
+
+    Returns:
+        YOLO: The model.
+    """
+    # Otherwise, torch backend will spit out a lot of debug messages
+    os.environ["YOLO_VERBOSE"] = "False"
+    from ultralytics import YOLO  # type: ignore
+
+    from pyvision.utils import check_file_exists, download_to
+
+    if not check_file_exists(model_path):
+        download_to(model_path, DEFAULT_MODEL_URL)
+    return YOLO(model_path, verbose=False)
+
+
+def export_onnx(
+    model_path: str, input_size: int, precision: Precision = Precision.FP32
+) -> str:
+    """Return the ONNX export of YOLO weights, exporting them the first time.
+
+    Args:
+        model_path (str): The path of the YOLO weights, returned as is if already an
+            ONNX model.
+        input_size (int): The side of the square input of the exported graph.
+        precision (Precision): The precision of the exported graph. ultralytics only
+            exports FP16 graphs on a GPU, falling back to FP32 otherwise.
+
+    Returns:
+        str: The path of the cached ONNX model.
+    """
+    if model_path.endswith(".onnx"):
+        return model_path
+    path = f"{os.path.splitext(model_path)[0]}-{input_size}-{precision.value}.onnx"
+    if not os.path.exists(path):
+        exported = load_yolo(model_path).export(
+            format="onnx",
+            imgsz=input_size,
+            half=precision is Precision.FP16,
+            dynamic=False,
+            simplify=True,
+        )
+        os.replace(exported, path)
+    return path
+
+
+def to_array(result: "Results") -> NDArray[np.float32]:
+    """Return the boxes of an ultralytics result as a contiguous (N, 6) float32 array."""
+    boxes = result.boxes  # type: ignore
+    if boxes is None or not len(boxes):
+        return no_detections()
+    data = boxes.data
+    if boxes.is_track:  # Tracked boxes carry an id column before the confidence
+        data = data[:, [0, 1, 2, 3, 5, 6]]
+    return np.ascontiguousarray(data.cpu().numpy(), dtype=np.float32)
+
+
+def decode(
+    output: NDArray, score_threshold: float, nms_threshold: float
+) -> NDArray[np.float32]:
+    """Turn the raw output of an exported YOLO graph into detections.
+
+    Args:
+        output (NDArray): The (1, 4 + C, A) output, a (cx, cy, w, h) box and C class
+            scores for each of the A anchors, in input pixels.
+        score_threshold (float): The score under which an anchor is dropped.
+        nms_threshold (float): The IoU over which the weaker of two boxes of the same
+            class is suppressed.
+
+    Returns:
+        NDArray[np.float32]: The (N, 6) detections, in input pixels.
+    """
+    predictions = output[0].T.astype(np.float32, copy=False)
+    scores = predictions[:, 4:]
+    classes = scores.argmax(axis=1)
+    confidences = scores[np.arange(len(scores)), classes]
+    kept = confidences >= score_threshold
+    if not kept.any():
+        return no_detections()
+
+    boxes = predictions[kept, :4].copy()
+    boxes[:, :2] -= boxes[:, 2:] / 2  # (x, y, w, h) as expected by the NMS
+    confidences, classes = confidences[kept], classes[kept]
+    indices = np.asarray(
+        cv2.dnn.NMSBoxesBatched(
+            boxes, confidences, classes, score_threshold, nms_threshold
+        ),
+        dtype=np.intp,
+    ).reshape(-1)
+
+    detections = np.empty((len(indices), 6), dtype=np.float32)
+    detections[:, :2] = boxes[indices, :2]
+    detections[:, 2:4] = boxes[indices, :2] + boxes[indices, 2:]
+    detections[:, CONFIDENCE] = confidences[indices]
+    detections[:, CLASS] = classes[indices]
+    return detections
+
+
+class InferenceEngine(ABC):
+    """An engine running a YOLO model on images.
+
+    Attributes:
+        input_size (int): The side of the square input the model runs at.
+        precision (Precision): The floating point precision of the inference.
+        threads (int): The number of CPU threads of the inference, 0 for the engine
+            default.
+        letterbox (Letterbox): The preprocessing of the images.
+        totals (Dict[str, float]): The cumulated duration of the preprocessing,
+            inference and postprocessing, in seconds.
+        count (int): The number of images inferred.
+    """
+
+    # Whether the model takes normalized RGB blobs rather than BGR images
+    normalize = True
+
+    def __init__(
+        self,
+        input_size: int = 640,
+        precision: Precision = Precision.FP32,
+        threads: int = 0,
+    ) -> None:
+        """Initialize the InferenceEngine.
+
+        Args:
+            input_size (int): The side of the square input the model runs at.
+            precision (Precision): The floating point precision of the inference.
+            threads (int): The number of CPU threads, 0 for the engine default.
+        """
+        self.input_size = input_size
+        self.precision = precision
+        self.threads = threads
+        self.letterbox = Letterbox(input_size, self.normalize)
+        self.totals: Dict[str, float] = dict.fromkeys(PHASES, 0.0)
+        self.count = 0
+
+    @abstractmethod
+    def infer(self, images: Sequence[NDArray]) -> List[NDArray[np.float32]]:
+        """Detect the objects of several images.
+
+        Args:
+            images (Sequence[NDArray]): The BGR host images.
+
+        Returns:
+            List[NDArray[np.float32]]: The (N, 6) detections of every image, in image
+            coordinates.
+        """
+
+    def __call__(self, images: Sequence[NDArray]) -> List[NDArray[np.float32]]:
+        """Detect the objects of several images, see infer."""
+        return self.infer(images)
+
+    def warm_up(self, width: int, height: int) -> None:
+        """Run the model once on a blank frame, so that the first real one is not slow.
+
+        The first inference initializes the engine and allocates its buffers for the
+        input size, taking many times longer than the next ones.
+
+        Args:
+            width (int): The width of the frames of the stream.
+            height (int): The height of the frames of the stream.
+        """
+        self.infer([np.zeros((height, width, 3), dtype=np.uint8)])
+        # The warm-up is not representative of the steady state
+        self.totals = dict.fromkeys(PHASES, 0.0)
+        self.count = 0
+        for phase in PHASES:
+            metrics.histogram(f"model/{phase}").reset()
+
+    def stage_timings(self) -> Dict[str, float]:
+        """Return the mean duration of every phase per image, in milliseconds."""
+        if not self.count:
+            return dict.fromkeys(self.totals, 0.0)
+        return {
+            phase: 1000 * total / self.count for phase, total in self.totals.items()
+        }
+
+    def _record(self, times: Sequence[float], count: int) -> None:
+        for phase, start, end in zip(PHASES, times, times[1:]):
+            self.totals[phase] += end - start
+            metrics.record(f"model/{phase}", end - start)
+        self.count += count
+
+    def describe(self) -> str:
+        """Return a one line summary of the engine."""
+        return (
+            f"{type(self).__name__} {self.input_size}x{self.input_size}"
+            f" {self.precision.value} {self.threads or 'default'} threads"
+        )
+
+
+class UltralyticsEngine(InferenceEngine):
+    """An engine running the PyTorch weights through ultralytics."""
+
+    normalize = False
+
+    def __init__(
+        self,
+        model_path: str = DEFAULT_MODEL_PATH,
+        input_size: int = 640,
+        precision: Precision = Precision.FP32,
+        threads: int = 0,
+    ) -> None:
+        """Initialize the UltralyticsEngine.
+
+        Args:
+            model_path (str): The path of the YOLO weights, downloaded if missing.
+            input_size (int): The side of the square input the model runs at.
+            precision (Precision): The floating point precision, FP16 needs a GPU.
+            threads (int): The number of torch threads, for the whole process.
+        """
+        super().__init__(input_size, precision, threads)
+        self.model = load_yolo(model_path)
+        if threads:
+            import torch  # type: ignore
+
+            torch.set_num_threads(threads)
+
+    def infer(self, images: Sequence[NDArray]) -> List[NDArray[np.float32]]:
+        """Detect the objects of several images in a single forward pass."""
+        start = timeit.default_timer()
+        inputs = [self.letterbox(image, slot) for slot, image in enumerate(images)]
+        preprocessed = timeit.default_timer()
+        # Already at the input size, the images are not resized again by ultralytics
+        results = self.model(
+            inputs,
+            imgsz=self.input_size,
+            half=self.precision is Precision.FP16,
+            verbose=False,
+        )
+        inferred = timeit.default_timer()
+        detections = [
+            self.letterbox.to_image(to_array(result), *image.shape[1::-1])
+            for result, image in zip(results, images)
+        ]
+        self._record(
+            (start, preprocessed, inferred, timeit.default_timer()), len(images)
+        )
+        return detections
+
+    def describe(self) -> str:
+        """Return a one line summary of the engine and of the model."""
+        return f"{super().describe()}, {self.model.info()}"
+
+
+class ExportedEngine(InferenceEngine):
+    """An engine running the ONNX export of the weights, one image at a time.
+
+    The images are letterboxed to the input size, and the raw output decoded and
+    filtered by non maximum suppression, as ultralytics does.
+
+    Attributes:
+        onnx_path (str): The path of the ONNX model.
+        score_threshold (float): The score under which a box is dropped.
+        nms_threshold (float): The IoU over which overlapping boxes are suppressed.
+    """
+
+    def __init__(
+        self,
+        model_path: str = DEFAULT_MODEL_PATH,
+        input_size: int = 640,
+        precision: Precision = Precision.FP32,
+        threads: int = 0,
+        score_threshold: float = 0.25,
+        nms_threshold: float = 0.45,
+    ) -> None:
+        """Initialize the ExportedEngine.
+
+        Args:
+            model_path (str): The path of the YOLO weights, exported to ONNX and cached
+                the first time, or of an ONNX model.
+            input_size (int): The side of the square input the graph is exported at.
+            precision (Precision): The floating point precision of the inference.
+            threads (int): The number of CPU threads, 0 for the engine default.
+            score_threshold (float): The score under which a box is dropped.
+            nms_threshold (float): The IoU over which overlapping boxes are suppressed.
+        """
+        super().__init__(input_size, precision, threads)
+        self.score_threshold = score_threshold
+        self.nms_threshold = nms_threshold
+        self.onnx_path = export_onnx(model_path, input_size, self.exported_precision)
+
+    @property
+    def exported_precision(self) -> Precision:
+        """Return the precision of the exported graph."""
+        return Precision.FP32
+
+    @abstractmethod
+    def run(self, blob: NDArray[np.float32]) -> NDArray:
+        """Run the graph on a (1, 3, size, size) blob and return its raw output."""
+
+    def infer(self, images: Sequence[NDArray]) -> List[NDArray[np.float32]]:
+        """Detect the objects of every image in turn."""
+        detections = []
+        for image in images:
+            start = timeit.default_timer()
+            blob = self.letterbox(image)
+            preprocessed = timeit.default_timer()
+            output = self.run(blob)
+            inferred = timeit.default_timer()
+            found = decode(output, self.score_threshold, self.nms_threshold)
+            detections.append(self.letterbox.to_image(found, *image.shape[1::-1]))
+            self._record((start, preprocessed, inferred, timeit.default_timer()), 1)
+        return detections
+
+
+class OpenCVDnnEngine(ExportedEngine):
+    """An engine running the ONNX export through cv2.dnn on the CPU.
+
+    FP16 runs on the FP16 CPU target of OpenCV, the graph staying in FP32. The thread
+    count is the one of OpenCV, shared with the filters.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Initialize the OpenCVDnnEngine, see ExportedEngine."""
+        super().__init__(*args, **kwargs)
+        self.net = cv2.dnn.readNetFromONNX(self.onnx_path)
+        self.net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+        self.net.setPreferableTarget(
+            cv2.dnn.DNN_TARGET_CPU_FP16
+            if self.precision is Precision.FP16
+            else cv2.dnn.DNN_TARGET_CPU
+        )
+        if self.threads:
+            cv2.setNumThreads(self.threads)
+
+    def run(self, blob: NDArray[np.float32]) -> NDArray:
+        """Run the graph on a blob."""
+        self.net.setInput(blob)
+        return self.net.forward()
+
+
+class OnnxRuntimeEngine(ExportedEngine):
+    """An engine running the ONNX export through ONNX Runtime on the CPU."""
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        """Initialize the OnnxRuntimeEngine, see ExportedEngine.
+
+        Raises:
+            ImportError: If onnxruntime is not installed.
+        """
+        super().__init__(*args, **kwargs)
+        try:
+            import onnxruntime  # type: ignore
+        except ImportError as error:
+            raise ImportError(
+                "the onnxruntime engine needs onnxruntime, pip install onnxruntime"
+            ) from error
+
+        options = onnxruntime.SessionOptions()
+        options.graph_optimization_level = (
+            onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+        )
+        if self.threads:
+            options.intra_op_num_threads = self.threads
+        self.session = onnxruntime.InferenceSession(
+            self.onnx_path, options, providers=["CPUExecutionProvider"]
+        )
+        graph_input = self.session.get_inputs()[0]
+        self.input_name = graph_input.name
+        self.input_type = (
+            np.float16 if graph_input.type == "tensor(float16)" else np.float32
+        )
+
+    @property
+    def exported_precision(self) -> Precision:
+        """Return the precision of the exported graph, the requested one."""
+        return self.precision
+
+    def run(self, blob: NDArray[np.float32]) -> NDArray:
+        """Run the graph on a blob."""
+        return self.session.run(
+            None, {self.input_name: blob.astype(self.input_type, copy=False)}
+        )[0]
+
+
+def create_engine(settings: DetectorSettings) -> InferenceEngine:
+    """Create the inference engine described by the settings.
+
+    Args:
+        settings (DetectorSettings): The settings, the defaults running the default
+            weights through ultralytics at 640x640 in FP32.
+
+    Returns:
+        InferenceEngine: The engine, with its model loaded.
+    """
+    model_path = settings.get("model_path", DEFAULT_MODEL_PATH)
+    input_size = settings.get("input_size", 640)
+    precision = settings.get("precision", Precision.FP32)
+    threads = settings.get("threads", 0)
+    match settings.get("engine", Engine.ULTRALYTICS):
+        case Engine.OPENCV_DNN:
+            return OpenCVDnnEngine(model_path, input_size, precision, threads)
+        case Engine.ONNXRUNTIME:
+            return OnnxRuntimeEngine(model_path, input_size, precision, threads)
+        case _:
+            return UltralyticsEngine(model_path, input_size, precision, threads)
@@ -1,14 +1,40 @@
 """This module contains classes for image processing filters."""
 
+import math
+from typing import Optional, Tuple
+
 import cv2
 import numpy as np
 from cv2 import UMat
 
 from pyvision.models import Image, ImageProcessingDecorator, ImageProcessingStrategy
+from pyvision.models.frame import Location
+from pyvision.models.kernels import (
+    Kernel,
+    SeparableKernel,
+    get_gaussian_kernel,
+    get_kernel,
+    get_separable_kernel,
+    separate,
+)
+
+GAUSSIAN_5X5 = [
+    [2, 4, 5, 4, 2],
+    [4, 9, 12, 9, 4],
+    [5, 12, 15, 12, 5],
+    [4, 9, 12, 9, 4],
+    [2, 4, 5, 4, 2],
+]
 
 
 class NoOpFilter(ImageProcessingStrategy):
-    """A class representing a no-op filter for image processing."""
+    """A class representing a no-op filter for image processing.
+
+    In a pipeline, it only makes sure the image is on the device.
+    """
+
+    location = Location.DEVICE
+    read_only = True
 
     def process(self, frame: Image) -> UMat:
         """Process an image.
@@ -19,21 +45,48 @@ class NoOpFilter(ImageProcessingStrategy):
         Returns:
             UMat: The processed image.
         """
-        return cv2.UMat(frame)  # type: ignore
+        if isinstance(frame, UMat):
+            return frame  # Already on the device, wrapping it again is a waste
+        buffer = self.buffer()
+        if buffer is None:
+            return self.keep(cv2.UMat(frame))  # type: ignore
+        return self.keep(cv2.copyTo(frame, None, buffer))
 
 
-class IdentityFilter(ImageProcessingDecorator):
-    """A class representing an identity filter for image processing."""
+class KernelFilter(ImageProcessingDecorator):
+    """A base class for the filters convolving the image with a fixed kernel.
 
-    def __init__(self, wrapped: ImageProcessingStrategy) -> None:
-        """Initialize the IdentityFilter.
+    The convolution runs as two 1D passes with cv2.sepFilter2D when the kernel is
+    separable, which for a 5x5 kernel takes 10 multiply-adds per pixel instead of 25.
+    Like every filter of this module, the output is written into a buffer reused from
+    one frame to the next, see ImageProcessingStrategy.buffer.
+    """
+
+    def __init__(
+        self,
+        wrapped: ImageProcessingStrategy,
+        kernel: Kernel,
+        separable: Optional[bool] = None,
+    ) -> None:
+        """Initialize the KernelFilter.
 
         Args:
             wrapped (ImageProcessingStrategy): The wrapped image processing strategy.
+            kernel (Kernel): The kernel to convolve the image with.
+            separable (Optional[bool]): Whether to run the convolution as two 1D passes.
+                None (the default) detects it: the 1D passes are used only when the
+                kernel is exactly separable. True always uses the closest separable
+                approximation of the kernel, False always runs the 2D convolution.
         """
         super().__init__(wrapped)
-
-    def process(self, _frame: Image) -> UMat:
+        self.kernel = kernel
+        self.separable_kernel: Optional[SeparableKernel] = None
+        if separable is None:
+            self.separable_kernel = separate(kernel)
+        elif separable:
+            self.separable_kernel = separate(kernel, math.inf)
+
+    def apply(self, frame: Image) -> UMat:
         """Process an image.
 
         Args:
@@ -42,28 +95,79 @@ class IdentityFilter(ImageProcessingDecorator):
         Returns:
             UMat: The processed image.
         """
-        frame = super().process(_frame)
-        array = np.array([[0, 0, 0], [0, 1, 0], [0, 0, 0]], dtype="uint8")
-        input_kernel = cv2.UMat(array)  # type: ignore
-        return cv2.filter2D(frame, -1, input_kernel)
+        if self.separable_kernel is not None:
+            row, column = self.separable_kernel.for_frame(frame)
+            return self.keep(cv2.sepFilter2D(frame, -1, row, column, dst=self.buffer()))
+        return self.keep(
+            cv2.filter2D(frame, -1, self.kernel.for_frame(frame), dst=self.buffer())
+        )
 
 
-class EdgeDetectionKernelFilter(ImageProcessingDecorator):
-    """A class representing an edge detection filter for image processing."""
+class IdentityFilter(KernelFilter):
+    """A class representing an identity filter for image processing."""
+
+    def __init__(
+        self, wrapped: ImageProcessingStrategy, separable: Optional[bool] = None
+    ) -> None:
+        """Initialize the IdentityFilter.
+
+        Args:
+            wrapped (ImageProcessingStrategy): The wrapped image processing strategy.
+            separable (Optional[bool]): See KernelFilter.
+        """
+        kernel = get_kernel([[0, 0, 0], [0, 1, 0], [0, 0, 0]])
+        super().__init__(wrapped, kernel, separable)
 
-    def __init__(self, wrapped: ImageProcessingStrategy, ksize: int = 3) -> None:
+
+class EdgeDetectionKernelFilter(ImageProcessingDecorator):
+    """A class representing an edge detection filter for image processing.
+
+    The smoothing, the gradients, their magnitude, the threshold and the scaling to 8 bits
+    are fused in a single stage working in 16 bits (L1 magnitude) or float32 (L2
+    magnitude), writing into buffers reused from one frame to the next. The smoothing
+    uses the separable approximation of the 5x5 Gaussian kernel of GaussianKernelFilter.
+    """
+
+    accepted_channels = (1,)
+    accepted_depths = (cv2.CV_8U,)
+    output_channels = 1
+
+    def __init__(
+        self,
+        wrapped: ImageProcessingStrategy,
+        ksize: int = 3,
+        threshold: float = 64,
+        l1: bool = False,
+        fixed_scale: bool = False,
+    ) -> None:
         """Initialize the EdgeDetectionFilter.
 
         Args:
             wrapped (ImageProcessingStrategy): The wrapped image processing strategy.
             ksize (int): The kernel size for the Sobel operator.
+            threshold (float): The gradient magnitude under which pixels are zeroed.
+            l1 (bool): Whether to use |dx| + |dy| as magnitude, cheaper than the
+                euclidean magnitude and computed without leaving 16 bits.
+            fixed_scale (bool): Whether to scale the magnitude by the largest value it
+                can take instead of stretching each frame between its min and max,
+                which skips a full frame min/max pass.
         """
         self.ksize = ksize
+        self.threshold = threshold
+        self.l1 = l1
+        self.fixed_scale = fixed_scale
         wrapped = GrayscaleFilter(wrapped)
-        wrapped = GaussianKernelFilter(wrapped)
         super().__init__(wrapped)
 
-    def process(self, _frame: Image) -> UMat:
+        self.smoothing = separate(get_kernel(GAUSSIAN_5X5, 1 / 159.0), math.inf)
+
+        # Largest gradient of an 8 bit image: 255 times the positive weights of the
+        # derivative kernel times the weights of the smoothing one
+        derivative, smoothing = cv2.getDerivKernels(1, 0, ksize)
+        largest = 255 * np.abs(derivative).sum() / 2 * np.abs(smoothing).sum()
+        self.max_magnitude = 2 * largest if l1 else math.sqrt(2) * largest
+
+    def apply(self, frame: Image) -> UMat:
         """Process an image.
 
         Args:
@@ -72,70 +176,116 @@ class EdgeDetectionKernelFilter(ImageProcessingDecorator):
         Returns:
             UMat: The processed image.
         """
-        frame = super().process(_frame)
-
-        # Compute X and Y gradients using Sobel operator
-        sobel_x = cv2.Sobel(frame, cv2.CV_64F, 1, 0, None, ksize=self.ksize)
-        sobel_y = cv2.Sobel(frame, cv2.CV_64F, 0, 1, None, ksize=self.ksize)
+        row, column = self.smoothing.for_frame(frame)  # type: ignore
+        blurred = self.keep(
+            cv2.sepFilter2D(frame, -1, row, column, dst=self.buffer("blurred", True)),
+            "blurred",
+            True,
+        )
 
-        # Compute the gradient magnitude
-        magnitude = cv2.magnitude(
-            sobel_x, sobel_y
-        )  # equals to np.sqrt(sobel_x**2 + sobel_y**2)
+        if self.l1:
+            # Scale |dx| and |dy| so their sum fits in 8 bits, saturating add
+            alpha = 255 / self.max_magnitude
+            dx, dy = self._gradients(blurred, cv2.CV_16S)
+            abs_dx = self.keep(
+                cv2.convertScaleAbs(dx, self.buffer("abs_dx", True), alpha),
+                "abs_dx",
+                True,
+            )
+            abs_dy = self.keep(
+                cv2.convertScaleAbs(dy, self.buffer("abs_dy", True), alpha),
+                "abs_dy",
+                True,
+            )
+            magnitude = self.keep(
+                cv2.add(abs_dx, abs_dy, self.buffer("magnitude", True)),
+                "magnitude",
+                True,
+            )
+            if not self.fixed_scale:
+                cv2.threshold(
+                    magnitude, self.threshold * alpha, 255, cv2.THRESH_TOZERO, magnitude
+                )
+            else:
+                output = cv2.threshold(
+                    magnitude,
+                    self.threshold * alpha,
+                    255,
+                    cv2.THRESH_TOZERO,
+                    self.buffer(),
+                )[1]
+                return self.keep(output)
+        else:
+            dx, dy = self._gradients(blurred, cv2.CV_32F)
+            magnitude = self.keep(
+                cv2.magnitude(dx, dy, self.buffer("magnitude", True)),
+                "magnitude",
+                True,
+            )
+            cv2.threshold(
+                magnitude,
+                self.threshold,
+                self.max_magnitude,
+                cv2.THRESH_TOZERO,
+                magnitude,
+            )
+            if self.fixed_scale:
+                return self.keep(
+                    cv2.convertScaleAbs(
+                        magnitude, self.buffer(), 255 / self.max_magnitude
+                    )
+                )
 
-        _, thres = cv2.threshold(magnitude, 64, 255, cv2.THRESH_TOZERO)
+        return self.keep(
+            cv2.normalize(
+                magnitude, self.buffer(), 0, 255, cv2.NORM_MINMAX, dtype=cv2.CV_8U
+            )
+        )
 
-        return cv2.normalize(thres, frame, 0, 255, cv2.NORM_MINMAX, dtype=cv2.CV_8UC3)
+    def _gradients(self, blurred: Image, depth: int) -> Tuple[UMat, UMat]:
+        if self.ksize == 3 and depth == cv2.CV_16S:
+            # Both 3x3 Sobel gradients in a single pass over the image
+            dx, dy = cv2.spatialGradient(
+                blurred, self.buffer("dx16", True), self.buffer("dy16", True), 3
+            )
+            return self.keep(dx, "dx16", True), self.keep(dy, "dy16", True)
+        name = "16" if depth == cv2.CV_16S else "32"
+        dx = cv2.Sobel(blurred, depth, 1, 0, self.buffer(f"dx{name}", True), self.ksize)
+        dy = cv2.Sobel(blurred, depth, 0, 1, self.buffer(f"dy{name}", True), self.ksize)
+        return self.keep(dx, f"dx{name}", True), self.keep(dy, f"dy{name}", True)
 
 
-class SharpenFilter(ImageProcessingDecorator):
+class SharpenFilter(KernelFilter):
     """A class representing a sharpen filter for image processing."""
 
-    def __init__(self, wrapped: ImageProcessingStrategy) -> None:
+    def __init__(
+        self, wrapped: ImageProcessingStrategy, separable: Optional[bool] = None
+    ) -> None:
         """Initialize the SharpenFilter.
 
         Args:
             wrapped (ImageProcessingStrategy): The wrapped image processing strategy.
+            separable (Optional[bool]): See KernelFilter.
         """
-        super().__init__(wrapped)
-
-    def process(self, _frame: Image) -> UMat:
-        """Process an image.
-
-        Args:
-            frame (UMat): The image to process.
-
-        Returns:
-            UMat: The processed image.
-        """
-        frame = super().process(_frame)
-        array = np.array([[0, -1, 0], [-1, 5, -1], [0, -1, 0]], dtype="uint8")
-        input_kernel = cv2.UMat(array)  # type: ignore
-        return cv2.filter2D(frame, -1, input_kernel)
+        kernel = get_kernel([[0, -1, 0], [-1, 5, -1], [0, -1, 0]])
+        super().__init__(wrapped, kernel, separable)
 
 
-class UnsharpMasking5By5KernelFilter(ImageProcessingDecorator):
+class UnsharpMasking5By5KernelFilter(KernelFilter):
     """A class representing an unsharp masking filter for image processing."""
 
-    def __init__(self, wrapped: ImageProcessingStrategy) -> None:
+    def __init__(
+        self, wrapped: ImageProcessingStrategy, separable: Optional[bool] = None
+    ) -> None:
         """Initialize the UnsharpMasking5By5KernelFilter.
 
         Args:
             wrapped (ImageProcessingStrategy): The wrapped image processing strategy.
+            separable (Optional[bool]): See KernelFilter. The kernel is not rank 1 but
+                equals 2 * identity - gaussian, so when True the image is blurred with
+                the separable Gaussian kernel and subtracted from twice the image.
         """
-        super().__init__(wrapped)
-
-    def process(self, _frame: Image) -> UMat:
-        """Process an image.
-
-        Args:
-            frame (UMat): The image to process.
-
-        Returns:
-            UMat: The processed image.
-        """
-        frame = super().process(_frame)
-        array = -(1 / 256.0) * np.array(
+        kernel = get_kernel(
             [
                 [1, 4, 6, 4, 1],
                 [4, 16, 24, 16, 4],
@@ -143,241 +293,180 @@ class UnsharpMasking5By5KernelFilter(ImageProcessingDecorator):
                 [4, 16, 24, 16, 4],
                 [1, 4, 6, 4, 1],
             ],
-            dtype="uint8",
+            -1 / 256.0,
         )
-        input_kernel = cv2.UMat(array)  # type: ignore
-        return cv2.filter2D(frame, -1, input_kernel)
+        super().__init__(wrapped, kernel, False)
+        if separable:
+            self.separable_kernel = get_separable_kernel(
+                [1, 4, 6, 4, 1], [1, 4, 6, 4, 1], 1 / 256.0
+            )
+
+    def apply(self, frame: Image) -> UMat:
+        """Process an image.
 
+        Args:
+            frame (UMat): The image to process.
 
-class GaussianBlurKernelFilter(ImageProcessingDecorator):
+        Returns:
+            UMat: The processed image.
+        """
+        if self.separable_kernel is not None:
+            row, column = self.separable_kernel.for_frame(frame)
+            blurred = self.keep(
+                cv2.sepFilter2D(
+                    frame, -1, row, column, dst=self.buffer("blurred", True)
+                ),
+                "blurred",
+                True,
+            )
+            return self.keep(
+                cv2.addWeighted(frame, 2.0, blurred, -1.0, 0.0, dst=self.buffer())
+            )
+        return super().apply(frame)
+
+
+class GaussianBlurKernelFilter(KernelFilter):
     """A class representing a Gaussian blur filter for image processing."""
 
-    def __init__(self, wrapped: ImageProcessingStrategy) -> None:
+    def __init__(
+        self, wrapped: ImageProcessingStrategy, separable: Optional[bool] = None
+    ) -> None:
         """Initialize the GaussianBlurKernelFilter.
 
         Args:
             wrapped (ImageProcessingStrategy): The wrapped image processing strategy.
+            separable (Optional[bool]): See KernelFilter.
         """
-        super().__init__(wrapped)
+        kernel = get_kernel([[1, 2, 1], [2, 4, 2], [1, 2, 1]], 1 / 16.0)
+        super().__init__(wrapped, kernel, separable)
 
-    def process(self, _frame: Image) -> UMat:
-        """Process an image.
 
-        Args:
-            frame (UMat): The image to process.
-
-        Returns:
-            UMat: The processed image.
-        """
-        frame = super().process(_frame)
-        array = (1 / 16.0) * np.array([[1, 2, 1], [2, 4, 2], [1, 2, 1]], dtype="uint8")
-        input_kernel = cv2.UMat(array)  # type: ignore
-        return cv2.filter2D(frame, -1, input_kernel)
+class GaussianKernelFilter(KernelFilter):
+    """A class representing a Gaussian kernel filter for image processing.
 
+    The 5x5 kernel of sigma 1.4 is built from a 1D Gaussian rather than from the
+    integer weights of GAUSSIAN_5X5, so that it always runs as two 1D passes.
+    """
 
-class GaussianKernelFilter(ImageProcessingDecorator):
-    """A class representing a Gaussian kernel filter for image processing."""
-
-    def __init__(self, wrapped: ImageProcessingStrategy) -> None:
+    def __init__(
+        self, wrapped: ImageProcessingStrategy, separable: Optional[bool] = None
+    ) -> None:
         """Initialize the GaussianKernelFilter.
 
         Args:
             wrapped (ImageProcessingStrategy): The wrapped image processing strategy.
+            separable (Optional[bool]): See KernelFilter.
         """
-        super().__init__(wrapped)
-
-    def process(self, _frame: Image) -> UMat:
-        """Process an image.
+        kernel = get_gaussian_kernel(5, 1.4)
+        super().__init__(wrapped, kernel, separable)
 
-        Args:
-            frame (UMat): The image to process.
-
-        Returns:
-            UMat: The processed image.
-        """
-        frame = super().process(_frame)
-        array = (1 / 159.0) * np.array(
-            [
-                [2, 4, 5, 4, 2],
-                [4, 9, 12, 9, 4],
-                [5, 12, 15, 12, 5],
-                [4, 9, 12, 9, 4],
-                [2, 4, 5, 4, 2],
-            ],
-            dtype="uint8",
-        )
-        input_kernel = cv2.UMat(array)  # type: ignore
-        return cv2.filter2D(frame, -1, input_kernel)
 
+class GaussianSmoothingFilter(KernelFilter):
+    """A class representing a Gaussian smoothing filter for image processing.
 
-class GaussianSmoothingFilter(ImageProcessingDecorator):
-    """A class representing a Gaussian smoothing filter for image processing."""
+    The 5x5 kernel of sigma 1 is built from a 1D Gaussian, so that it always runs as
+    two 1D passes.
+    """
 
-    def __init__(self, wrapped: ImageProcessingStrategy) -> None:
+    def __init__(
+        self, wrapped: ImageProcessingStrategy, separable: Optional[bool] = None
+    ) -> None:
         """Initialize the GaussianSmoothingFilter.
 
         Args:
             wrapped (ImageProcessingStrategy): The wrapped image processing strategy.
+            separable (Optional[bool]): See KernelFilter.
         """
-        super().__init__(wrapped)
-
-    def process(self, _frame: Image) -> UMat:
-        """Process an image.
-
-        Args:
-            frame (UMat): The image to process.
-
-        Returns:
-            UMat: The processed image.
-        """
-        frame = super().process(_frame)
-        array = (1 / 273) * np.array(
-            [
-                [1, 4, 7, 4, 1],
-                [4, 16, 26, 16, 4],
-                [7, 26, 41, 26, 7],
-                [4, 16, 26, 16, 4],
-                [1, 4, 7, 4, 1],
-            ],
-            dtype="uint8",
-        )
-        input_kernel = cv2.UMat(array)  # type: ignore
-        return cv2.filter2D(frame, -1, input_kernel)
+        kernel = get_gaussian_kernel(5, 1.0)
+        super().__init__(wrapped, kernel, separable)
 
 
-class LeftSobelKernelFilter(ImageProcessingDecorator):
+class LeftSobelKernelFilter(KernelFilter):
     """A class representing a left Sobel kernel filter for image processing."""
 
-    def __init__(self, wrapped: ImageProcessingStrategy) -> None:
+    def __init__(
+        self, wrapped: ImageProcessingStrategy, separable: Optional[bool] = None
+    ) -> None:
         """Initialize the LeftSobelKernelFilter.
 
         Args:
             wrapped (ImageProcessingStrategy): The wrapped image processing strategy.
+            separable (Optional[bool]): See KernelFilter.
         """
-        super().__init__(wrapped)
-
-    def process(self, _frame: Image) -> UMat:
-        """Process an image.
-
-        Args:
-            frame (UMat): The image to process.
-
-        Returns:
-            UMat: The processed image.
-        """
-        frame = super().process(_frame)
-        array = np.array([[1, 0, -1], [2, 0, -2], [1, 0, -1]], dtype="uint8")
-        input_kernel = cv2.UMat(array)  # type: ignore
-        return cv2.filter2D(frame, -1, input_kernel)
+        kernel = get_kernel([[1, 0, -1], [2, 0, -2], [1, 0, -1]])
+        super().__init__(wrapped, kernel, separable)
 
 
-class TopSobelKernelFilter(ImageProcessingDecorator):
+class TopSobelKernelFilter(KernelFilter):
     """A class representing a top Sobel kernel filter for image processing."""
 
-    def __init__(self, wrapped: ImageProcessingStrategy) -> None:
+    def __init__(
+        self, wrapped: ImageProcessingStrategy, separable: Optional[bool] = None
+    ) -> None:
         """Initialize the TopSobelKernelFilter.
 
         Args:
             wrapped (ImageProcessingStrategy): The wrapped image processing strategy.
+            separable (Optional[bool]): See KernelFilter.
         """
-        super().__init__(wrapped)
-
-    def process(self, _frame: Image) -> UMat:
-        """Process an image.
-
-        Args:
-            frame (UMat): The image to process.
-
-        Returns:
-            UMat: The processed image.
-        """
-        frame = super().process(_frame)
-        array = np.array([[1, 2, 1], [0, 0, 0], [-1, -2, -1]], dtype="uint8")
-        input_kernel = cv2.UMat(array)  # type: ignore
-        return cv2.filter2D(frame, -1, input_kernel)
+        kernel = get_kernel([[1, 2, 1], [0, 0, 0], [-1, -2, -1]])
+        super().__init__(wrapped, kernel, separable)
 
 
-class VerticalSobelKernelFilter(ImageProcessingDecorator):
+class VerticalSobelKernelFilter(KernelFilter):
     """A class representing a right Sobel kernel filter for image processing."""
 
-    def __init__(self, wrapped: ImageProcessingStrategy) -> None:
+    def __init__(
+        self, wrapped: ImageProcessingStrategy, separable: Optional[bool] = None
+    ) -> None:
         """Initialize the VerticalSobelKernelFilter.
 
         Args:
             wrapped (ImageProcessingStrategy): The wrapped image processing strategy.
+            separable (Optional[bool]): See KernelFilter.
         """
-        super().__init__(wrapped)
+        kernel = get_kernel([[-1, 0, 1], [-2, 0, 2], [-1, 0, 1]])
+        super().__init__(wrapped, kernel, separable)
 
-    def process(self, _frame: Image) -> UMat:
-        """Process an image.
 
-        Args:
-            frame (UMat): The image to process.
-
-        Returns:
-            UMat: The processed image.
-        """
-        frame = super().process(_frame)
-        array = np.array([[-1, 0, 1], [-2, 0, 2], [-1, 0, 1]], dtype="uint8")
-        input_kernel = cv2.UMat(array)  # type: ignore
-        return cv2.filter2D(frame, -1, input_kernel)
-
-
-class HorizontalSobelKernelFilter(ImageProcessingDecorator):
+class HorizontalSobelKernelFilter(KernelFilter):
     """A class representing a bottom Sobel kernel filter for image processing."""
 
-    def __init__(self, wrapped: ImageProcessingStrategy) -> None:
+    def __init__(
+        self, wrapped: ImageProcessingStrategy, separable: Optional[bool] = None
+    ) -> None:
         """Initialize the HorizontalSobelKernelFilter.
 
         Args:
             wrapped (ImageProcessingStrategy): The wrapped image processing strategy.
+            separable (Optional[bool]): See KernelFilter.
         """
-        super().__init__(wrapped)
-
-    def process(self, _frame: Image) -> UMat:
-        """Process an image.
-
-        Args:
-            frame (UMat): The image to process.
-
-        Returns:
-            UMat: The processed image.
-        """
-        frame = super().process(_frame)
-        array = np.array([[-1, -2, -1], [0, 0, 0], [1, 2, 1]])
-        input_kernel = cv2.UMat(array)  # type: ignore
-        return cv2.filter2D(frame, -1, input_kernel)
+        kernel = get_kernel([[-1, -2, -1], [0, 0, 0], [1, 2, 1]])
+        super().__init__(wrapped, kernel, separable)
 
 
-class LapaclacianKernelFilter(ImageProcessingDecorator):
+class LapaclacianKernelFilter(KernelFilter):
     """A class representing a Laplacian custom filter for image processing."""
 
-    def __init__(self, wrapped: ImageProcessingStrategy) -> None:
+    def __init__(
+        self, wrapped: ImageProcessingStrategy, separable: Optional[bool] = None
+    ) -> None:
         """Initialize the LapaclacianKernelFilter.
 
         Args:
             wrapped (ImageProcessingStrategy): The wrapped image processing strategy.
+            separable (Optional[bool]): See KernelFilter.
         """
-        super().__init__(wrapped)
-
-    def process(self, _frame: Image) -> UMat:
-        """Process an image.
-
-        Args:
-            frame (UMat): The image to process.
-
-        Returns:
-            UMat: The processed image.
-        """
-        frame = super().process(_frame)
-        array = np.array([[0, 1, 0], [1, -4, 1], [0, 1, 0]])
-        input_kernel = cv2.UMat(array)  # type: ignore
-        return cv2.filter2D(frame, -1, input_kernel)
+        kernel = get_kernel([[0, 1, 0], [1, -4, 1], [0, 1, 0]])
+        super().__init__(wrapped, kernel, separable)
 
 
 class LOGKernelFilter(ImageProcessingDecorator):
     """A class representing a Laplacian of Gaussian filter for image processing."""
 
+    accepted_channels = (3,)
+    output_channels = 1
+
     def __init__(self, wrapped: ImageProcessingStrategy) -> None:
         """Initialize the LOGKernelFilter.
 
@@ -386,7 +475,7 @@ class LOGKernelFilter(ImageProcessingDecorator):
         """
         super().__init__(wrapped)
 
-    def process(self, _frame: Image) -> UMat:
+    def apply(self, frame: Image) -> UMat:
         """Process an image.
 
         Args:
@@ -395,14 +484,25 @@ class LOGKernelFilter(ImageProcessingDecorator):
         Returns:
             UMat: The processed image.
         """
-        frame = super().process(_frame)
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        return cv2.Laplacian(cv2.GaussianBlur(gray, (3, 3), 0), -1)
+        gray = self.keep(
+            cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self.buffer("gray", True)),
+            "gray",
+            True,
+        )
+        blurred = self.keep(
+            cv2.GaussianBlur(gray, (3, 3), 0, dst=self.buffer("blurred", True)),
+            "blurred",
+            True,
+        )
+        return self.keep(cv2.Laplacian(blurred, -1, dst=self.buffer()))
 
 
 class CannyFilter(ImageProcessingDecorator):
     """A class representing an edge detection filter for image processing."""
 
+    accepted_depths = (cv2.CV_8U,)
+    output_channels = 1
+
     def __init__(self, wrapped: ImageProcessingStrategy) -> None:
         """Initialize the CannyFilter.
 
@@ -411,7 +511,7 @@ class CannyFilter(ImageProcessingDecorator):
         """
         super().__init__(wrapped)
 
-    def process(self, _frame: Image) -> UMat:
+    def apply(self, frame: Image) -> UMat:
         """Process an image.
 
         Args:
@@ -420,13 +520,16 @@ class CannyFilter(ImageProcessingDecorator):
         Returns:
             UMat: The processed image.
         """
-        frame = super().process(_frame)
-        return cv2.Canny(frame, 100, 200)
+        return self.keep(cv2.Canny(frame, 100, 200, edges=self.buffer()))
 
 
 class GrayscaleFilter(ImageProcessingDecorator):
     """A class representing a Grey Code filter for image processing."""
 
+    accepted_channels = (3,)
+    output_channels = 1
+    color_conversion = True
+
     def __init__(self, wrapped: ImageProcessingStrategy) -> None:
         """Initialize the GreyCodeKernelFilter.
 
@@ -435,7 +538,7 @@ class GrayscaleFilter(ImageProcessingDecorator):
         """
         super().__init__(wrapped)
 
-    def process(self, frame: Image) -> UMat:
+    def apply(self, frame: Image) -> UMat:
         """Process an image.
 
         Args:
@@ -444,12 +547,16 @@ class GrayscaleFilter(ImageProcessingDecorator):
         Returns:
             UMat: The processed image.
         """
-        return cv2.cvtColor(super().process(frame), cv2.COLOR_BGR2GRAY)
+        return self.keep(cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self.buffer()))
 
 
 class ContoursDetectionFilter(ImageProcessingDecorator):
     """A class representing an object detection filter for image processing."""
 
+    accepted_channels = (1,)
+    accepted_depths = (cv2.CV_8U,)
+    output_channels = 3
+
     def __init__(self, wrapped: ImageProcessingStrategy) -> None:
         """Initialize the GreyCodeKernelFilter.
 
@@ -458,7 +565,7 @@ class ContoursDetectionFilter(ImageProcessingDecorator):
         """
         super().__init__(wrapped)
 
-    def process(self, _frame: Image) -> UMat:
+    def apply(self, frame: Image) -> UMat:
         """Apply contour detection to the image.
 
         Args:
@@ -467,11 +574,10 @@ class ContoursDetectionFilter(ImageProcessingDecorator):
         Returns:
             UMat: The processed image.
         """
-        frame = super().process(_frame)
         contours, _ = cv2.findContours(
             frame, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
         )
-        output = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
+        output = self.keep(cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR, dst=self.buffer()))
         for countour in contours:
             if cv2.contourArea(countour) > 100:  # Filter out small contours
                 x, y, w, h = cv2.boundingRect(countour)
@@ -482,6 +588,8 @@ class ContoursDetectionFilter(ImageProcessingDecorator):
 class HaarCascadeFaceDetectionFilter(ImageProcessingDecorator):
     """A class representing a Haar cascade face detection filter for image processing."""
 
+    accepted_channels = (3,)
+
     def __init__(self, wrapped: ImageProcessingStrategy) -> None:
         """Initialize the HaarCascadeFaceDetectionFilter.
 
@@ -493,7 +601,7 @@ class HaarCascadeFaceDetectionFilter(ImageProcessingDecorator):
             "data/lbpcascade_frontalface.xml"  # type: ignore
         )
 
-    def process(self, _frame: Image) -> UMat:
+    def apply(self, frame: Image) -> UMat:
         """Process an image.
 
         Args:
@@ -502,8 +610,11 @@ class HaarCascadeFaceDetectionFilter(ImageProcessingDecorator):
         Returns:
             UMat: The processed image.
         """
-        frame = super().process(_frame)
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        gray = self.keep(
+            cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self.buffer("gray", True)),
+            "gray",
+            True,
+        )
         faces = self.face_cascade.detectMultiScale(gray, 1.3, 5)
         for x, y, w, h in faces:
             cv2.rectangle(frame, (x, y), (x + w, y + h), (255, 0, 0), 2)
@@ -513,6 +624,8 @@ class HaarCascadeFaceDetectionFilter(ImageProcessingDecorator):
 class YUNetFaceDetectionFilter(ImageProcessingDecorator):
     """A class representing a YUnet DNN face detection filter for image processing."""
 
+    accepted_channels = (3,)
+
     def __init__(self, wrapped: ImageProcessingStrategy) -> None:
         """Initialize the YUNetFaceDetectionFilter.
 
@@ -528,7 +641,7 @@ class YUNetFaceDetectionFilter(ImageProcessingDecorator):
             target_id=cv2.dnn.DNN_TARGET_OPENCL,
         )
 
-    def process(self, _frame: Image) -> UMat:
+    def apply(self, frame: Image) -> UMat:
         """Process an image.
 
         Args:
@@ -538,7 +651,6 @@ class YUNetFaceDetectionFilter(ImageProcessingDecorator):
             UMat: The processed image.
         """
         # face_detection_yunet_2023mar.onnx
-        frame = super().process(_frame)
         frame_mat = frame.get()
         heigh, width, _ = frame_mat.shape
         self.detector.setInputSize((width, heigh))
@@ -0,0 +1,139 @@
+"""A frame that knows whether its pixels live in host memory, device memory or both.
+
+Converting between a cv2.UMat and a NumPy array copies the whole image (several
+megabytes per frame at 720p). A Frame keeps the representation it was given and only
+converts when a stage asks for the other one, keeping both copies until a stage writes
+a new image. Every conversion is counted, per frame and for the whole process.
+"""
+
+import threading
+from enum import Enum
+from typing import Optional, Union
+
+import cv2
+import numpy as np
+from numpy.typing import NDArray
+
+
+class Location(Enum):
+    """Where the pixels of an image are stored."""
+
+    # NumPy array in host memory
+    HOST = "host"
+    # cv2.UMat, in device memory when OpenCL is available
+    DEVICE = "device"
+
+
+class TransferCounter:
+    """Count the conversions between host and device memory.
+
+    Attributes:
+        uploads (int): The number of host to device conversions.
+        downloads (int): The number of device to host conversions.
+        bytes (int): The number of bytes copied by the conversions.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the TransferCounter."""
+        self._lock = threading.Lock()
+        self.uploads = 0
+        self.downloads = 0
+        self.bytes = 0
+
+    def count(self, location: Location, size: int) -> None:
+        """Count a conversion.
+
+        Args:
+            location (Location): The destination of the conversion.
+            size (int): The number of bytes copied.
+        """
+        with self._lock:
+            if location is Location.DEVICE:
+                self.uploads += 1
+            else:
+                self.downloads += 1
+            self.bytes += size
+
+    def reset(self) -> None:
+        """Reset the counters."""
+        with self._lock:
+            self.uploads = 0
+            self.downloads = 0
+            self.bytes = 0
+
+
+# Conversions of every frame of the process
+transfers = TransferCounter()
+
+
+class Frame:
+    """An image kept in host memory, device memory or both, converted on demand.
+
+    Attributes:
+        sequence (int): The sequence number of the frame in its stream, -1 if unknown.
+        uploads (int): The number of host to device conversions of this frame.
+        downloads (int): The number of device to host conversions of this frame.
+    """
+
+    def __init__(
+        self, image: Union[NDArray[np.uint8], cv2.UMat], sequence: int = -1
+    ) -> None:
+        """Initialize the Frame.
+
+        Args:
+            image (Union[NDArray[np.uint8], cv2.UMat]): The pixels of the frame.
+            sequence (int): The sequence number of the frame in its stream.
+        """
+        self.sequence = sequence
+        self.uploads = 0
+        self.downloads = 0
+        self._host: Optional[NDArray] = None
+        self._device: Optional[cv2.UMat] = None
+        self.update(image)
+
+    @property
+    def location(self) -> Location:
+        """Return where the current pixels are, the device when both copies are kept."""
+        return Location.DEVICE if self._device is not None else Location.HOST
+
+    @property
+    def data(self) -> Union[NDArray, cv2.UMat]:
+        """Return the pixels where they are, without any conversion."""
+        return self._device if self._device is not None else self._host  # type: ignore
+
+    def host(self) -> NDArray:
+        """Return the pixels as a NumPy array, downloading them if needed."""
+        if self._host is None:
+            self._host = self._device.get()  # type: ignore
+            self.downloads += 1
+            transfers.count(Location.HOST, self._host.nbytes)  # type: ignore
+        return self._host  # type: ignore
+
+    def device(self) -> cv2.UMat:
+        """Return the pixels as a cv2.UMat, uploading them if needed."""
+        if self._device is None:
+            self._device = cv2.UMat(self._host)  # type: ignore
+            self.uploads += 1
+            transfers.count(Location.DEVICE, self._host.nbytes)  # type: ignore
+        return self._device
+
+    def get(self, location: Optional[Location]) -> Union[NDArray, cv2.UMat]:
+        """Return the pixels in the given memory, where they are if None."""
+        match location:
+            case Location.HOST:
+                return self.host()
+            case Location.DEVICE:
+                return self.device()
+            case _:
+                return self.data
+
+    def update(self, image: Union[NDArray, cv2.UMat]) -> None:
+        """Replace the pixels, dropping the copy in the other memory.
+
+        Args:
+            image (Union[NDArray, cv2.UMat]): The new pixels.
+        """
+        if isinstance(image, cv2.UMat):
+            self._device, self._host = image, None
+        else:
+            self._host, self._device = image, None
@@ -0,0 +1,199 @@
+"""A registry of the convolution kernels used by the filters.
+
+Kernels are built once, with a floating point dtype so that negative and fractional
+weights are kept, and uploaded once to the device. Filters sharing the same weights
+share the same kernel. Rank 1 kernels can also be split into two 1D kernels, to run
+the convolution as two cheaper passes with cv2.sepFilter2D.
+"""
+
+import threading
+from typing import Optional, Sequence, Tuple, Union
+
+import cv2
+import numpy as np
+from cv2 import UMat
+from numpy.typing import DTypeLike, NDArray
+
+from pyvision.models import Image
+
+KernelKey = Tuple[Tuple[int, ...], bytes, str]
+
+
+class Kernel:
+    """A convolution kernel kept both in host memory and in device memory.
+
+    Attributes:
+        host (NDArray): The read-only weights in host memory.
+        device (UMat): The weights in device memory.
+    """
+
+    def __init__(self, weights: NDArray[np.floating]) -> None:
+        """Initialize the Kernel.
+
+        Args:
+            weights (NDArray[np.floating]): The weights of the kernel.
+        """
+        self.host = np.ascontiguousarray(weights)
+        self.host.flags.writeable = False
+        self.device = UMat(self.host)
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        """Return the shape of the kernel."""
+        return self.host.shape
+
+    def for_frame(self, frame: Image) -> Union[NDArray[np.floating], UMat]:
+        """Return the kernel in the same memory as the frame.
+
+        OpenCV returns a UMat as soon as one of its inputs is a UMat, so a host frame must
+        be convolved with the host kernel to stay on the host.
+
+        Args:
+            frame (Image): The frame the kernel is applied to.
+
+        Returns:
+            The device kernel for a UMat frame, the host kernel otherwise.
+        """
+        return self.device if isinstance(frame, UMat) else self.host
+
+
+_kernels: dict[KernelKey, Kernel] = {}
+_lock = threading.Lock()
+
+
+def get_kernel(
+    weights: Union[Sequence[Sequence[float]], NDArray[np.number]],
+    scale: float = 1.0,
+    dtype: DTypeLike = np.float32,
+) -> Kernel:
+    """Return the shared kernel for the given weights, building it on first use.
+
+    Args:
+        weights: The weights of the kernel, before scaling.
+        scale (float): A factor applied to every weight, e.g. 1 / 16 to normalize.
+        dtype (DTypeLike): The floating point dtype of the kernel.
+
+    Returns:
+        Kernel: The kernel, shared by every caller asking for the same weights.
+    """
+    array = (np.asarray(weights, dtype=np.float64) * scale).astype(dtype)
+    key: KernelKey = (array.shape, array.tobytes(), array.dtype.str)
+    with _lock:
+        kernel = _kernels.get(key)
+        if kernel is None:
+            kernel = _kernels[key] = Kernel(array)
+        return kernel
+
+
+def get_gaussian_kernel(
+    size: int, sigma: float, dtype: DTypeLike = np.float32
+) -> Kernel:
+    """Return the shared square Gaussian kernel, built from a 1D one.
+
+    The kernel is the outer product of a 1D Gaussian with itself, so that it separates
+    exactly, unlike the integer approximations found in the literature.
+
+    Args:
+        size (int): The side of the kernel, odd.
+        sigma (float): The standard deviation of the Gaussian, in pixels.
+        dtype (DTypeLike): The floating point dtype of the kernel.
+
+    Returns:
+        Kernel: The kernel, normalized to a sum of 1.
+    """
+    column = cv2.getGaussianKernel(size, sigma, cv2.CV_64F)
+    return get_kernel(column @ column.T, dtype=dtype)
+
+
+def registry_size() -> int:
+    """Return the number of distinct kernels built so far."""
+    return len(_kernels)
+
+
+class SeparableKernel:
+    """A 2D kernel written as the outer product of a column and a row kernel.
+
+    Convolving with the column and then the row kernel costs rows + columns multiply-adds
+    per pixel instead of rows * columns for the 2D kernel.
+
+    Attributes:
+        column (Kernel): The vertical 1D kernel.
+        row (Kernel): The horizontal 1D kernel.
+    """
+
+    def __init__(self, column: Kernel, row: Kernel) -> None:
+        """Initialize the SeparableKernel.
+
+        Args:
+            column (Kernel): The vertical 1D kernel.
+            row (Kernel): The horizontal 1D kernel.
+        """
+        self.column = column
+        self.row = row
+
+    def for_frame(
+        self, frame: Image
+    ) -> Tuple[Union[NDArray[np.floating], UMat], Union[NDArray[np.floating], UMat]]:
+        """Return the row and column kernels in the same memory as the frame.
+
+        Args:
+            frame (Image): The frame the kernel is applied to.
+
+        Returns:
+            The row and the column kernels, in the order expected by cv2.sepFilter2D.
+        """
+        return self.row.for_frame(frame), self.column.for_frame(frame)
+
+
+def get_separable_kernel(
+    column: Sequence[float],
+    row: Sequence[float],
+    scale: float = 1.0,
+    dtype: DTypeLike = np.float32,
+) -> SeparableKernel:
+    """Return the shared separable kernel declared by its column and row kernels.
+
+    Args:
+        column (Sequence[float]): The vertical 1D kernel.
+        row (Sequence[float]): The horizontal 1D kernel.
+        scale (float): A factor applied to the 2D kernel, given to the column kernel.
+        dtype (DTypeLike): The floating point dtype of the kernels.
+
+    Returns:
+        SeparableKernel: The separable kernel.
+    """
+    return SeparableKernel(
+        get_kernel(np.reshape(column, (-1, 1)), scale, dtype),
+        get_kernel(np.reshape(row, (1, -1)), 1.0, dtype),
+    )
+
+
+def separate(kernel: Kernel, tolerance: float = 1e-6) -> Optional[SeparableKernel]:
+    """Decompose a 2D kernel into a column and a row kernel when it is rank 1.
+
+    The decomposition is the closest rank 1 approximation of the kernel, given by its
+    singular value decomposition.
+
+    Args:
+        kernel (Kernel): The kernel to decompose.
+        tolerance (float): The largest error accepted on a weight, relative to the
+            largest weight. Use math.inf to always get the closest approximation.
+
+    Returns:
+        Optional[SeparableKernel]: The decomposition, None if the kernel is not separable
+        within the tolerance.
+    """
+    weights = kernel.host.astype(np.float64)
+    if weights.ndim != 2 or not weights.any():
+        return None
+
+    u, s, vt = np.linalg.svd(weights)
+    column = u[:, 0] * np.sqrt(s[0])
+    row = vt[0] * np.sqrt(s[0])
+    if column.sum() < 0:  # Keep the signs of the kernel on the row, e.g. for Sobel
+        column, row = -column, -row
+
+    error = np.abs(np.outer(column, row) - weights).max()
+    if error > tolerance * np.abs(weights).max():
+        return None
+    return get_separable_kernel(column, row, dtype=kernel.host.dtype)
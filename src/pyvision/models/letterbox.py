@@ -0,0 +1,163 @@
+"""A module preparing the frames for a YOLO model of fixed input size.
+
+The frames are letterboxed: resized to fit the square input of the model, keeping their
+aspect ratio, and padded with gray. The scale and padding only depend on the frame
+resolution and are computed once per resolution; the frames are resized straight into
+a buffer kept from one frame to the next, whose borders are only painted when the
+resolution changes, and the color conversion, normalization and HWC to CHW transposition
+are done in a single pass into a reused blob. The boxes found by the model are mapped
+back to the frame with a few vectorized operations.
+"""
+
+from typing import Dict, Tuple
+
+import cv2
+import numpy as np
+from numpy.typing import NDArray
+
+# Gray level of the borders added to keep the aspect ratio, as in the YOLO training
+PAD_VALUE = 114
+
+# The scale, the (x, y) padding and the resized (width, height) of a resolution
+Geometry = Tuple[float, int, int, int, int]
+
+# The number of resolutions whose geometry is kept: a stream has one, but the regions
+# of a frame detected apart (see pyvision.models.motion) have sizes of their own
+MAX_GEOMETRIES = 16
+
+
+class Letterbox:
+    """Resize frames into the square input of a model, keeping their aspect ratio.
+
+    The returned inputs are views of buffers owned by the Letterbox: an input must be
+    consumed before the same slot is letterboxed again.
+
+    Attributes:
+        size (int): The side of the square input.
+        normalize (bool): Whether the inputs are (1, 3, size, size) float32 RGB blobs in
+            [0, 1], or (size, size, 3) uint8 BGR images.
+        pad_value (int): The gray level of the borders.
+    """
+
+    def __init__(
+        self, size: int, normalize: bool = True, pad_value: int = PAD_VALUE
+    ) -> None:
+        """Initialize the Letterbox.
+
+        Args:
+            size (int): The side of the square input.
+            normalize (bool): Whether to output float32 RGB blobs rather than uint8
+                BGR images.
+            pad_value (int): The gray level of the borders.
+        """
+        self.size = size
+        self.normalize = normalize
+        self.pad_value = pad_value
+        self._geometries: Dict[Tuple[int, int], Geometry] = {}
+        self._images: Dict[int, NDArray[np.uint8]] = {}
+        self._blobs: Dict[int, NDArray[np.float32]] = {}
+        self._painted: Dict[int, Geometry] = {}
+
+    def geometry(self, width: int, height: int) -> Geometry:
+        """Return the scale, padding and resized size of a resolution.
+
+        Args:
+            width (int): The width of the frames.
+            height (int): The height of the frames.
+
+        Returns:
+            Geometry: The scale, the (x, y) padding and the resized (width, height).
+        """
+        geometry = self._geometries.get((width, height))
+        if geometry is None:
+            scale = min(self.size / width, self.size / height)
+            resized_width = round(width * scale)
+            resized_height = round(height * scale)
+            geometry = (
+                scale,
+                (self.size - resized_width) // 2,
+                (self.size - resized_height) // 2,
+                resized_width,
+                resized_height,
+            )
+            if len(self._geometries) >= MAX_GEOMETRIES:
+                del self._geometries[next(iter(self._geometries))]  # The oldest one
+            self._geometries[(width, height)] = geometry
+        return geometry
+
+    def __call__(self, image: NDArray[np.uint8], slot: int = 0) -> NDArray:
+        """Letterbox a BGR frame.
+
+        Args:
+            image (NDArray[np.uint8]): The BGR frame.
+            slot (int): The buffer to letterbox into, one per image of a batch.
+
+        Returns:
+            NDArray: The input of the model, a view of the buffer of the slot.
+        """
+        height, width = image.shape[:2]
+        geometry = self.geometry(width, height)
+        _, pad_x, pad_y, resized_width, resized_height = geometry
+        boxed = self._images.get(slot)
+        if boxed is None:
+            boxed = self._images[slot] = np.empty(
+                (self.size, self.size, 3), dtype=np.uint8
+            )
+        if self._painted.get(slot) != geometry:
+            # The resize only writes the inner region, paint the borders around it
+            bottom, right = pad_y + resized_height, pad_x + resized_width
+            boxed[:pad_y] = self.pad_value
+            boxed[bottom:] = self.pad_value
+            boxed[pad_y:bottom, :pad_x] = self.pad_value
+            boxed[pad_y:bottom, right:] = self.pad_value
+            self._painted[slot] = geometry
+
+        inner = boxed[pad_y : pad_y + resized_height, pad_x : pad_x + resized_width]
+        if (resized_width, resized_height) == (width, height):
+            np.copyto(inner, image)
+        else:
+            cv2.resize(
+                image,
+                (resized_width, resized_height),
+                dst=inner,
+                interpolation=cv2.INTER_LINEAR,
+            )
+        if not self.normalize:
+            return boxed
+
+        blob = self._blobs.get(slot)
+        if blob is None:
+            blob = self._blobs[slot] = np.empty(
+                (1, 3, self.size, self.size), dtype=np.float32
+            )
+        # BGR to RGB, HWC to CHW and scaling to [0, 1], every pixel read once
+        for channel in range(3):
+            np.multiply(
+                boxed[:, :, 2 - channel],
+                np.float32(1 / 255),
+                out=blob[0, channel],
+                dtype=np.float32,
+            )
+        return blob
+
+    def to_image(
+        self, detections: NDArray[np.float32], width: int, height: int
+    ) -> NDArray[np.float32]:
+        """Map detections from the input of the model back to the frame, in place.
+
+        Args:
+            detections (NDArray[np.float32]): The (N, 6) detections, in input pixels.
+            width (int): The width of the frame.
+            height (int): The height of the frame.
+
+        Returns:
+            NDArray[np.float32]: The detections, in frame pixels.
+        """
+        scale, pad_x, pad_y, _, _ = self.geometry(width, height)
+        boxes = detections[:, :4]
+        boxes -= np.array((pad_x, pad_y, pad_x, pad_y), dtype=np.float32)
+        boxes /= scale
+        np.clip(
+            boxes, 0, np.array((width, height, width, height), np.float32), out=boxes
+        )
+        return detections
@@ -0,0 +1,253 @@
+"""A module finding the moving regions of a frame and detecting objects in them only.
+
+Most camera views are a static background: the MotionDetection stage compares a small
+grayscale copy of every frame with a running average of the previous ones and reports
+the regions that changed. The MotionGatedDetection stage then runs the detector on
+these regions only, mapping the boxes back to the full frame, and skips it entirely
+when nothing moved.
+"""
+
+import math
+from typing import Any, List, Optional
+
+import cv2
+import numpy as np
+from numpy.typing import NDArray
+
+from pyvision.models import Image, ImageProcessingDecorator, ImageProcessingStrategy
+from pyvision.models.filters import GAUSSIAN_5X5
+from pyvision.models.frame import Location
+from pyvision.models.kernels import get_kernel, separate
+from pyvision.models.yolo import no_detections
+
+
+def merge_regions(regions: NDArray[np.int32]) -> NDArray[np.int32]:
+    """Merge the overlapping regions until none overlaps another one.
+
+    Args:
+        regions (NDArray[np.int32]): The (K, 4) regions as (x1, y1, x2, y2).
+
+    Returns:
+        NDArray[np.int32]: The merged regions.
+    """
+    while len(regions) > 1:
+        overlaps = (
+            (regions[:, None, 0] <= regions[None, :, 2])
+            & (regions[None, :, 0] <= regions[:, None, 2])
+            & (regions[:, None, 1] <= regions[None, :, 3])
+            & (regions[None, :, 1] <= regions[:, None, 3])
+        )
+        # Label every region with the smallest index of its connected component
+        labels = np.arange(len(regions))
+        while True:
+            merged = np.where(overlaps, labels[None, :], len(regions)).min(axis=1)
+            if np.array_equal(merged, labels):
+                break
+            labels = merged
+        groups = np.unique(labels)
+        if len(groups) == len(regions):
+            break
+        merged_regions = np.empty((len(groups), 4), dtype=regions.dtype)
+        for index, group in enumerate(groups):
+            members = regions[labels == group]
+            merged_regions[index, :2] = members[:, :2].min(axis=0)
+            merged_regions[index, 2:] = members[:, 2:].max(axis=0)
+        regions = merged_regions
+    return regions
+
+
+class MotionDetection(ImageProcessingDecorator):
+    """A stage finding the regions of the frame that changed.
+
+    The frame is converted to grayscale, downscaled, smoothed with the separable
+    Gaussian kernel of the filters and compared with a running average of the previous
+    frames. The changed pixels are dilated into blobs whose bounding boxes, padded and
+    merged, are the moving regions. The first frame is a single moving region.
+
+    Attributes:
+        width (int): The width of the downscaled copy.
+        threshold (int): The gray level difference over which a pixel changed.
+        learning_rate (float): The weight of the frame in the running average.
+        min_area (int): The area under which a blob is noise, in downscaled pixels.
+        margin (int): The padding of the regions, in full frame pixels.
+        regions (NDArray[np.int32]): The (K, 4) moving regions of the last frame, as
+            (x1, y1, x2, y2) in full frame coordinates.
+    """
+
+    location = Location.HOST
+    read_only = True
+
+    def __init__(
+        self,
+        wrapped: ImageProcessingStrategy,
+        width: int = 320,
+        threshold: int = 25,
+        learning_rate: float = 0.05,
+        min_area: int = 16,
+        margin: int = 16,
+    ) -> None:
+        """Initialize the MotionDetection.
+
+        Args:
+            wrapped (ImageProcessingStrategy): The wrapped image processing strategy.
+            width (int): The width of the downscaled copy.
+            threshold (int): The gray level difference over which a pixel changed.
+            learning_rate (float): The weight of the frame in the running average.
+            min_area (int): The area under which a blob is noise, in downscaled pixels.
+            margin (int): The padding of the regions, in full frame pixels.
+        """
+        super().__init__(wrapped)
+        self.width = width
+        self.threshold = threshold
+        self.learning_rate = learning_rate
+        self.min_area = min_area
+        self.margin = margin
+        self.smoothing = separate(get_kernel(GAUSSIAN_5X5, 1 / 159.0), math.inf)
+        self.kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
+        self.regions = np.empty((0, 4), dtype=np.int32)
+        self._background: Optional[NDArray[np.float32]] = None
+
+    def apply(self, frame: Image) -> Image:
+        """Find the moving regions of the frame.
+
+        Args:
+            frame (Image): The image, left untouched.
+
+        Returns:
+            Image: The image, unchanged.
+        """
+        height, width = frame.shape[:2]
+        scale = width / self.width
+        size = (self.width, max(1, round(height / scale)))
+        gray = frame
+        if frame.ndim == 3:
+            gray = self.keep(
+                cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY, dst=self.buffer("gray", True)),
+                "gray",
+                True,
+            )
+        small = self.keep(
+            cv2.resize(gray, size, self.buffer("small"), interpolation=cv2.INTER_AREA),
+            "small",
+        )
+        row, column = self.smoothing.for_frame(small)  # type: ignore
+        small = self.keep(
+            cv2.sepFilter2D(small, -1, row, column, dst=self.buffer("smoothed")),
+            "smoothed",
+        )
+
+        if self._background is None or self._background.shape != small.shape:
+            self._background = small.astype(np.float32)
+            self.regions = np.array([[0, 0, width, height]], dtype=np.int32)
+            return frame
+
+        reference = self.keep(
+            cv2.convertScaleAbs(self._background, self.buffer("reference")),
+            "reference",
+        )
+        mask = self.keep(cv2.absdiff(small, reference, self.buffer("mask")), "mask")
+        cv2.threshold(mask, self.threshold, 255, cv2.THRESH_BINARY, mask)
+        cv2.dilate(mask, self.kernel, mask, iterations=2)
+        cv2.accumulateWeighted(small, self._background, self.learning_rate)
+
+        _, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+        stats = stats[1:]  # The first component is the background
+        stats = stats[stats[:, cv2.CC_STAT_AREA] >= self.min_area]
+        regions = np.empty((len(stats), 4), dtype=np.int32)
+        regions[:, :2] = stats[:, :2] * scale - self.margin
+        regions[:, 2:] = (stats[:, :2] + stats[:, 2:4]) * scale + self.margin
+        regions[:, [0, 2]] = np.clip(regions[:, [0, 2]], 0, width)
+        regions[:, [1, 3]] = np.clip(regions[:, [1, 3]], 0, height)
+        self.regions = merge_regions(regions)
+        return frame
+
+
+class MotionGatedDetection(ImageProcessingDecorator):
+    """A stage running a detection stage on the moving regions of the frame only.
+
+    It takes the place of the detection stage in the pipeline, after the MotionDetection
+    stage it creates, and exposes its own detections: the detections of the moving
+    regions, mapped back to the full frame, and the previous detections of the still
+    parts of the frame. The detection is skipped when nothing moved, and runs on the
+    full frame when the regions cover most of it.
+
+    Attributes:
+        detector: The detection stage, e.g. a YoloObjectDetection.
+        motion (MotionDetection): The stage finding the moving regions.
+        full_frame_ratio (float): The share of the frame covered by the regions over
+            which the detection runs on the full frame.
+        detections (NDArray[np.float32]): The (N, 6) detections of the last frame.
+        generation (int): The number of frames the detection ran on.
+        skipped (int): The number of frames nothing moved in.
+    """
+
+    location = Location.HOST
+    read_only = True
+
+    def __init__(
+        self,
+        detector: Any,
+        motion: Optional[MotionDetection] = None,
+        full_frame_ratio: float = 0.5,
+    ) -> None:
+        """Initialize the MotionGatedDetection.
+
+        Args:
+            detector: The detection stage, exposing detect and classes.
+            motion (Optional[MotionDetection]): The stage finding the moving regions,
+                a default one if None.
+            full_frame_ratio (float): The share of the frame covered by the regions
+                over which the detection runs on the full frame.
+        """
+        self.motion = (
+            motion if motion is not None else MotionDetection(detector.wrapped)
+        )
+        super().__init__(self.motion)
+        self.detector = detector
+        self.accepted_channels = detector.accepted_channels
+        self.full_frame_ratio = full_frame_ratio
+        self.detections = no_detections()
+        self.generation = 0
+        self.skipped = 0
+
+    @property
+    def classes(self) -> List[str]:
+        """Return the class names of the detector."""
+        return self.detector.classes
+
+    def apply(self, frame: Image) -> Image:
+        """Detect the objects of the moving regions of the frame.
+
+        Args:
+            frame (Image): The image, left untouched.
+
+        Returns:
+            Image: The image, unchanged.
+        """
+        regions = self.motion.regions
+        if not len(regions):
+            self.skipped += 1  # Nothing moved, the detections still hold
+            return frame
+
+        height, width = frame.shape[:2]
+        areas = (regions[:, 2] - regions[:, 0]) * (regions[:, 3] - regions[:, 1])
+        if areas.sum() >= self.full_frame_ratio * width * height:
+            self.detections = self.detector.detect([frame])[0]
+        else:
+            crops = [frame[y1:y2, x1:x2] for x1, y1, x2, y2 in regions.tolist()]
+            found = self.detector.detect(crops)
+            for detections, (x1, y1, _, _) in zip(found, regions.tolist()):
+                detections[:, [0, 2]] += x1
+                detections[:, [1, 3]] += y1
+
+            # Keep the previous detections lying entirely in the still parts
+            previous = self.detections
+            outside = ~(
+                (previous[:, None, 0] <= regions[None, :, 2])
+                & (regions[None, :, 0] <= previous[:, None, 2])
+                & (previous[:, None, 1] <= regions[None, :, 3])
+                & (regions[None, :, 1] <= previous[:, None, 3])
+            ).any(axis=1)
+            self.detections = np.concatenate([previous[outside], *found])
+        self.generation += 1
+        return frame
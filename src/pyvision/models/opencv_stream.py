@@ -2,12 +2,19 @@
 
 import threading
 from enum import Enum
-from typing import Tuple, TypedDict, Union
+from typing import Any, NotRequired, Optional, Tuple, TypedDict, Union
 
 import cv2
-from cv2 import VideoCapture
 from typing_extensions import Unpack
 
+from pyvision.camera.backends import (
+    CaptureBackend,
+    CaptureSource,
+    open_capture,
+    resolve_backend,
+)
+from pyvision.utils.ring_buffer import DropPolicy, RingBuffer
+
 
 class StreamSettings(TypedDict):
     """TypedDict representing the settings for an OpenCV camera."""
@@ -16,6 +23,10 @@ class StreamSettings(TypedDict):
     width: int
     height: int
     desired_fps: int
+    backend: NotRequired[CaptureBackend]
+    max_frames: NotRequired[int]
+    buffer_size: NotRequired[int]
+    drop_policy: NotRequired[DropPolicy]
 
 
 class ReadError(Enum):
@@ -28,7 +39,15 @@ class ReadError(Enum):
 
 
 class OpenCVVideoStream(threading.Thread):
-    """Class representing an OpenCV video stream."""
+    """Class representing an OpenCV video stream.
+
+    Frames are grabbed on this thread into a preallocated ring buffer, so capture and
+    processing can run at their own rates without sharing a single frame buffer.
+
+    It implements the VideoStreamProvider interface, the source being opened through
+    one of the capture backends. Non live sources (files, image directories and the
+    synthetic generator) end the stream once exhausted or after max_frames frames.
+    """
 
     def __init__(self, **kwargs: Unpack[StreamSettings]) -> None:
         """Initialize the OpenCVVideoStream object.
@@ -43,30 +62,58 @@ class OpenCVVideoStream(threading.Thread):
         self.width = kwargs.get("width", 960)
         self.height = kwargs.get("height", 540)
         self.desired_fps = kwargs.get("desired_fps", 24)
+        self.requested_backend = kwargs.get("backend", CaptureBackend.AUTO)
+        self.max_frames = kwargs.get("max_frames", 0)
+        self.grabbed_frames = 0
         self.running = False
-        self.frame = cv2.UMat(
-            self.height, self.width, cv2.CV_8UC3, cv2.USAGE_ALLOCATE_DEVICE_MEMORY
+        self.backend = resolve_backend(path, self.requested_backend)
+        # Replayed sources must not lose frames, live ones must not lag behind
+        default_policy = (
+            DropPolicy.LATEST_ONLY if self.backend.is_live else DropPolicy.NEVER_DROP
+        )
+        self.frames: RingBuffer[cv2.UMat] = RingBuffer(
+            kwargs.get("buffer_size", 4),
+            lambda: cv2.UMat(
+                self.height, self.width, cv2.CV_8UC3, cv2.USAGE_ALLOCATE_DEVICE_MEMORY
+            ),
+            kwargs.get("drop_policy", default_policy),
         )
+        self.sequence = -1
         self.update_stream_path(path)
-        self.read_lock = threading.Lock()
 
-    def update_stream_path(self, path: Union[int, str]) -> cv2.VideoCapture:
+    def update_stream_path(
+        self, path: Union[int, str], backend: Optional[CaptureBackend] = None
+    ) -> CaptureSource:
         """Update the stream path and configure the video capture object.
 
         Args:
             path (Union[int, str]): The path to the video file or the index of the camera.
+            backend (Optional[CaptureBackend]): The backend to open the path with,
+                defaults to the backend requested in the stream settings.
 
         Returns:
-            cv2.VideoCapture: The updated video capture object.
+            CaptureSource: The updated video capture object.
 
         """
         self.path = path
+        if backend is not None:
+            self.requested_backend = backend
+        self.backend = resolve_backend(path, self.requested_backend)
 
-        self.stream: VideoCapture = cv2.VideoCapture(self.path, cv2.CAP_MSMF)
+        self.stream: CaptureSource = open_capture(
+            self.path, self.backend, self.width, self.height, self.desired_fps
+        )
         self.stream.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
         self.stream.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        # Files and image directories keep their own resolution
+        self.width = int(self.stream.get(cv2.CAP_PROP_FRAME_WIDTH)) or self.width
+        self.height = int(self.stream.get(cv2.CAP_PROP_FRAME_HEIGHT)) or self.height
+
         max_supported_fps = self.stream.get(cv2.CAP_PROP_FPS)
         print(f"Max supported FPS: {max_supported_fps}")
+        if max_supported_fps <= 0:
+            # Some backends do not report the frame rate
+            max_supported_fps = self.desired_fps
         if self.desired_fps > max_supported_fps:
             print(
                 f"You request more FPS that the backend actually support. falling back to {max_supported_fps}"
@@ -76,30 +123,101 @@ class OpenCVVideoStream(threading.Thread):
 
         return self.stream
 
-    def read_frame(self) -> Tuple[ReadError, cv2.UMat]:
+    def read_frame(self, timeout: Optional[float] = 0.0) -> Tuple[ReadError, cv2.UMat]:
         """Read a frame from the video stream.
 
+        The returned frame stays valid until the next call, the grabber never writes into
+        it in the meantime. The sequence number of the frame is stored in `sequence`.
+
+        Args:
+            timeout (Optional[float]): Maximum time to wait for a new frame. When none
+                arrives in time the previous frame is returned again.
+
         Returns:
-            A tuple containing a boolean indicating if the frame was successfully read and the frame itself.
+            A tuple containing the read error state and the frame itself.
+
+        """
+        slot = self.frames.read(timeout)
+        if slot is None:
+            if self.frames.closed:
+                return ReadError.NO_STREAM, None  # type: ignore
+            return ReadError.NO_FRAME, None  # type: ignore
+        self.sequence, frame = slot
+        return ReadError.NO_ERROR, frame
+
+    @property
+    def dropped_frames(self) -> int:
+        """Return the number of grabbed frames that were never read."""
+        return self.frames.dropped
 
+    @property
+    def duplicated_frames(self) -> int:
+        """Return the number of reads that returned the previous frame again."""
+        return self.frames.duplicated
+
+    def update(self) -> bool:
+        """Grab the next frame of the source into the ring buffer.
+
+        With the NEVER_DROP policy this blocks until the consumer frees a slot.
+
+        Returns:
+            bool: False when no frame could be grabbed or the ring buffer is closed.
         """
-        with self.read_lock:
-            if not self.frame:
-                return ReadError.NO_FRAME, self.frame
-            return ReadError.NO_ERROR, self.frame
+        if self.max_frames and self.grabbed_frames >= self.max_frames:
+            return False
+        # A slot is acquired before grabbing, so that no grabbed frame is lost: with
+        # NEVER_DROP this waits for the consumer, with LATEST_ONLY the oldest unread
+        # frame is recycled and counted as dropped
+        slot = self.frames.acquire()
+        if slot is None:  # Closed
+            return False
+        index, buffer = slot
+        if not self.stream.grab():
+            self.frames.abort(index)
+            return False
+        self.grabbed_frames += 1
+
+        retrieved, frame = self.stream.retrieve(buffer)
+        if retrieved:
+            self.frames.commit(index, frame)
+        else:
+            self.frames.abort(index)
+        return True
+
+    def read(self) -> Tuple[ReadError, cv2.UMat]:
+        """Return the frame most recently read, see read_frame."""
+        return self.read_frame()
+
+    def info(self) -> dict[str, Any]:
+        """Return the information about the video stream."""
+        return {
+            "path": self.path,
+            "backend": self.backend.value,
+            "width": self.width,
+            "height": self.height,
+            "fps": self.fps,
+            "grabbed_frames": self.grabbed_frames,
+            "dropped_frames": self.dropped_frames,
+            "duplicated_frames": self.duplicated_frames,
+        }
+
+    def isOpened(self) -> bool:
+        """Check if the video stream is open."""
+        return self.stream.isOpened()
 
     def run(self) -> None:
         """Start the video stream."""
         self.running = True
         while self.running:
-            grabbed = self.stream.grab()
-            if grabbed:
-                with self.read_lock:
-                    self.stream.retrieve(self.frame)
+            if not self.update() and not self.backend.is_live:
+                print("end of stream")
+                self.frames.close()
+                break
 
     def stop(self) -> None:
         """Stop the video stream."""
         self.running = False
+        self.frames.close()
         self.join()
 
     def release(self) -> None:
@@ -0,0 +1,228 @@
+"""A module implementing the processing pipeline applied to every frame."""
+
+import timeit
+from typing import Callable, List, Optional, Sequence, Tuple, Union
+
+import cv2
+from cv2 import UMat
+
+from pyvision.models import Image, ImageProcessingDecorator, ImageProcessingStrategy
+from pyvision.models.buffers import BufferPool
+from pyvision.models.filters import NoOpFilter
+from pyvision.models.frame import Frame, Location
+from pyvision.utils.metrics import LatencyHistogram, metrics
+
+Stage = Union[ImageProcessingStrategy, Callable[[Image], UMat]]
+
+
+def flatten(stage: Stage) -> List[Stage]:
+    """Unroll a chain of decorators into the list of its stages.
+
+    Args:
+        stage (Stage): A strategy, possibly wrapping other ones, or a plain callable.
+            A bound process method is unrolled like its strategy.
+
+    Returns:
+        List[Stage]: The stages in the order they are applied.
+    """
+    owner = getattr(stage, "__self__", None)
+    if isinstance(owner, ImageProcessingStrategy) and stage.__name__ == "process":  # type: ignore
+        stage = owner
+
+    stages: List[Stage] = []
+    while isinstance(stage, ImageProcessingDecorator):
+        stages.append(stage)
+        stage = stage.wrapped
+    stages.append(stage)
+    stages.reverse()
+    return stages
+
+
+def stage_name(stage: Stage) -> str:
+    """Return a readable name for a stage."""
+    if isinstance(stage, ImageProcessingStrategy):
+        return type(stage).__name__
+    return getattr(stage, "__qualname__", type(stage).__name__)
+
+
+class Pipeline:
+    """An ordered list of stages, each one applied to the output of the previous one.
+
+    The pipeline is validated when it is built: every stage must accept the channel count
+    and the depth produced by the previous one. Redundant stages (repeated UMat wrapping
+    or a color conversion to the color space the image already has) are dropped then,
+    so that they cost nothing per frame.
+
+    The stages write their outputs into buffers of a pool shared by the pipeline, kept
+    from one frame to the next, so the output of a frame is only valid until the next
+    frame is processed. Copy it to keep it longer.
+
+    Frames go through the stages as Frame objects, converted between host and device
+    memory only when a stage needs the other memory (see ImageProcessingStrategy
+    location and read_only).
+
+    Attributes:
+        stages (List[Stage]): The stages run on every frame, in order.
+        skipped (List[str]): The names of the redundant stages dropped at build time.
+        timings (dict[str, float]): The duration of every stage on the last frame,
+            in seconds.
+        totals (dict[str, float]): The cumulated duration of every stage, in seconds.
+        count (int): The number of frames processed.
+        buffers (BufferPool): The buffers the stages write into.
+    """
+
+    def __init__(
+        self,
+        stages: Sequence[Stage] = (),
+        channels: int = 3,
+        depth: int = cv2.CV_8U,
+    ) -> None:
+        """Initialize the Pipeline.
+
+        Args:
+            stages (Sequence[Stage]): The stages to apply, chains of decorators included.
+            channels (int): The channel count of the input frames.
+            depth (int): The OpenCV depth of the input frames.
+        """
+        self.channels = channels
+        self.depth = depth
+        self._sources: List[Stage] = []
+        self.stages: List[Stage] = []
+        self.skipped: List[str] = []
+        self._compiled: List[
+            Tuple[
+                str,
+                Optional[Location],
+                bool,
+                Callable[[Image], UMat],
+                LatencyHistogram,
+            ]
+        ] = []
+        self.timings: dict[str, float] = {}
+        self.totals: dict[str, float] = {}
+        self.count = 0
+        self.buffers = BufferPool()
+        for stage in stages:
+            self._sources.extend(flatten(stage))
+        self.build()
+
+    def add(self, stage: Stage) -> None:
+        """Append a stage, or a chain of decorators, and rebuild the pipeline.
+
+        Args:
+            stage (Stage): The stage to append.
+
+        Raises:
+            ValueError: If the stage is not compatible with the previous ones.
+        """
+        previous = list(self._sources)
+        self._sources.extend(flatten(stage))
+        try:
+            self.build()
+        except ValueError:
+            self._sources = previous
+            raise
+
+    def build(self) -> None:
+        """Validate the stages and drop the redundant ones.
+
+        Raises:
+            ValueError: If a stage does not accept the output of the previous one.
+        """
+        channels: Optional[int] = self.channels
+        depth: Optional[int] = self.depth
+        wrapped = False
+        stages: List[Stage] = []
+        skipped: List[str] = []
+        for stage in self._sources:
+            name = stage_name(stage)
+            if not isinstance(stage, ImageProcessingStrategy):
+                # Nothing is known about a plain callable output
+                channels, depth = None, None
+                stages.append(stage)
+                continue
+
+            if isinstance(stage, NoOpFilter):
+                if wrapped:
+                    skipped.append(name)
+                    continue
+                wrapped = True
+            if stage.color_conversion and channels == stage.output_channels:
+                skipped.append(name)
+                continue
+
+            accepted = stage.accepted_channels
+            if (
+                accepted is not None
+                and channels is not None
+                and channels not in accepted
+            ):
+                raise ValueError(
+                    f"{name} expects {accepted} channel(s) but receives {channels}"
+                )
+            accepted = stage.accepted_depths
+            if accepted is not None and depth is not None and depth not in accepted:
+                raise ValueError(
+                    f"{name} expects depth {accepted} but receives {depth}"
+                )
+
+            channels = stage.output_channels or channels
+            depth = stage.output_depth if stage.output_depth is not None else depth
+            stages.append(stage)
+
+        self.stages = stages
+        self.skipped = skipped
+        self._compile()
+
+    def _compile(self) -> None:
+        names: List[str] = []
+        self._compiled = []
+        for stage in self.stages:
+            name = stage_name(stage)
+            if name in names:
+                name = f"{name}#{names.count(name) + 1}"
+            names.append(stage_name(stage))
+            histogram = metrics.histogram(f"stage/{name}")
+            if isinstance(stage, ImageProcessingStrategy):
+                stage.buffer_pool = self.buffers
+                self._compiled.append(
+                    (name, stage.location, stage.read_only, stage.apply, histogram)
+                )
+            else:
+                self._compiled.append((name, None, False, stage, histogram))
+        self.timings = {name: 0.0 for name, *_ in self._compiled}
+        self.totals = {name: 0.0 for name, *_ in self._compiled}
+        self.count = 0
+
+    def process(self, frame: Union[Image, Frame]) -> Frame:
+        """Apply every stage in order to a frame.
+
+        Args:
+            frame (Union[Image, Frame]): The frame to process.
+
+        Returns:
+            Frame: The frame holding the output of the last stage.
+        """
+        if not isinstance(frame, Frame):
+            frame = Frame(frame)  # type: ignore
+        for name, location, read_only, apply, histogram in self._compiled:
+            start = timeit.default_timer()
+            output = apply(frame.get(location))
+            if not read_only:
+                frame.update(output)
+            elapsed = timeit.default_timer() - start
+            self.timings[name] = elapsed
+            self.totals[name] += elapsed
+            histogram.record(elapsed)
+        self.count += 1
+        return frame
+
+    def stage_timings(self) -> dict[str, float]:
+        """Return the mean duration of every stage, in milliseconds."""
+        if not self.count:
+            return {name: 0.0 for name in self.totals}
+        return {name: 1000 * total / self.count for name, total in self.totals.items()}
+
+    def __len__(self) -> int:
+        """Return the number of stages run on every frame."""
+        return len(self.stages)
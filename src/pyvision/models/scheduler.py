@@ -0,0 +1,159 @@
+"""A module deciding on which frames the object detection runs.
+
+The detection is much slower than the capture, and the objects barely move from one
+frame to the next. The DetectionScheduler runs it every N frames, when the image
+changed enough, or as soon as the detector is free when it runs in the background, and
+reuses the last detections for the frames in between.
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, List, Optional
+
+import cv2
+import numpy as np
+from numpy.typing import NDArray
+
+from pyvision.models import Image, ImageProcessingDecorator
+from pyvision.models.frame import Location
+
+# Width of the thumbnails the motion score is computed on
+MOTION_WIDTH = 64
+
+
+class DetectionScheduler(ImageProcessingDecorator):
+    """A stage running a detection stage on some frames only.
+
+    It takes the place of the detection stage in the pipeline and exposes its
+    detections, so that it can be wrapped by DetectionAnnotation like the detector.
+
+    Attributes:
+        detector: The detection stage, e.g. a YoloObjectDetection.
+        every (int): The number of frames between two detections.
+        motion_threshold (Optional[float]): The mean absolute difference (0-255)
+            between the thumbnails of the last detected frame and the current one
+            over which the detection runs early. Motion is not measured if None.
+        asynchronous (bool): Whether the detection runs in a background thread.
+        runs (int): The number of detections started.
+        skipped (int): The number of frames the last detections were reused for.
+    """
+
+    location = Location.HOST
+    read_only = True
+
+    def __init__(
+        self,
+        detector: Any,
+        every: int = 1,
+        motion_threshold: Optional[float] = None,
+        asynchronous: bool = False,
+    ) -> None:
+        """Initialize the DetectionScheduler.
+
+        Args:
+            detector: The detection stage, exposing apply, detections and classes.
+            every (int): The number of frames between two detections, 1 to run it on
+                every frame (or as soon as the detector is free when asynchronous).
+            motion_threshold (Optional[float]): The motion score over which the
+                detection runs before every frames elapsed.
+            asynchronous (bool): Whether to run the detection in a background thread,
+                so that the frames are never held up by the detector.
+
+        Raises:
+            ValueError: If every is lower than 1.
+        """
+        if every < 1:
+            raise ValueError("every must be at least 1")
+        super().__init__(detector.wrapped)
+        self.detector = detector
+        self.accepted_channels = detector.accepted_channels
+        self.every = every
+        self.motion_threshold = motion_threshold
+        self.asynchronous = asynchronous
+        self.runs = 0
+        self.skipped = 0
+        self._since = every  # Detect the first frame
+        self._reference: Optional[NDArray[np.float32]] = None
+        self._pending: Optional[Future] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    @property
+    def classes(self) -> List[str]:
+        """Return the class names of the detector."""
+        return self.detector.classes
+
+    @property
+    def detections(self) -> Any:
+        """Return the last detections of the detector."""
+        return self.detector.detections
+
+    @property
+    def generation(self) -> int:
+        """Return the number of frames the detector processed."""
+        return self.detector.generation
+
+    def apply(self, frame: Image) -> Image:
+        """Run the detection on the frame if it is due, reuse the last one otherwise.
+
+        Args:
+            frame (Image): The image to detect the objects of.
+
+        Returns:
+            Image: The image, unchanged.
+        """
+        self._since += 1
+        thumbnail = (
+            self._thumbnail(frame) if self.motion_threshold is not None else None
+        )
+        if not self._due(thumbnail):
+            self.skipped += 1
+            return frame
+
+        if self.asynchronous:
+            if self._pending is not None:
+                if not self._pending.done():
+                    self.skipped += 1  # Still busy with a previous frame
+                    return frame
+                self._pending.result()  # Raise the error of the last detection
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(1, "detection-scheduler")
+            # The next stages may draw on the frame while it is being detected
+            image = frame.get() if isinstance(frame, cv2.UMat) else frame.copy()
+            self._pending = self._executor.submit(self.detector.apply, image)
+        else:
+            self.detector.apply(frame)
+        self.runs += 1
+        self._since = 0
+        self._reference = thumbnail
+        return frame
+
+    def motion(self, frame: Image) -> float:
+        """Return the motion score of the frame relative to the last detected one."""
+        return self._score(self._thumbnail(frame))
+
+    def close(self) -> None:
+        """Wait for the background detection, if any, and stop its thread."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _due(self, thumbnail: Optional[NDArray[np.float32]]) -> bool:
+        if self._since >= self.every:
+            return True
+        if thumbnail is None or self.motion_threshold is None:
+            return False
+        return self._score(thumbnail) >= self.motion_threshold
+
+    def _score(self, thumbnail: NDArray[np.float32]) -> float:
+        if self._reference is None or self._reference.shape != thumbnail.shape:
+            return float("inf")
+        return float(cv2.absdiff(thumbnail, self._reference).mean())
+
+    @staticmethod
+    def _thumbnail(frame: Image) -> NDArray[np.float32]:
+        image = frame.get() if isinstance(frame, cv2.UMat) else frame
+        height, width = image.shape[:2]
+        size = (MOTION_WIDTH, max(1, height * MOTION_WIDTH // width))
+        small = cv2.resize(image, size, interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return small.astype(np.float32)
@@ -1,11 +1,11 @@
 """A module that contains the VideoModel class."""
 
-from typing import Callable, List
-
-import cv2
+from typing import Union
 
 from pyvision.models import Image
+from pyvision.models.frame import Frame
 from pyvision.models.opencv_stream import OpenCVVideoStream
+from pyvision.models.pipeline import Pipeline, Stage
 from pyvision.utils.observer import ConcreteSubject
 
 
@@ -15,32 +15,35 @@ class StreamModel(ConcreteSubject):
     def __init__(self, stream: OpenCVVideoStream) -> None:
         """Initialize the VideoModel object."""
         ConcreteSubject.__init__(self)
-        self.filters: List[Callable[[Image], cv2.UMat]] = []
+        self.pipeline = Pipeline()
         self.stream = stream
         self.stream.start()
         self.width = self.stream.width
         self.height = self.stream.height
         self.fps = self.stream.fps
 
-    def add_filter(self, filter_func: Callable[[Image], cv2.UMat]) -> None:
-        """Add a filter function to the list of filters.
+    def add_filter(self, filter_func: Stage) -> None:
+        """Append a filter to the pipeline.
 
         Args:
-            filter_func: A callable that takes a cv2.UMat image as input and returns a filtered cv2.UMat image.
+            filter_func: An image processing strategy (chains of decorators are unrolled
+                into their stages) or a callable that takes an image as input and
+                returns a filtered cv2.UMat image.
+
+        Raises:
+            ValueError: If the filter is not compatible with the previous ones.
         """
-        self.filters.append(filter_func)
+        self.pipeline.add(filter_func)
 
-    def process(self, frame: Image):
-        """Apply all the filters to the input frame.
+    def process(self, frame: Union[Image, Frame]):
+        """Apply all the filters in order to the input frame.
+
+        The processed Frame is stored in `frame` before notifying the observers.
 
         Args:
             frame: The input frame to be processed.
-
-        Returns:
-            The processed frame after applying all the filters.
         """
-        for filter_func in self.filters:
-            self.frame = filter_func(frame)
+        self.frame = self.pipeline.process(frame)
 
         self.notify()
 
@@ -0,0 +1,225 @@
+"""A module running several video streams in a single process.
+
+Every stream keeps its own capture thread, StreamModel and processing thread, but the
+YOLO model is loaded once and its inference goes through a single BatchingInference
+shared by all the streams: the frames of the different cameras are inferred together,
+the streams of higher priority first. Each stream can also be limited to a number of
+processed frames per second, the frames in excess being skipped before any processing.
+"""
+
+import threading
+import timeit
+from typing import Any, Callable, Dict, List, Optional
+
+from pyvision.models import ImageProcessingStrategy
+from pyvision.models.batching import BatchingInference
+from pyvision.models.engines import InferenceEngine
+from pyvision.models.filters import NoOpFilter
+from pyvision.models.frame import Frame
+from pyvision.models.opencv_stream import OpenCVVideoStream, ReadError
+from pyvision.models.stream import StreamModel
+from pyvision.models.yolo import YoloObjectDetection, yolo_batcher
+
+
+class ManagedStream:
+    """A stream run by a StreamManager.
+
+    Attributes:
+        name (str): The name of the stream.
+        model (StreamModel): The model processing the frames, attach observers to it
+            to receive the processed frames.
+        detector (Optional[YoloObjectDetection]): The detection stage of the stream.
+        priority (int): The priority of the frames of the stream in the inference.
+        max_fps (float): The largest number of frames processed per second, 0 for no
+            limit.
+        processed (int): The number of frames processed.
+        skipped (int): The number of frames skipped to respect max_fps.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        model: StreamModel,
+        detector: Optional[YoloObjectDetection],
+        priority: int,
+        max_fps: float,
+    ) -> None:
+        """Initialize the ManagedStream.
+
+        Args:
+            name (str): The name of the stream.
+            model (StreamModel): The model processing the frames.
+            detector (Optional[YoloObjectDetection]): The detection stage, if any.
+            priority (int): The priority of the frames of the stream.
+            max_fps (float): The largest number of frames processed per second.
+        """
+        self.name = name
+        self.model = model
+        self.detector = detector
+        self.priority = priority
+        self.max_fps = max_fps
+        self.processed = 0
+        self.skipped = 0
+        self.stop_event = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def detections(self) -> Any:
+        """Return the detections of the last processed frame."""
+        return self.detector.detections if self.detector is not None else []
+
+    def run(self) -> None:
+        """Process the frames of the stream until it ends or is stopped."""
+        stream = self.model.stream
+        last_sequence = -1
+        next_time = 0.0
+        while not self.stop_event.is_set():
+            ret, frame = stream.read_frame(timeout=1.0 / max(stream.fps, 1))
+            if ret is ReadError.NO_STREAM:
+                return
+            if ret is not ReadError.NO_ERROR or stream.sequence == last_sequence:
+                continue
+            last_sequence = stream.sequence
+
+            now = timeit.default_timer()
+            if now < next_time:
+                self.skipped += 1  # Over the frame budget of the stream
+                continue
+            if self.max_fps > 0:
+                next_time = max(next_time + 1.0 / self.max_fps, now)
+            self.model.process(Frame(frame, last_sequence))
+            self.processed += 1
+
+
+class StreamManager:
+    """Run several streams at once, sharing one detection model.
+
+    Attributes:
+        batcher (Optional[BatchingInference]): The inference shared by the streams,
+            None without model.
+        streams (Dict[str, ManagedStream]): The streams, by name.
+    """
+
+    def __init__(
+        self,
+        model: Optional[InferenceEngine] = None,
+        filters: Callable[[], ImageProcessingStrategy] = NoOpFilter,
+        max_batch: int = 8,
+        deadline: float = 0.01,
+    ) -> None:
+        """Initialize the StreamManager.
+
+        Args:
+            model (Optional[InferenceEngine]): The engine running the YOLO model shared
+                by every stream, no detection if None.
+            filters (Callable[[], ImageProcessingStrategy]): Build the filters applied
+                to the frames of a stream before the detection, called once per stream.
+            max_batch (int): The largest number of frames inferred at once.
+            deadline (float): The longest time a frame waits for the frames of the
+                other streams, in seconds.
+        """
+        self.model = model
+        self.filters = filters
+        self.batcher: Optional[BatchingInference] = None
+        if model is not None:
+            self.batcher = yolo_batcher(model, max_batch, deadline)
+        self.streams: Dict[str, ManagedStream] = {}
+        self.running = False
+
+    def add(
+        self,
+        name: str,
+        stream: OpenCVVideoStream,
+        priority: int = 0,
+        max_fps: float = 0.0,
+    ) -> ManagedStream:
+        """Add a stream, started right away if the manager runs.
+
+        Args:
+            name (str): The name of the stream.
+            stream (OpenCVVideoStream): The video stream, not started yet.
+            priority (int): The priority of the frames of the stream in the inference.
+            max_fps (float): The largest number of frames processed per second, 0 for
+                no limit.
+
+        Returns:
+            ManagedStream: The managed stream.
+
+        Raises:
+            ValueError: If a stream already has this name.
+        """
+        if name in self.streams:
+            raise ValueError(f"a stream is already named {name}")
+        model = StreamModel(stream)
+        strategy = self.filters()
+        detector = None
+        if self.model is not None:
+            detector = YoloObjectDetection(
+                strategy, self.model, self.batcher, priority=priority
+            )
+            strategy = detector
+        model.add_filter(strategy)
+
+        managed = self.streams[name] = ManagedStream(
+            name, model, detector, priority, max_fps
+        )
+        if self.running:
+            self._start(managed)
+        return managed
+
+    def remove(self, name: str) -> None:
+        """Stop and release a stream, the other ones running on.
+
+        Args:
+            name (str): The name of the stream.
+        """
+        managed = self.streams.pop(name)
+        self._stop(managed)
+        managed.model.release()
+
+    def start(self) -> None:
+        """Start processing every stream."""
+        self.running = True
+        for managed in self.streams.values():
+            self._start(managed)
+
+    def join(self) -> None:
+        """Wait for every stream to end."""
+        for managed in list(self.streams.values()):
+            if managed.thread is not None:
+                managed.thread.join()
+
+    def stop(self) -> None:
+        """Stop and release every stream, then the shared inference."""
+        self.running = False
+        for name in list(self.streams):
+            self.remove(name)
+        if self.batcher is not None:
+            self.batcher.close()
+
+    def report(self) -> List[str]:
+        """Return one line of statistics per stream, and one for the inference."""
+        lines = [
+            f"{managed.name:<16} priority {managed.priority:>3}"
+            f" processed {managed.processed:>6} skipped {managed.skipped:>6}"
+            f" dropped {managed.model.stream.dropped_frames:>6}"
+            for managed in self.streams.values()
+        ]
+        if self.batcher is not None:
+            lines.append(
+                f"inference: {self.batcher.batches} batches,"
+                f" {self.batcher.mean_batch_size:.2f} frames per batch"
+            )
+        return lines
+
+    def _start(self, managed: ManagedStream) -> None:
+        managed.stop_event.clear()
+        managed.thread = threading.Thread(
+            target=managed.run, name=f"stream-{managed.name}", daemon=True
+        )
+        managed.thread.start()
+
+    def _stop(self, managed: ManagedStream) -> None:
+        managed.stop_event.set()
+        if managed.thread is not None and managed.thread.is_alive():
+            managed.thread.join()
@@ -0,0 +1,286 @@
+"""A module implementing a SORT-like multi-object tracker.
+
+Every track follows a box with a constant velocity Kalman filter on its center, area
+and aspect ratio, as in SORT (Bewley et al., Simple Online and Realtime Tracking). The
+tracks are predicted on every frame and corrected on the frames the detection ran on,
+after matching them to the detections by IoU. All the tracks are predicted and updated
+at once with vectorized NumPy, the only Python loop being the greedy matching.
+"""
+
+from typing import Any, Optional, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+from pyvision.models import Image, ImageProcessingDecorator
+from pyvision.models.yolo import CLASS, CONFIDENCE
+
+# Column of the track ids in the tracked detections
+TRACK_ID = 6
+
+# Constant velocity model on (cx, cy, area, ratio, vcx, vcy, varea)
+TRANSITION = np.eye(7)
+TRANSITION[[0, 1, 2], [4, 5, 6]] = 1
+MEASUREMENT = np.eye(4, 7)
+MEASUREMENT_NOISE = np.diag([1.0, 1.0, 10.0, 10.0])
+PROCESS_NOISE = np.diag([1.0, 1.0, 1.0, 1.0, 0.01, 0.01, 0.0001])
+INITIAL_COVARIANCE = np.diag([10.0, 10.0, 10.0, 10.0, 10000.0, 10000.0, 10000.0])
+
+
+def iou(boxes: NDArray, others: NDArray) -> NDArray[np.float64]:
+    """Return the intersection over union of every pair of boxes.
+
+    Args:
+        boxes (NDArray): The (N, 4) boxes as (x1, y1, x2, y2).
+        others (NDArray): The (M, 4) boxes as (x1, y1, x2, y2).
+
+    Returns:
+        NDArray[np.float64]: The (N, M) IoU matrix.
+    """
+    top_left = np.maximum(boxes[:, None, :2], others[None, :, :2])
+    bottom_right = np.minimum(boxes[:, None, 2:4], others[None, :, 2:4])
+    intersection = np.prod(np.clip(bottom_right - top_left, 0, None), axis=2)
+    areas = np.prod(boxes[:, 2:4] - boxes[:, :2], axis=1)
+    other_areas = np.prod(others[:, 2:4] - others[:, :2], axis=1)
+    union = areas[:, None] + other_areas[None, :] - intersection
+    return intersection / np.maximum(union, 1e-9)
+
+
+def to_measurements(boxes: NDArray) -> NDArray[np.float64]:
+    """Convert (N, 4) boxes (x1, y1, x2, y2) to (N, 4) (cx, cy, area, ratio)."""
+    width = boxes[:, 2] - boxes[:, 0]
+    height = boxes[:, 3] - boxes[:, 1]
+    return np.stack(
+        (
+            boxes[:, 0] + width / 2,
+            boxes[:, 1] + height / 2,
+            width * height,
+            width / np.maximum(height, 1e-9),
+        ),
+        axis=1,
+    ).astype(np.float64)
+
+
+def to_boxes(states: NDArray) -> NDArray[np.float64]:
+    """Convert (N, 7) Kalman states to (N, 4) boxes (x1, y1, x2, y2)."""
+    area = np.maximum(states[:, 2], 0)
+    width = np.sqrt(area * np.maximum(states[:, 3], 0))
+    height = area / np.maximum(width, 1e-9)
+    return np.stack(
+        (
+            states[:, 0] - width / 2,
+            states[:, 1] - height / 2,
+            states[:, 0] + width / 2,
+            states[:, 1] + height / 2,
+        ),
+        axis=1,
+    )
+
+
+def match(ious: NDArray, threshold: float) -> Tuple[NDArray[np.intp], NDArray[np.intp]]:
+    """Match rows to columns greedily, by decreasing IoU.
+
+    Args:
+        ious (NDArray): The (N, M) IoU matrix.
+        threshold (float): The IoU under which a pair is never matched.
+
+    Returns:
+        The indices of the matched rows and of their columns.
+    """
+    rows, columns = np.nonzero(ious >= threshold)
+    order = np.argsort(-ious[rows, columns], kind="stable")
+    used_rows: set[int] = set()
+    used_columns: set[int] = set()
+    matched_rows, matched_columns = [], []
+    for row, column in zip(rows[order].tolist(), columns[order].tolist()):
+        if row in used_rows or column in used_columns:
+            continue
+        used_rows.add(row)
+        used_columns.add(column)
+        matched_rows.append(row)
+        matched_columns.append(column)
+    return np.array(matched_rows, dtype=np.intp), np.array(
+        matched_columns, dtype=np.intp
+    )
+
+
+class SortTracker:
+    """Track boxes from frame to frame and give each object a stable id.
+
+    Attributes:
+        iou_threshold (float): The IoU under which a detection is not matched to a track.
+        max_age (int): The number of detections a track survives without a match.
+        min_hits (int): The number of matches before a track is reported.
+        states (NDArray): The (T, 7) Kalman states of the tracks.
+        covariances (NDArray): The (T, 7, 7) Kalman covariances of the tracks.
+        ids (NDArray): The (T,) ids of the tracks.
+        hits (NDArray): The (T,) number of detections matched to each track.
+        misses (NDArray): The (T,) number of detections since each track was matched.
+        classes (NDArray): The (T,) class of the last detection of each track.
+        confidences (NDArray): The (T,) confidence of the last detection of each track.
+    """
+
+    def __init__(
+        self, iou_threshold: float = 0.3, max_age: int = 3, min_hits: int = 2
+    ) -> None:
+        """Initialize the SortTracker.
+
+        Args:
+            iou_threshold (float): The IoU under which a detection is not matched.
+            max_age (int): The number of detections a track survives without a match.
+            min_hits (int): The number of matches before a track is reported.
+        """
+        self.iou_threshold = iou_threshold
+        self.max_age = max_age
+        self.min_hits = min_hits
+        self.next_id = 1
+        self.states = np.empty((0, 7))
+        self.covariances = np.empty((0, 7, 7))
+        self.ids = np.empty(0, dtype=np.int64)
+        self.hits = np.empty(0, dtype=np.int64)
+        self.misses = np.empty(0, dtype=np.int64)
+        self.classes = np.empty(0, dtype=np.float32)
+        self.confidences = np.empty(0, dtype=np.float32)
+
+    def __len__(self) -> int:
+        """Return the number of live tracks."""
+        return len(self.ids)
+
+    def predict(self) -> None:
+        """Move every track one frame forward."""
+        # The area must stay positive: stop shrinking the tracks about to vanish
+        vanishing = self.states[:, 2] + self.states[:, 6] <= 0
+        self.states[vanishing, 6] = 0
+        self.states = self.states @ TRANSITION.T
+        self.covariances = TRANSITION @ self.covariances @ TRANSITION.T + PROCESS_NOISE
+
+    def update(self, detections: NDArray[np.float32]) -> None:
+        """Correct the tracks with the detections of the current frame.
+
+        The tracks must have been predicted to the current frame first.
+
+        Args:
+            detections (NDArray[np.float32]): The (N, 6) detections of the frame.
+        """
+        tracked, detected = match(
+            iou(to_boxes(self.states), detections), self.iou_threshold
+        )
+        if len(tracked):
+            self._correct(tracked, detections[detected])
+
+        self.misses += 1
+        self.misses[tracked] = 0
+        alive = self.misses <= self.max_age
+        self._keep(alive)
+
+        new = np.ones(len(detections), dtype=bool)
+        new[detected] = False
+        self._create(detections[new])
+
+    def tracks(self) -> NDArray[np.float32]:
+        """Return the reported tracks.
+
+        Returns:
+            NDArray[np.float32]: The (T, 7) (x1, y1, x2, y2, confidence, class, id)
+            rows of the tracks matched at least min_hits times.
+        """
+        reported = self.hits >= self.min_hits
+        tracks = np.empty((int(reported.sum()), 7), dtype=np.float32)
+        tracks[:, :4] = to_boxes(self.states[reported])
+        tracks[:, CONFIDENCE] = self.confidences[reported]
+        tracks[:, CLASS] = self.classes[reported]
+        tracks[:, TRACK_ID] = self.ids[reported]
+        return tracks
+
+    def _correct(self, tracked: NDArray[np.intp], detections: NDArray) -> None:
+        states = self.states[tracked]
+        covariances = self.covariances[tracked]
+        residuals = to_measurements(detections) - states @ MEASUREMENT.T
+        innovations = MEASUREMENT @ covariances @ MEASUREMENT.T + MEASUREMENT_NOISE
+        # Kalman gains P H^T S^-1, S being symmetric
+        gains = np.linalg.solve(
+            innovations, (covariances @ MEASUREMENT.T).transpose(0, 2, 1)
+        ).transpose(0, 2, 1)
+        self.states[tracked] = states + np.einsum("tij,tj->ti", gains, residuals)
+        self.covariances[tracked] = (np.eye(7) - gains @ MEASUREMENT) @ covariances
+        self.hits[tracked] += 1
+        self.classes[tracked] = detections[:, CLASS]
+        self.confidences[tracked] = detections[:, CONFIDENCE]
+
+    def _create(self, detections: NDArray) -> None:
+        count = len(detections)
+        states = np.zeros((count, 7))
+        states[:, :4] = to_measurements(detections)
+        self.states = np.concatenate((self.states, states))
+        self.covariances = np.concatenate(
+            (self.covariances, np.broadcast_to(INITIAL_COVARIANCE, (count, 7, 7)))
+        )
+        self.ids = np.concatenate(
+            (self.ids, np.arange(self.next_id, self.next_id + count))
+        )
+        self.next_id += count
+        self.hits = np.concatenate((self.hits, np.ones(count, dtype=np.int64)))
+        self.misses = np.concatenate((self.misses, np.zeros(count, dtype=np.int64)))
+        self.classes = np.concatenate((self.classes, detections[:, CLASS]))
+        self.confidences = np.concatenate((self.confidences, detections[:, CONFIDENCE]))
+
+    def _keep(self, alive: NDArray[np.bool_]) -> None:
+        self.states = self.states[alive]
+        self.covariances = self.covariances[alive]
+        self.ids = self.ids[alive]
+        self.hits = self.hits[alive]
+        self.misses = self.misses[alive]
+        self.classes = self.classes[alive]
+        self.confidences = self.confidences[alive]
+
+
+class ObjectTracking(ImageProcessingDecorator):
+    """A stage tracking the detections of the stage it wraps.
+
+    The tracks are predicted on every frame and corrected whenever the wrapped stage
+    (a YoloObjectDetection or a DetectionScheduler running one) produced new detections,
+    so that the boxes follow the objects on the frames the detection is skipped on.
+
+    Attributes:
+        detector: The detection stage.
+        tracker (SortTracker): The tracker.
+        detections (NDArray[np.float32]): The (T, 7) tracks of the last frame, the
+            detections columns followed by the track id.
+    """
+
+    read_only = True
+
+    def __init__(self, wrapped: Any, tracker: Optional[SortTracker] = None) -> None:
+        """Initialize the ObjectTracking.
+
+        Args:
+            wrapped: The detection stage, exposing detections, generation and classes.
+            tracker (Optional[SortTracker]): The tracker, a default one if None.
+        """
+        super().__init__(wrapped)
+        self.detector = wrapped
+        self.tracker = tracker if tracker is not None else SortTracker()
+        self.detections = self.tracker.tracks()
+        self._generation = 0
+
+    @property
+    def classes(self) -> Any:
+        """Return the class names of the detector."""
+        return self.detector.classes
+
+    def apply(self, frame: Image) -> Image:
+        """Predict the tracks to the frame and correct them with new detections.
+
+        Args:
+            frame (Image): The image, left untouched.
+
+        Returns:
+            Image: The image, unchanged.
+        """
+        self.tracker.predict()
+        generation = self.detector.generation
+        if generation != self._generation:
+            self._generation = generation
+            self.tracker.update(self.detector.detections)
+        self.detections = self.tracker.tracks()
+        return frame
@@ -0,0 +1,246 @@
+"""A module running the processing stages in a pool of worker processes.
+
+A single Python thread runs the filters and the inference of every frame, one core's
+worth of work at best because of the GIL. The WorkerPool spreads the frames over worker
+processes instead, each one running its own copy of the stages. Frames are never
+pickled: they are copied into slots of a shared memory block that the workers read
+from, and the workers write the processed frames into matching output slots. Only the
+slot index, the sequence number and the detections go through the queues. The results
+are given back in the order the frames were submitted.
+
+The stages must not keep a state from one frame to the next (tracking, motion, frame
+skipping), as consecutive frames land in different processes.
+"""
+
+import multiprocessing
+import os
+import queue
+import timeit
+import traceback
+from collections import deque
+from multiprocessing import shared_memory
+from typing import Any, Callable, Deque, List, Optional, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+from pyvision.models.pipeline import Pipeline
+
+# A picklable callable building the stages run by a worker, and the stage whose
+# detections are sent back with the frames (None if there is no detection)
+StageFactory = Callable[[], Tuple[Any, Optional[Any]]]
+
+# Slot index, sequence number, output shape, output dtype, detections
+Result = Tuple[int, int, Tuple[int, ...], str, Any]
+
+# The time between two checks that the workers are alive while waiting, in seconds
+POLL_INTERVAL = 0.5
+
+
+def _work(
+    factory: StageFactory,
+    names: Tuple[str, str],
+    shape: Tuple[int, ...],
+    dtype: str,
+    tasks: Any,
+    results: Any,
+) -> None:
+    """Run the stages on the frames of the shared input slots until told to stop."""
+    inputs = shared_memory.SharedMemory(name=names[0])
+    outputs = shared_memory.SharedMemory(name=names[1])
+    slot_size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+    try:
+        stage, detector = factory()
+        pipeline = Pipeline([stage])
+        while (task := tasks.get()) is not None:
+            index, sequence = task
+            image = np.ndarray(shape, dtype, inputs.buf, index * slot_size)
+            output = pipeline.process(image).host()
+            if output.nbytes > slot_size:
+                raise ValueError(f"output {output.shape} larger than input {shape}")
+            target = np.ndarray(
+                output.shape, output.dtype, outputs.buf, index * slot_size
+            )
+            np.copyto(target, output)
+            detections = detector.detections if detector is not None else None
+            results.put((index, sequence, output.shape, output.dtype.str, detections))
+    except Exception:
+        results.put(("error", traceback.format_exc()))
+    finally:
+        inputs.close()
+        outputs.close()
+
+
+class WorkerPool:
+    """A pool of processes running the same stages on different frames.
+
+    Attributes:
+        workers (int): The number of worker processes.
+        slots (int): The number of frames in flight at most.
+    """
+
+    def __init__(
+        self,
+        factory: StageFactory,
+        workers: Optional[int] = None,
+        slots: Optional[int] = None,
+    ) -> None:
+        """Initialize the WorkerPool, the processes starting with the first frame.
+
+        Args:
+            factory (StageFactory): A picklable callable (module level function or
+                functools.partial of one) building the stages in every worker.
+            workers (Optional[int]): The number of worker processes, one per core if
+                None.
+            slots (Optional[int]): The number of frames in flight, twice the number of
+                workers if None, so that no worker waits for the next frame.
+        """
+        self.factory = factory
+        self.workers = workers or os.cpu_count() or 1
+        self.slots = slots or 2 * self.workers
+        # Forking a process running the capture thread is unsafe
+        self._context = multiprocessing.get_context("spawn")
+        self._tasks: Any = self._context.Queue()
+        self._results: Any = self._context.Queue()
+        self._processes: List[Any] = []
+        self._inputs: Optional[shared_memory.SharedMemory] = None
+        self._outputs: Optional[shared_memory.SharedMemory] = None
+        self._shape: Tuple[int, ...] = ()
+        self._dtype = np.dtype(np.uint8)
+        self._free: List[int] = []
+        self._submitted: Deque[int] = deque()
+        self._ready: dict[int, Result] = {}
+        self._held: Optional[int] = None
+
+    def __len__(self) -> int:
+        """Return the number of frames submitted and not collected yet."""
+        return len(self._submitted)
+
+    def full(self) -> bool:
+        """Return whether every slot is in flight, submit then waiting for one."""
+        return bool(self._processes) and not self._free
+
+    def submit(self, sequence: int, image: NDArray) -> None:
+        """Copy a frame into a free slot and queue it for the workers.
+
+        The pool starts with the first frame, its slots being sized for it.
+
+        Args:
+            sequence (int): The sequence number of the frame, given back with it.
+            image (NDArray): The frame, in host memory.
+
+        Raises:
+            ValueError: If the frame does not have the shape of the first one.
+            RuntimeError: If every slot is in flight, see full.
+        """
+        if not self._processes:
+            self._start(image.shape, image.dtype)
+        if image.shape != self._shape or image.dtype != self._dtype:
+            raise ValueError(f"frame {image.shape} does not match {self._shape}")
+        if not self._free:
+            raise RuntimeError("every slot is in flight, collect a result first")
+
+        index = self._free.pop()
+        np.copyto(self._slot(self._inputs, index, self._shape, self._dtype), image)
+        self._tasks.put((index, sequence))
+        self._submitted.append(sequence)
+
+    def collect(
+        self, timeout: Optional[float] = None
+    ) -> Optional[Tuple[int, NDArray, Any]]:
+        """Return the oldest submitted frame once it is processed.
+
+        The returned frame is a view of its shared output slot, valid until the next
+        call to collect.
+
+        Args:
+            timeout (Optional[float]): The longest wait for the frame, unbounded if
+                None.
+
+        Returns:
+            The sequence number, the processed frame and the detections of the oldest
+            frame, None if nothing was submitted or the timeout expired.
+
+        Raises:
+            RuntimeError: If a worker failed or died, e.g. killed for lack of memory.
+        """
+        if self._held is not None:
+            self._free.append(self._held)
+            self._held = None
+        if not self._submitted:
+            return None
+
+        end = None if timeout is None else timeit.default_timer() + timeout
+        while self._submitted[0] not in self._ready:
+            remaining = POLL_INTERVAL
+            if end is not None:
+                remaining = min(remaining, max(end - timeit.default_timer(), 0.0))
+            try:
+                message = self._results.get(timeout=remaining)
+            except queue.Empty:
+                self._check_workers()
+                if end is not None and timeit.default_timer() >= end:
+                    return None
+                continue
+            if message[0] == "error":
+                raise RuntimeError(f"a worker failed:\n{message[1]}")
+            self._ready[message[1]] = message
+
+        index, sequence, shape, dtype, detections = self._ready.pop(
+            self._submitted.popleft()
+        )
+        self._held = index
+        return sequence, self._slot(self._outputs, index, shape, dtype), detections
+
+    def _check_workers(self) -> None:
+        """Raise if a worker died without reporting an error, e.g. on a segfault."""
+        for process in self._processes:
+            if not process.is_alive():
+                raise RuntimeError(f"a worker died with exit code {process.exitcode}")
+
+    def close(self) -> None:
+        """Stop the workers and release the shared memory."""
+        for _ in self._processes:
+            self._tasks.put(None)
+        for process in self._processes:
+            process.join()
+        self._processes = []
+        for memory in (self._inputs, self._outputs):
+            if memory is not None:
+                memory.close()
+                memory.unlink()
+        self._inputs = self._outputs = None
+
+    def _start(self, shape: Tuple[int, ...], dtype: np.dtype) -> None:
+        self._shape = shape
+        self._dtype = np.dtype(dtype)
+        size = self.slots * int(np.prod(shape)) * self._dtype.itemsize
+        self._inputs = shared_memory.SharedMemory(create=True, size=size)
+        self._outputs = shared_memory.SharedMemory(create=True, size=size)
+        self._free = list(range(self.slots))
+        names = (self._inputs.name, self._outputs.name)
+        for _ in range(self.workers):
+            process = self._context.Process(
+                target=_work,
+                args=(
+                    self.factory,
+                    names,
+                    shape,
+                    self._dtype.str,
+                    self._tasks,
+                    self._results,
+                ),
+                daemon=True,
+            )
+            process.start()
+            self._processes.append(process)
+
+    def _slot(
+        self,
+        memory: Optional[shared_memory.SharedMemory],
+        index: int,
+        shape: Tuple[int, ...],
+        dtype: Any,
+    ) -> NDArray:
+        slot_size = int(np.prod(self._shape)) * self._dtype.itemsize
+        return np.ndarray(shape, dtype, memory.buf, index * slot_size)  # type: ignore
@@ -1,68 +1,191 @@
-"""A module implementing the YOLO object detection algorithm."""
+"""A module implementing the YOLO object detection algorithm.
+
+The model runs through an InferenceEngine, see pyvision.models.engines, which only
+imports ultralytics when it is needed, so that importing this module is cheap.
+"""
 
-import math
 import secrets
-from typing import List
+from typing import TYPE_CHECKING, Any, List, Optional, Sequence
 
 import cv2
 import numpy as np
-from ultralytics import YOLO  # type: ignore
-from ultralytics.engine.results import Results  # type: ignore
+from numpy.typing import NDArray
 
 from pyvision.models import Image, ImageProcessingDecorator, ImageProcessingStrategy
+from pyvision.models.batching import BatchingInference
+from pyvision.models.frame import Location
+
+if TYPE_CHECKING:
+    from pyvision.models.engines import InferenceEngine
+
+# Columns of the detections array
+X1, Y1, X2, Y2, CONFIDENCE, CLASS = range(6)
+
+# The names of the classes of the COCO models, one per line
+COCO_NAMES = "coco/coco.names"
+
+
+def load_classes(path: str = COCO_NAMES) -> List[str]:
+    """Return the class names of the model, indexed by class id."""
+    with open(path, "r") as names:
+        return [name.strip() for name in names.readlines()]
+
+
+def no_detections() -> NDArray[np.float32]:
+    """Return an empty detections array."""
+    return np.empty((0, 6), dtype=np.float32)
 
 
 class YoloObjectDetection(ImageProcessingDecorator):
-    """A class implementing the YoLo detection algorithm."""
+    """A class implementing the YoLo detection algorithm.
+
+    The detections of a frame are kept as a single (N, 6) float32 array of rows
+    (x1, y1, x2, y2, confidence, class), filtered by confidence and class without any
+    Python loop. The frame itself is left untouched: wrap the stage with
+    DetectionAnnotation to draw the detections.
+    """
 
-    def __init__(self, wrapped: ImageProcessingStrategy, model: YOLO) -> None:
+    accepted_channels = (3,)
+    location = Location.HOST
+    read_only = True
+
+    def __init__(
+        self,
+        wrapped: ImageProcessingStrategy,
+        model: "InferenceEngine",
+        batcher: Optional[BatchingInference] = None,
+        min_confidence: float = 0.0,
+        class_ids: Optional[Sequence[int]] = None,
+        priority: int = 0,
+    ) -> None:
         """Initialize the YoloObjectDetection.
 
         Args:
             wrapped (ImageProcessingStrategy): The wrapped image processing strategy.
-            model (YOLO): The YOLO model to use for object detection.
+            model (InferenceEngine): The engine running the YOLO model.
+            batcher (Optional[BatchingInference]): The batching inference running the
+                model, shared with the detection stages of other streams. Each frame
+                is inferred alone if None.
+            min_confidence (float): The confidence under which detections are dropped.
+            class_ids (Optional[Sequence[int]]): The classes to keep, every class if None.
+            priority (int): The priority of the frames of this stage in the batcher.
         """
         super().__init__(wrapped)
         self.model = model
-        with open("coco/coco.names", "r") as coco:
-            self.classes = [cls.strip() for cls in coco.readlines()]
+        self.batcher = batcher
+        self.priority = priority
+        self.min_confidence = min_confidence
+        self.class_ids = None if class_ids is None else np.asarray(class_ids)
+        self.classes = load_classes()
+
+        # Detections of the last processed frame, one (x1, y1, x2, y2, confidence,
+        # class) row per object, and the number of frames processed so far
+        self.detections = no_detections()
+        self.generation = 0
+
+    def apply(self, _frame: Image) -> Image:
+        """Detect the objects of the image.
+
+        Args:
+            image (Image): The image to process.
+
+        Returns:
+            Image: The image, unchanged.
+        """
+        frame = _frame.get() if isinstance(_frame, cv2.UMat) else _frame
+        self.detections = self.detect([frame])[0]
+        self.generation += 1
+        return _frame
+
+    def detect(self, images: List[Image]) -> List[NDArray[np.float32]]:
+        """Detect the objects of several images, e.g. regions of a frame, at once.
+
+        The images are inferred in a single forward pass (or in the batches of the
+        batcher), without changing the detections of the stage.
+
+        Args:
+            images (List[Image]): The host images to detect the objects of.
+
+        Returns:
+            List[NDArray[np.float32]]: The filtered (N, 6) detections of every image.
+        """
+        if self.batcher is not None:
+            futures = self.batcher.submit_many(images, self.priority)
+            found = [future.result() for future in futures]
+        else:
+            found = self.model.infer(images)
+        return [self.filter(detections) for detections in found]
+
+    def filter(self, detections: NDArray[np.float32]) -> NDArray[np.float32]:
+        """Keep the detections confident enough and of the requested classes.
+
+        Args:
+            detections (NDArray[np.float32]): The (N, 6) detections.
+
+        Returns:
+            NDArray[np.float32]: The detections kept.
+        """
+        keep = detections[:, CONFIDENCE] >= self.min_confidence
+        if self.class_ids is not None:
+            keep &= np.isin(detections[:, CLASS], self.class_ids)
+        return detections[keep]
+
+
+class DetectionAnnotation(ImageProcessingDecorator):
+    """A class drawing the detections of a YoloObjectDetection stage on the image.
+
+    Leave it out of the pipeline when only the detections are needed. The boxes are
+    drawn in host memory, where the detector left the image.
+    """
+
+    accepted_channels = (3,)
+    location = Location.HOST
+
+    def __init__(self, wrapped: ImageProcessingStrategy) -> None:
+        """Initialize the DetectionAnnotation.
+
+        Args:
+            wrapped (ImageProcessingStrategy): The detection stage to annotate, a
+                YoloObjectDetection or a DetectionScheduler running one.
+        """
+        super().__init__(wrapped)
+        self.detector: Any = wrapped
+        self.labels = list(self.detector.classes)
 
         seed = secrets.randbits(128)
         rng = np.random.default_rng(seed)
-        self.colors = rng.uniform(0, 255, size=(len(self.classes), 3))
+        colors = rng.uniform(0, 255, size=(len(self.labels), 3))
+        self.colors = [tuple(color) for color in colors.tolist()]
 
-    def process(self, _frame: Image) -> cv2.UMat:
-        """Process the image with the YoloObjectDetection algorithm.
+    def apply(self, frame: Image) -> Image:
+        """Draw the detections of the last frame on the image.
 
         Args:
-            image (Image): The image to process.
+            frame (Image): The image the detections were found in.
 
         Returns:
-            cv2.UMat: The processed image.
+            Image: The annotated image.
         """
-        frame = super().process(_frame).get()
-        results: List[Results] = self.model(frame, stream=True)
-        for r in results:
-            boxes = r.boxes  # type: ignore
-
-            if boxes is not None:
-                for box in boxes:  # type: ignore
-                    x1, y1, x2, y2 = box.xyxy[0]  # type: ignore
-                    x1, y1, x2, y2 = (
-                        int(x1),
-                        int(y1),
-                        int(x2),
-                        int(y2),
-                    )  # convert to int values
-
-                    cls = int(box.cls[0])  # type: ignore
-
-                    # put box in cam
-                    confidence = math.ceil((box.conf[0] * 100)) / 100  # type: ignore
-                    self.draw_bounding_box(frame, cls, confidence, x1, y1, x2, y2)
-                    cv2.rectangle(frame, (x1, y1), (x2, y2), (255, 0, 255), 3)
-
-        return cv2.UMat(frame)  # type: ignore
+        detections = self.detector.detections
+        if not len(detections):
+            return frame
+
+        boxes = detections[:, :4].astype(np.int32).tolist()
+        confidences = detections[:, CONFIDENCE].tolist()
+        class_ids = detections[:, CLASS].astype(np.int32).tolist()
+        # Tracked detections carry the id of their track in an extra column
+        track_ids = (
+            detections[:, CLASS + 1].astype(np.int64).tolist()
+            if detections.shape[1] > CLASS + 1
+            else [None] * len(boxes)
+        )
+        for (x1, y1, x2, y2), confidence, class_id, track_id in zip(
+            boxes, confidences, class_ids, track_ids
+        ):
+            self.draw_bounding_box(
+                frame, class_id, confidence, x1, y1, x2, y2, track_id
+            )
+        return frame
 
     def draw_bounding_box(
         self,
@@ -73,6 +196,7 @@ class YoloObjectDetection(ImageProcessingDecorator):
         y: int,
         x_plus_w: int,
         y_plus_h: int,
+        track_id: Optional[int] = None,
     ):
         """Draws bounding boxes on the input image based on the provided arguments.
 
@@ -84,10 +208,30 @@ class YoloObjectDetection(ImageProcessingDecorator):
             y (int): Y-coordinate of the top-left corner of the bounding box.
             x_plus_w (int): X-coordinate of the bottom-right corner of the bounding box.
             y_plus_h (int): Y-coordinate of the bottom-right corner of the bounding box.
+            track_id (Optional[int]): The id of the track of the object, if tracked.
         """
-        label = f"{self.classes[class_id]} ({confidence:.2f})"
+        label = f"{self.labels[class_id]} ({confidence:.2f})"
+        if track_id is not None:
+            label = f"#{track_id} {label}"
         color = self.colors[class_id]
         cv2.rectangle(img, (x, y), (x_plus_w, y_plus_h), color, 2)
         cv2.putText(
             img, label, (x - 10, y - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2
         )
+
+
+def yolo_batcher(
+    model: "InferenceEngine", max_batch: int = 8, deadline: float = 0.01
+) -> BatchingInference:
+    """Return a batching inference running a YOLO model on batches of frames.
+
+    Args:
+        model (InferenceEngine): The engine running the model, shared by every stream.
+        max_batch (int): The largest number of frames of a batch.
+        deadline (float): The longest time a frame waits for other ones, in seconds.
+
+    Returns:
+        BatchingInference: The batching inference, to give to the YoloObjectDetection
+        stages of every stream.
+    """
+    return BatchingInference(model.infer, max_batch, deadline)
@@ -3,9 +3,6 @@
 import os
 import zipfile
 
-import requests
-from tqdm import tqdm
-
 
 def check_file_exists(path: str) -> bool:
     """Check if a file exists at the given path.
@@ -23,6 +20,10 @@ def download_to(path: str, url: str):
         path (str): The path to save the downloaded file.
         url (str): The URL to download the file from.
     """
+    # Only needed on the first run, not worth their import time on every start
+    import requests
+    from tqdm import tqdm
+
     response = requests.get(url, stream=True)
     total_size = int(response.headers.get("content-length", 0))
     chunk_size = 1024
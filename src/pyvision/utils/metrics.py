@@ -0,0 +1,215 @@
+"""Latency histograms of the stages of the application.
+
+Every stage records its durations in a named LatencyHistogram of the module level
+`metrics` registry: the capture wait, every filter of the pipeline, the phases of the
+inference, the sink or the display. The histograms have logarithmic buckets, so that
+recording is constant time and memory whatever the number of frames, and give the
+percentiles within a few percent. The registry can be read through summary, printed
+with report, or appended periodically to a JSON lines file.
+"""
+
+import json
+import math
+import threading
+import time
+import timeit
+from contextlib import contextmanager
+from itertools import accumulate
+from typing import Dict, Iterator, List, Optional, TextIO
+
+# Range and resolution of the histograms: 1 µs to 100 s, buckets 5% wide
+MIN_LATENCY = 1e-6
+MAX_LATENCY = 100.0
+GROWTH = 1.05
+
+PERCENTILES = (50, 95, 99)
+
+
+class LatencyHistogram:
+    """A histogram of durations, with logarithmic buckets.
+
+    Attributes:
+        count (int): The number of durations recorded.
+        total (float): The sum of the durations, in seconds.
+        minimum (float): The shortest duration, in seconds.
+        maximum (float): The longest duration, in seconds.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the LatencyHistogram."""
+        self._log_growth = math.log(GROWTH)
+        self._buckets = int(math.log(MAX_LATENCY / MIN_LATENCY) / self._log_growth) + 1
+        self._counts: List[int] = [0] * self._buckets
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.minimum = math.inf
+        self.maximum = 0.0
+
+    def record(self, seconds: float) -> None:
+        """Record a duration.
+
+        Args:
+            seconds (float): The duration, in seconds.
+        """
+        bucket = 0
+        if seconds > MIN_LATENCY:
+            bucket = min(
+                int(math.log(seconds / MIN_LATENCY) / self._log_growth),
+                self._buckets - 1,
+            )
+        with self._lock:
+            self._counts[bucket] += 1
+            self.count += 1
+            self.total += seconds
+            self.minimum = min(self.minimum, seconds)
+            self.maximum = max(self.maximum, seconds)
+
+    def percentile(self, percent: float) -> float:
+        """Return a percentile of the durations, 0 if none was recorded.
+
+        Args:
+            percent (float): The percentile, between 0 and 100.
+
+        Returns:
+            float: The duration, in seconds, within half a bucket.
+        """
+        with self._lock:
+            if not self.count:
+                return 0.0
+            rank = percent / 100 * self.count
+            for bucket, cumulated in enumerate(accumulate(self._counts)):
+                if cumulated >= rank:
+                    break
+            middle = MIN_LATENCY * GROWTH ** (bucket + 0.5)
+            return min(max(middle, self.minimum), self.maximum)
+
+    @property
+    def mean(self) -> float:
+        """Return the mean duration, in seconds."""
+        return self.total / self.count if self.count else 0.0
+
+    def summary(self) -> Dict[str, float]:
+        """Return the count, mean, percentiles and maximum, in milliseconds."""
+        summary = {"count": self.count, "mean": 1000 * self.mean}
+        for percent in PERCENTILES:
+            summary[f"p{percent}"] = 1000 * self.percentile(percent)
+        summary["max"] = 1000 * self.maximum
+        return summary
+
+    def reset(self) -> None:
+        """Forget every duration recorded."""
+        with self._lock:
+            self._counts = [0] * self._buckets
+            self.count = 0
+            self.total = 0.0
+            self.minimum = math.inf
+            self.maximum = 0.0
+
+
+class Metrics:
+    """A registry of latency histograms, by name.
+
+    Names are grouped by prefix: capture, stage/<filter>, model/<phase>, sink or
+    display.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the Metrics."""
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+        self._dump_stop = threading.Event()
+        self._dump_thread: Optional[threading.Thread] = None
+
+    def histogram(self, name: str) -> LatencyHistogram:
+        """Return the histogram of a name, created on first use."""
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(name, LatencyHistogram())
+        return histogram
+
+    def record(self, name: str, seconds: float) -> None:
+        """Record a duration in the histogram of a name.
+
+        Args:
+            name (str): The name of the stage.
+            seconds (float): The duration, in seconds.
+        """
+        self.histogram(name).record(seconds)
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """Record the duration of the body of a with statement."""
+        start = timeit.default_timer()
+        try:
+            yield
+        finally:
+            self.record(name, timeit.default_timer() - start)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Return the summary of every histogram, in milliseconds, by name."""
+        return {
+            name: histogram.summary()
+            for name, histogram in sorted(self.histograms.items())
+        }
+
+    def report(self) -> str:
+        """Return the summary of every histogram, one line per name."""
+        lines = []
+        for name, summary in self.summary().items():
+            if not summary["count"]:
+                continue
+            percentiles = "  ".join(
+                f"p{percent} {summary[f'p{percent}']:8.2f}" for percent in PERCENTILES
+            )
+            lines.append(
+                f"  {name:<32} {summary['count']:>7} x  mean {summary['mean']:8.2f}"
+                f"  {percentiles}  max {summary['max']:8.2f} ms"
+            )
+        return "\n".join(lines)
+
+    def reset(self) -> None:
+        """Forget every duration recorded."""
+        for histogram in list(self.histograms.values()):
+            histogram.reset()
+
+    def dump(self, file: TextIO) -> None:
+        """Append the summary of every histogram to a file, as a JSON line.
+
+        Args:
+            file (TextIO): The file, opened for writing.
+        """
+        file.write(json.dumps({"time": time.time(), "metrics": self.summary()}))
+        file.write("\n")
+        file.flush()
+
+    def start_dump(self, path: str, interval: float = 10.0) -> None:
+        """Append the summary to a JSON lines file periodically, from a thread.
+
+        Args:
+            path (str): The path of the file.
+            interval (float): The time between two dumps, in seconds.
+        """
+        self.stop_dump()
+        self._dump_stop.clear()
+        self._dump_thread = threading.Thread(
+            target=self._dump_loop, args=(path, interval), name="metrics", daemon=True
+        )
+        self._dump_thread.start()
+
+    def stop_dump(self) -> None:
+        """Stop the periodic dump, after a last one."""
+        if self._dump_thread is not None:
+            self._dump_stop.set()
+            self._dump_thread.join()
+            self._dump_thread = None
+
+    def _dump_loop(self, path: str, interval: float) -> None:
+        with open(path, "a") as file:
+            while not self._dump_stop.wait(interval):
+                self.dump(file)
+            self.dump(file)
+
+
+metrics = Metrics()
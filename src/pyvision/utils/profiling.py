@@ -0,0 +1,91 @@
+"""Opt-in profiling of a fixed window of frames.
+
+Profiling every frame slows the application down and drowns the steady state in the
+startup: the FrameProfiler only runs cProfile, and optionally tracemalloc, from a given
+frame on and for a given number of frames, then writes its results and stops.
+"""
+
+import cProfile
+import io
+import pstats
+import tracemalloc
+from typing import Optional
+
+
+class FrameProfiler:
+    """Profile the frames of a window with cProfile and tracemalloc.
+
+    Call on_frame once per frame, from the thread processing them: cProfile only
+    profiles the thread it was enabled in.
+
+    Attributes:
+        start (int): The number of frames to let through before profiling.
+        frames (int): The number of frames to profile.
+        path (str): The path of the cProfile statistics, readable with pstats or
+            snakeviz.
+        memory (bool): Whether to trace the memory allocations too.
+        frame (int): The number of frames seen so far.
+    """
+
+    def __init__(
+        self,
+        frames: int,
+        start: int = 30,
+        path: str = "pyvision.prof",
+        memory: bool = False,
+    ) -> None:
+        """Initialize the FrameProfiler.
+
+        Args:
+            frames (int): The number of frames to profile.
+            start (int): The number of frames to let through before profiling, so that
+                the startup and the warm-up are left out.
+            path (str): The path of the cProfile statistics.
+            memory (bool): Whether to trace the memory allocations too.
+        """
+        self.frames = frames
+        self.start = start
+        self.path = path
+        self.memory = memory
+        self.frame = 0
+        self._profile: Optional[cProfile.Profile] = None
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+
+    @property
+    def done(self) -> bool:
+        """Return whether the window was profiled."""
+        return self.frame >= self.start + self.frames
+
+    def on_frame(self) -> None:
+        """Count a frame, starting or stopping the profiling at the window edges."""
+        if self.frame == self.start:
+            if self.memory:
+                tracemalloc.start()
+                self._snapshot = tracemalloc.take_snapshot()
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        self.frame += 1
+        if self.frame == self.start + self.frames:
+            self.stop()
+
+    def stop(self) -> None:
+        """Stop the profiling, if running, and print and write its results."""
+        if self._profile is None:
+            return
+        self._profile.disable()
+        self._profile.dump_stats(self.path)
+        stream = io.StringIO()
+        pstats.Stats(self._profile, stream=stream).sort_stats("cumulative").print_stats(
+            20
+        )
+        self._profile = None
+        print(f"profile of {self.frames} frames written to {self.path}")
+        print(stream.getvalue())
+
+        if self._snapshot is not None:
+            snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            print("largest allocations:")
+            for stat in snapshot.compare_to(self._snapshot, "lineno")[:10]:
+                print(f"  {stat}")
+            self._snapshot = None
@@ -0,0 +1,187 @@
+"""A preallocated ring buffer used to hand frames from a producer to a consumer."""
+
+import threading
+from collections import deque
+from enum import Enum
+from typing import Callable, Deque, Generic, List, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class DropPolicy(Enum):
+    """Enum representing what happens when the consumer is slower than the producer."""
+
+    # The consumer always gets the newest slot, the stale ones are dropped
+    LATEST_ONLY = 0
+    # The producer waits for a free slot, every slot is consumed in order
+    NEVER_DROP = 1
+
+
+class SlotState(Enum):
+    """Enum representing the state of a ring buffer slot."""
+
+    FREE = 0
+    WRITING = 1
+    READY = 2
+    READING = 3
+
+
+class RingBuffer(Generic[T]):
+    """A fixed size ring buffer of preallocated slots with sequence numbers.
+
+    The producer acquires a free slot, fills it outside of any lock and then commits it.
+    The consumer reads the committed slots and keeps the slot it was handed until its next
+    read, so a slot is never overwritten while it is being used on either side.
+
+    Attributes:
+        policy (DropPolicy): How to behave when the consumer falls behind.
+        dropped (int): Number of committed slots that were never handed to the consumer.
+        duplicated (int): Number of reads that handed the previous slot again.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        factory: Callable[[], T],
+        policy: DropPolicy = DropPolicy.LATEST_ONLY,
+    ) -> None:
+        """Initialize the RingBuffer.
+
+        Args:
+            capacity (int): The number of slots, at least 3 so that the producer always
+                finds a slot that is neither being read nor the latest one.
+            factory (Callable[[], T]): Called once per slot to preallocate its buffer.
+            policy (DropPolicy): How to behave when the consumer falls behind.
+        """
+        if capacity < 3:
+            raise ValueError(f"capacity must be at least 3, got {capacity}")
+
+        self.policy = policy
+        self.slots: List[T] = [factory() for _ in range(capacity)]
+        self.sequences: List[int] = [-1] * capacity
+        self.states: List[SlotState] = [SlotState.FREE] * capacity
+        self.dropped = 0
+        self.duplicated = 0
+        self.closed = False
+        self._ready: Deque[int] = deque()
+        self._reading: Optional[int] = None
+        self._next_sequence = 0
+        self._cond = threading.Condition()
+
+    @property
+    def capacity(self) -> int:
+        """Return the number of slots of the ring buffer."""
+        return len(self.slots)
+
+    def acquire(self, timeout: Optional[float] = None) -> Optional[Tuple[int, T]]:
+        """Acquire a slot for writing.
+
+        With the LATEST_ONLY policy the oldest committed slot is recycled when no free slot
+        is left. With the NEVER_DROP policy this waits until the consumer frees a slot.
+
+        Args:
+            timeout (Optional[float]): Maximum time to wait for a free slot, forever if None.
+
+        Returns:
+            The index and the buffer of the acquired slot, or None on timeout or close.
+        """
+        with self._cond:
+            while not self.closed:
+                index = self._find_free()
+                if index is None and self.policy is DropPolicy.LATEST_ONLY:
+                    index = self._ready.popleft()
+                    self.dropped += 1
+                if index is not None:
+                    self.states[index] = SlotState.WRITING
+                    return index, self.slots[index]
+                if not self._cond.wait(timeout):
+                    return None
+            return None
+
+    def commit(self, index: int, buffer: Optional[T] = None) -> int:
+        """Publish a slot previously acquired for writing.
+
+        Args:
+            index (int): The index returned by acquire.
+            buffer (Optional[T]): The buffer to store in the slot when the producer had to
+                replace it (e.g. a reallocation after a resolution change).
+
+        Returns:
+            int: The sequence number given to the slot.
+        """
+        with self._cond:
+            if buffer is not None:
+                self.slots[index] = buffer
+            sequence = self._next_sequence
+            self._next_sequence += 1
+            self.sequences[index] = sequence
+            self.states[index] = SlotState.READY
+            self._ready.append(index)
+            self._cond.notify_all()
+            return sequence
+
+    def abort(self, index: int) -> None:
+        """Give back a slot acquired for writing without publishing it.
+
+        Args:
+            index (int): The index returned by acquire.
+        """
+        with self._cond:
+            self.states[index] = SlotState.FREE
+            self._cond.notify_all()
+
+    def read(self, timeout: Optional[float] = 0.0) -> Optional[Tuple[int, T]]:
+        """Hand the next slot to the consumer.
+
+        The slot handed by the previous read is released. When no new slot is committed
+        within the timeout, the previous slot is handed again and counted as duplicated.
+
+        Args:
+            timeout (Optional[float]): Maximum time to wait for a new slot, forever if None.
+
+        Returns:
+            The sequence number and the buffer of the slot, or None when nothing was ever
+            committed or the ring buffer is closed and drained.
+        """
+        with self._cond:
+            if not self._ready and not self.closed:
+                self._cond.wait_for(lambda: self._ready or self.closed, timeout)
+
+            if not self._ready:
+                if self._reading is None or self.closed:
+                    return None
+                self.duplicated += 1
+                return self.sequences[self._reading], self.slots[self._reading]
+
+            if self.policy is DropPolicy.LATEST_ONLY:
+                while len(self._ready) > 1:
+                    self.states[self._ready.popleft()] = SlotState.FREE
+                    self.dropped += 1
+
+            if self._reading is not None:
+                self.states[self._reading] = SlotState.FREE
+            self._reading = self._ready.popleft()
+            self.states[self._reading] = SlotState.READING
+            self._cond.notify_all()
+            return self.sequences[self._reading], self.slots[self._reading]
+
+    def close(self) -> None:
+        """Close the ring buffer, waking up every waiting producer and consumer."""
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def reset(self) -> None:
+        """Drop every pending slot and reopen the ring buffer."""
+        with self._cond:
+            self._ready.clear()
+            self._reading = None
+            self.states = [SlotState.FREE] * self.capacity
+            self.closed = False
+            self._cond.notify_all()
+
+    def _find_free(self) -> Optional[int]:
+        for index, state in enumerate(self.states):
+            if state is SlotState.FREE:
+                return index
+        return None
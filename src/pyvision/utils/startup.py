@@ -0,0 +1,51 @@
+"""Class to measure the time the application takes to start."""
+
+import time
+from typing import List, Tuple
+
+
+class StartupTimer:
+    """Record when each startup step ends, relative to the creation of the timer.
+
+    The module level `startup` timer starts when this module is first imported, which
+    the entry points do as early as they can.
+
+    Attributes:
+        start (float): The time the timer was created, from time.perf_counter.
+        marks (List[Tuple[str, float]]): The steps and their end time since start, in
+            seconds, in the order they were marked.
+    """
+
+    def __init__(self) -> None:
+        """Initialize the StartupTimer."""
+        self.start = time.perf_counter()
+        self.marks: List[Tuple[str, float]] = []
+
+    def mark(self, step: str) -> float:
+        """Record the end of a step, only the first time it is marked.
+
+        Args:
+            step (str): The name of the step.
+
+        Returns:
+            float: The time since start, in seconds.
+        """
+        elapsed = time.perf_counter() - self.start
+        if all(name != step for name, _ in self.marks):
+            self.marks.append((step, elapsed))
+        return elapsed
+
+    def report(self) -> str:
+        """Return the steps, their end time and duration, one per line."""
+        lines = ["startup:"]
+        previous = 0.0
+        for step, elapsed in sorted(self.marks, key=lambda mark: mark[1]):
+            lines.append(
+                f"  {step:<20} {1000 * elapsed:8.1f} ms"
+                f" (+{1000 * (elapsed - previous):.1f} ms)"
+            )
+            previous = elapsed
+        return "\n".join(lines)
+
+
+startup = StartupTimer()
@@ -0,0 +1,138 @@
+"""A module drawing a text overlay (FPS, latencies, detections) over the video.
+
+Rasterizing text with pygame is slow enough to show up in the profile when it runs on
+every frame. The Overlay loads its font once, renders every character once into a glyph
+cache, and only composes a line again when its text changes: an FPS counter redraws
+when the displayed integer changes, and drawing the overlay on a frame is a single blit
+of a layer kept from one frame to the next.
+"""
+
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import pygame
+
+Color = Tuple[int, int, int]
+
+DEFAULT_COLOR: Color = (0, 255, 0)
+DEFAULT_FONT_SIZE = 24
+
+
+class Overlay:
+    """Named lines of text drawn over the frames, top to bottom.
+
+    The lines are set from any thread, typically the processing one, and drawn from
+    the render thread.
+
+    Attributes:
+        font_size (int): The size of the default pygame font.
+        color (Color): The color of the text.
+        margin (int): The distance between the overlay and the corner it is drawn at.
+    """
+
+    def __init__(
+        self,
+        font_size: int = DEFAULT_FONT_SIZE,
+        color: Color = DEFAULT_COLOR,
+        margin: int = 10,
+    ) -> None:
+        """Initialize the Overlay.
+
+        The font is loaded on the first render, pygame having to be initialized then.
+
+        Args:
+            font_size (int): The size of the default pygame font.
+            color (Color): The color of the text.
+            margin (int): The distance between the overlay and the corner it is drawn
+                at, in pixels.
+        """
+        self.font_size = font_size
+        self.color = color
+        self.margin = margin
+        self._font: Optional[pygame.font.Font] = None
+        self._glyphs: Dict[str, pygame.Surface] = {}
+        self._lines: Dict[str, Tuple[str, Optional[pygame.Surface]]] = {}
+        self._layer: Optional[pygame.Surface] = None
+        self._dirty = False
+        self._lock = threading.Lock()
+
+    def set(self, name: str, text: str) -> None:
+        """Set the text of a line, appended below the others the first time.
+
+        Setting the text a line already has costs a dictionary lookup.
+
+        Args:
+            name (str): The name of the line, e.g. fps.
+            text (str): The text of the line.
+        """
+        line = self._lines.get(name)
+        if line is not None and line[0] == text:
+            return
+        with self._lock:
+            self._lines[name] = (text, None)  # Rendered by the next draw
+            self._dirty = True
+
+    def remove(self, name: str) -> None:
+        """Remove a line, if shown.
+
+        Args:
+            name (str): The name of the line.
+        """
+        with self._lock:
+            if self._lines.pop(name, None) is not None:
+                self._dirty = True
+
+    def draw(self, target: pygame.Surface) -> None:
+        """Draw the overlay at the top left corner of a surface.
+
+        Args:
+            target (pygame.Surface): The surface to draw on, e.g. the display.
+        """
+        with self._lock:
+            if self._dirty:
+                self._compose()
+                self._dirty = False
+            layer = self._layer
+        if layer is not None:
+            target.blit(layer, (self.margin, self.margin))
+
+    def _compose(self) -> None:
+        """Render the changed lines and stack every line into the layer."""
+        surfaces: List[pygame.Surface] = []
+        for name, (text, surface) in self._lines.items():
+            if surface is None:
+                surface = self._render(text)
+                self._lines[name] = (text, surface)
+            surfaces.append(surface)
+        if not surfaces:
+            self._layer = None
+            return
+        width = max(surface.get_width() for surface in surfaces)
+        height = sum(surface.get_height() for surface in surfaces)
+        self._layer = pygame.Surface((max(width, 1), height), pygame.SRCALPHA)
+        y = 0
+        for surface in surfaces:
+            self._layer.blit(surface, (0, y))
+            y += surface.get_height()
+
+    def _render(self, text: str) -> pygame.Surface:
+        """Render a line from the glyph cache, rasterizing the new characters only."""
+        if self._font is None:
+            self._font = pygame.font.Font(None, self.font_size)
+        glyphs = []
+        for character in text:
+            glyph = self._glyphs.get(character)
+            if glyph is None:
+                glyph = self._glyphs[character] = self._font.render(
+                    character, True, self.color
+                )
+            glyphs.append(glyph)
+        width = sum(glyph.get_width() for glyph in glyphs)
+        line = pygame.Surface(
+            (max(width, 1), self._font.get_linesize()), pygame.SRCALPHA
+        )
+        x = 0
+        for glyph in glyphs:
+            line.blit(glyph, (x, 0))
+            x += glyph.get_width()
+        return line
@@ -2,10 +2,18 @@
 
 import os
 import tkinter as tk
-from typing import Any
+from typing import Any, Dict, Optional, Tuple
 
 import cv2
+import numpy as np
 import pygame
+from numpy.typing import NDArray
+
+from pyvision.models.frame import Frame
+from pyvision.views.overlay import Overlay
+
+# The surfaces sharing the pixels of the buffers of the render thread, see RenderLoop
+MAX_SOURCE_SURFACES = 4
 
 
 class VideoView(tk.Frame):
@@ -33,7 +41,11 @@ class VideoView(tk.Frame):
         self.screen = pygame.display.set_mode(
             (self.winfo_width(), self.winfo_height()), flags
         )
-        self.fps_surface = None
+        self.overlay = Overlay()
+        self._sources: Dict[Tuple[int, Tuple[int, ...]], Tuple[NDArray, Any]] = {}
+        self._targets: Dict[Tuple[int, int, int, int], Optional[pygame.Surface]] = {}
+        self._gray: Optional[NDArray[np.uint8]] = None
+        self._converted: Optional[pygame.Surface] = None
 
     @property
     def parent(self) -> tk.Tk:
@@ -53,33 +65,111 @@ class VideoView(tk.Frame):
         """
         if self.screen:
             self.screen = pygame.display.set_mode((width, height))
+            self._targets = {}
+            self._converted = None
 
     def destroy(self):
         """Destroys the Pygame display."""
         pygame.display.quit()
 
-    def update_frame(self, frame: cv2.UMat) -> None:
+    def update_frame(self, frame: Frame) -> None:
         """Called by the controller when a new update is available.
 
+        The pixels are wrapped in a BGR surface without being copied and blitted by
+        SDL straight into the display. Frames fitted to the window are first converted
+        into a surface in the display format, which the scaling requires.
+
         Args:
-            frame (cv2.UMat): The frame to be updated.
+            frame (Frame): The frame to be updated.
         """
-        # print(f"Updating frame: {frame}")
-        processed_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        camera_surf: pygame.Surface = pygame.surfarray.make_surface(  # type: ignore
-            processed_frame.get().transpose((1, 0, 2))
-        )
-        self.screen.blit(camera_surf, (0, 0))
-        if self.fps_surface:
-            self.screen.blit(self.fps_surface, (10, 10))
+        image = frame.host()  # Downloaded once, if the last stage left it on the device
+        if image.ndim == 2:
+            if self._gray is None or self._gray.shape[:2] != image.shape:
+                self._gray = np.empty((*image.shape, 3), dtype=np.uint8)
+            cv2.cvtColor(image, cv2.COLOR_GRAY2BGR, dst=self._gray)
+            image = self._gray
+        elif not image.flags.c_contiguous:
+            image = np.ascontiguousarray(image)
+
+        source = self._source_surface(image)
+        target = self._target_surface(image.shape[1], image.shape[0])
+        if target is None:
+            self.screen.blit(source, (0, 0))
+        else:
+            # The scaling needs the source in the format of the display
+            converted = self._converted_surface(image.shape[1], image.shape[0])
+            converted.blit(source, (0, 0))
+            pygame.transform.scale(converted, target.get_size(), target)
+        self.overlay.draw(target or self.screen)
         pygame.display.update()
 
+    def _source_surface(self, image: NDArray[np.uint8]) -> pygame.Surface:
+        """Return a surface sharing the pixels of a BGR image, kept per buffer.
+
+        The render thread cycles through a few buffers, so their surfaces are only
+        created once; the images are kept alongside so that their memory stays valid.
+        """
+        key = (image.ctypes.data, image.shape)
+        cached = self._sources.get(key)
+        if cached is None:
+            if len(self._sources) >= MAX_SOURCE_SURFACES:
+                self._sources.clear()  # Buffers reallocated, e.g. resolution change
+            height, width = image.shape[:2]
+            surface = pygame.image.frombuffer(image, (width, height), "BGR")
+            cached = self._sources[key] = (image, surface)
+        return cached[1]
+
+    def _converted_surface(self, width: int, height: int) -> pygame.Surface:
+        """Return a surface in the display format the scaled frames are copied into.
+
+        The surface is created once per frame size and display.
+        """
+        converted = self._converted
+        if converted is None or converted.get_size() != (width, height):
+            converted = self._converted = pygame.Surface(
+                (width, height), 0, self.screen
+            )
+        return converted
+
+    def _target_surface(self, width: int, height: int) -> Optional[pygame.Surface]:
+        """Return the region of the display the frames are scaled into.
+
+        The region fits the frame into the window keeping its aspect ratio, and is
+        computed once per frame and window size.
+
+        Returns:
+            Optional[pygame.Surface]: The region of the display, None when the frame
+                is blitted as is.
+        """
+        screen_width, screen_height = self.screen.get_size()
+        key = (width, height, screen_width, screen_height)
+        if key not in self._targets:
+            scale = min(screen_width / width, screen_height / height)
+            target = None
+            if scale != 1.0 and scale > 0:
+                size = (round(width * scale), round(height * scale))
+                position = (
+                    (screen_width - size[0]) // 2,
+                    (screen_height - size[1]) // 2,
+                )
+                self.screen.fill((0, 0, 0))
+                target = self.screen.subsurface(pygame.Rect(position, size))
+            self._targets = {key: target}
+        return self._targets[key]
+
     def update_fps(self, fps: int) -> None:
         """Updates the frames per second display.
 
         Args:
             fps (int): The frames per second to be displayed.
         """
-        font = pygame.font.Font(None, 36)
-        fps_text = font.render(f"{fps} FPS", True, (0, 255, 0))
-        self.fps_surface = fps_text
+        self.overlay.set("fps", f"{fps} FPS")
+
+    def update_overlay(self, name: str, text: str) -> None:
+        """Updates a line of the overlay, e.g. a latency or a detection count.
+
+        Args:
+            name (str): The name of the line.
+            text (str): The text of the line.
+        """
+        self.overlay.set(name, text)